@@ -0,0 +1 @@
+# AI Benchmarks Package
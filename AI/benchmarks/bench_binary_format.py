@@ -0,0 +1,88 @@
+"""
+Benchmark the binary batch format against JSON for startup success batches.
+
+For each batch size it reports the request and response sizes and the
+in-process time of a full /ai/predict-startup-success/batch round trip. The
+round trip covers client encoding, request parsing, the model call, response
+encoding and client decoding. JSON, the float matrix format and (if
+installed) msgpack are compared. The model time is the same in every format,
+so the differences come from serialization.
+
+Usage (from the AI directory):
+    python -m benchmarks.bench_binary_format --sizes 1 100 1000 5000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from models.binary_codec import (
+    FLOAT_MATRIX_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, decode_matrix, encode_matrix, msgpack
+)
+from models.startup_success_model import FEATURE_COLUMNS
+from models.synthetic_data import generate
+
+
+def _json_round_trip(client, X):
+    body = json.dumps({'items': [dict(zip(FEATURE_COLUMNS, row)) for row in X.tolist()]})
+    response = client.post("/ai/predict-startup-success/batch", content=body,
+                           headers={"Content-Type": "application/json"})
+    probabilities = [p['success_probability'] for p in response.json()['predictions']]
+    return len(body), len(response.content), probabilities
+
+
+def _matrix_round_trip(client, X):
+    body = encode_matrix(X)
+    response = client.post("/ai/predict-startup-success/batch", content=body,
+                           headers={"Content-Type": FLOAT_MATRIX_MEDIA_TYPE, "Accept": FLOAT_MATRIX_MEDIA_TYPE})
+    return len(body), len(response.content), decode_matrix(response.content)[:, 1]
+
+
+def _msgpack_round_trip(client, X):
+    body = msgpack.packb({'rows': X.tolist()})
+    response = client.post("/ai/predict-startup-success/batch", content=body,
+                           headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE})
+    return len(body), len(response.content), msgpack.unpackb(response.content)['success_probability']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare binary and JSON batch encodings")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 1000, 5000], help="rows per batch")
+    parser.add_argument('--repeats', type=int, default=5, help="round trips per measurement")
+    args = parser.parse_args()
+
+    formats = {'json': _json_round_trip, 'f32 matrix': _matrix_round_trip}
+    if msgpack is not None:
+        formats['msgpack'] = _msgpack_round_trip
+
+    rows = generate('success', max(args.sizes))[FEATURE_COLUMNS].to_numpy(dtype=float)
+    client = TestClient(app)
+
+    print(f"{'rows':>6}  {'format':<12}{'request B':>12}{'response B':>12}{'ms/batch':>10}{'us/row':>9}")
+    for size in args.sizes:
+        X = rows[:size]
+        reference = None
+        for name, round_trip in formats.items():
+            round_trip(client, X)
+            start = time.perf_counter()
+            for _ in range(args.repeats):
+                request_bytes, response_bytes, probabilities = round_trip(client, X)
+            elapsed_ms = (time.perf_counter() - start) / args.repeats * 1000
+
+            # Every format must agree with JSON to float32 precision
+            probabilities = np.asarray(probabilities, dtype=float)
+            if reference is None:
+                reference = probabilities
+            elif not np.allclose(probabilities, reference, atol=1e-6):
+                print(f"  {name} results differ from JSON")
+
+            print(f"{size:>6}  {name:<12}{request_bytes:>12,}{response_bytes:>12,}"
+                  f"{elapsed_ms:>10.2f}{elapsed_ms * 1000 / size:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Report the memory the recommendation catalog takes per million companies.
+
+Compares the compact catalog store with the object-dtype DataFrame the
+recommendation model used to keep (the four catalog columns plus the parsed
+'Funding USD' and derived 'Combined' columns, and the lowercased name -> row
+dict). Only the catalog itself is measured; the TF-IDF matrix is the same in
+both layouts.
+
+Usage (from the AI directory):
+    python -m benchmarks.bench_catalog_memory --sizes 100000 1000000
+"""
+
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from models.compact_catalog import CompactCatalog
+from models.recommendation_model import OUTPUT_COLUMNS, parse_funding_amount
+from models.synthetic_data import generate
+
+
+def dataframe_bytes(records):
+    """Deep size of the previous DataFrame layout and its name lookup dict"""
+    df = pd.DataFrame(records)
+    df['Funding USD'] = df['Funding Amount'].map(parse_funding_amount)
+    df['Combined'] = df['Industry'] + " " + df['Company Name']
+    company_rows = {name.lower(): row for row, name in enumerate(df['Company Name'])}
+    lookup = sys.getsizeof(company_rows) + sum(sys.getsizeof(name) for name in company_rows)
+    return int(df.memory_usage(deep=True).sum()) + lookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog memory per million companies")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000], help="companies in the catalog")
+    args = parser.parse_args()
+
+    # Bytes per company equal MB per million companies
+    print(f"{'companies':>10}  {'layout':<10}{'MB':>10}{'MB/million':>12}")
+    for size in args.sizes:
+        records = generate('catalog', size).to_dict('records')
+        old = dataframe_bytes(records)
+        catalog = CompactCatalog(records, parse_funding_amount)
+        usage = catalog.memory_usage()
+        for name, total in (('dataframe', old), ('compact', usage['total'])):
+            print(f"{size:>10,}  {name:<10}{total / 1e6:>10.1f}{total / size:>12.1f}")
+        print("            " + ", ".join(f"{key} {value / size:.1f} B" for key, value in usage.items() if key != 'total'))
+
+        # Materializing the top-k rows does not depend on the catalog size
+        rows = list(range(0, size, max(size // 6, 1)))[:6]
+        start = time.perf_counter()
+        for _ in range(1000):
+            catalog.records(rows, OUTPUT_COLUMNS)
+        print(f"            top-6 materialization: {(time.perf_counter() - start) * 1000:.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
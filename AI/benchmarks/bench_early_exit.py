@@ -0,0 +1,64 @@
+"""
+Benchmark early-exit evaluation of the startup success forest.
+
+Reports, per exit configuration, the average number of trees evaluated per
+request, how often the exit fired early, agreement with the full forest and
+the probability error it costs. Rows are fresh synthetic startups, drawn
+with a different seed than the training data.
+
+Usage (from the AI directory):
+    python -m benchmarks.bench_early_exit --rows 2000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from models.startup_success_model import FEATURE_COLUMNS, startup_success_model
+from models.synthetic_data import generate
+
+MARGINS = [None, 0.1, 0.2, 0.3]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Early-exit forest benchmark")
+    parser.add_argument('--rows', type=int, default=200, help="held-out rows to score")
+    parser.add_argument('--seed', type=int, default=7, help="seed of the held-out rows")
+    args = parser.parse_args()
+
+    X_test = generate('success', args.rows, seed=args.seed)[FEATURE_COLUMNS]
+    X_scaled = startup_success_model.scaler.transform(X_test)
+
+    forest = startup_success_model._get_early_exit_forest()
+    full_probability = startup_success_model.model.predict_proba(X_scaled)[:, 1]
+    full_prediction = (full_probability > 0.5).astype(int)
+
+    # Reference: the full forest, one row at a time as the API serves it
+    start = time.perf_counter()
+    for row in X_scaled:
+        startup_success_model.model.predict_proba(row[None, :])
+    full_us = (time.perf_counter() - start) / len(X_scaled) * 1e6
+
+    print(f"Rows: {len(X_scaled)}  Trees: {forest.n_trees}")
+    print(f"Full forest predict_proba: {full_us:.1f} us/row")
+    print(f"{'margin':>8}{'avg trees':>11}{'early %':>9}{'agree %':>9}{'max |dp|':>10}{'us/row':>9}")
+
+    for margin in MARGINS:
+        start = time.perf_counter()
+        results = [forest.predict_row(row, margin=margin, min_trees=10) for row in X_scaled]
+        elapsed_us = (time.perf_counter() - start) / len(X_scaled) * 1e6
+
+        trees = np.array([r['trees_evaluated'] for r in results])
+        early = np.array([r['early_exit'] for r in results])
+        prediction = np.array([r['success_prediction'] for r in results])
+        probability = np.array([r['success_probability'] for r in results])
+
+        label = 'exact' if margin is None else f"{margin:.2f}"
+        print(f"{label:>8}{trees.mean():>11.1f}{early.mean() * 100:>9.1f}"
+              f"{(prediction == full_prediction).mean() * 100:>9.1f}"
+              f"{np.abs(probability - full_probability).max():>10.3f}{elapsed_us:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark sharded recommendation scoring as the catalog grows.
+
+Builds synthetic catalogs from the real industries and market sizes, then
+measures get_recommendations latency in-process and with the catalog
+partitioned across shard worker processes.
+
+Usage (from the AI directory):
+    python -m benchmarks.bench_sharded_recommendations --sizes 10000 100000 1000000 --shards 1 2 4
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from models.recommendation_model import RecommendationModel
+from models.synthetic_data import generate
+
+QUERIES = ["Fintech", "E-commerce", "Healthcare", "Transport", "Real Estate", "fintek", "logistics"]
+
+
+def synthetic_catalog(n_companies, seed=0):
+    """Companies with random names over the real industry and market size mix"""
+    return generate('catalog', n_companies, seed=seed).to_dict('records')
+
+
+def measure(model, repeats):
+    latencies = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        model.get_recommendations(QUERIES[i % len(QUERIES)], top_n=6)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded recommendation benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 500000])
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'companies':>10}{'shards':>8}{'p50 ms':>10}{'p95 ms':>10}{'build s':>9}")
+    for size in args.sizes:
+        catalog = synthetic_catalog(size)
+        for shards in args.shards:
+            start = time.perf_counter()
+            model = RecommendationModel(company_data=catalog, num_shards=shards)
+            build = time.perf_counter() - start
+            model.get_recommendations(QUERIES[0])
+            p50, p95 = measure(model, args.repeats)
+            print(f"{size:>10,}{shards:>8}{p50:>10.2f}{p95:>10.2f}{build:>9.1f}")
+            if model.sharded_index is not None:
+                model.sharded_index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark worker process and native thread combinations.
+
+Each combination starts W worker processes, each with its BLAS, OpenMP and
+joblib pools limited to T threads, as ThreadBudget does for the service.
+Every worker scores startups in a closed loop for a fixed time, the way an
+API worker serves requests back to back. Throughput and latency percentiles
+are reported per combination, for interactive requests (one row) and batch
+requests (many rows). Combinations where W x T exceeds the cores
+oversubscribe them.
+
+Usage (from the AI directory):
+    python -m benchmarks.bench_thread_budget --workers 1 2 4 --threads 1 2 4
+"""
+
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from models.startup_success_model import FEATURE_COLUMNS, startup_success_model
+from models.synthetic_data import generate
+from models.thread_budget import ThreadBudget, available_cores
+
+PROFILES = {'interactive': 1, 'batch': 2000}
+
+
+def _worker(threads, X, seconds, start_event, results):
+    budget = ThreadBudget(interactive_threads=threads)
+    with budget.limit('interactive'):
+        # Warm up outside the measurement
+        startup_success_model.model.predict_proba(X[:1])
+        start_event.wait()
+        latencies = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            startup_success_model.model.predict_proba(X)
+            latencies.append(time.perf_counter() - start)
+        results.put(latencies)
+
+
+def run_combination(workers, threads, X, seconds):
+    """
+    Run W workers with T threads each
+
+    Returns:
+        dict: requests/s, rows/s and latency percentiles in ms
+    """
+    # Workers inherit the trained model from this process
+    context = multiprocessing.get_context('fork')
+    start_event = context.Event()
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(threads, X, seconds, start_event, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(0.5)
+    start_event.set()
+    latencies = np.concatenate([results.get() for _ in processes]) * 1000
+    for process in processes:
+        process.join()
+    return {
+        'requests_per_second': len(latencies) / seconds,
+        'rows_per_second': len(latencies) * len(X) / seconds,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker and thread budget benchmark")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="worker processes")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4], help="native threads per worker")
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES), default=sorted(PROFILES),
+                        help="request profiles to run")
+    parser.add_argument('--seconds', type=float, default=3.0, help="measurement time per combination")
+    args = parser.parse_args()
+
+    data = generate('success', max(PROFILES.values()), seed=11)[FEATURE_COLUMNS]
+    X_all = startup_success_model.scaler.transform(data)
+
+    print(f"Cores available: {available_cores()}")
+    for profile in args.profiles:
+        X = X_all[:PROFILES[profile]]
+        print(f"\n{profile} ({len(X)} rows per request)")
+        print(f"{'workers':>8}{'threads':>8}{'req/s':>10}{'rows/s':>12}{'p50 ms':>9}{'p99 ms':>9}")
+        for workers in args.workers:
+            for threads in args.threads:
+                result = run_combination(workers, threads, X, args.seconds)
+                print(f"{workers:>8}{threads:>8}{result['requests_per_second']:>10.1f}"
+                      f"{result['rows_per_second']:>12,.0f}{result['p50_ms']:>9.2f}{result['p99_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
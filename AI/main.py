@@ -1,13 +1,41 @@
-from fastapi import FastAPI, HTTPException
+# Size the native thread pools before numpy loads them
+from models.thread_budget import thread_budget
+thread_budget.pin_environment('interactive')
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
+import asyncio
+import hashlib
+import hmac
+import json
+import numpy as np
+import os
+import time
 import uvicorn
 
+# Readiness is measured from here, so model loading counts towards it
+SERVICE_STARTED_AT = time.time()
+
 # Import our AI models
-from models.recommendation_model import recommendation_model
+from models.recommendation_model import serving_recommendations
 from models.startup_success_model import startup_success_model
 from models.profit_prediction_model import profit_prediction_model
+from models.profiler import flame_graph, server_timing_header, stack_sampler, start_trace
+from models.startup_success_model import FEATURE_COLUMNS as STARTUP_FEATURE_COLUMNS
+from models.feature_store import startup_feature_store
+from models.job_queue import JobWorkerPool, job_queue, read_rebuilt_catalog
+from models.warmup import hot_key_recorder, warm_up
+from models.deadline_cascade import startup_success_cascade
+from models.drift_monitor import drift_monitors
+from models.portfolio import DEFAULT_QUANTILES, portfolio_analyzer
+from models.binary_codec import (
+    FLOAT_MATRIX_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, decode_matrix, decode_msgpack_matrix,
+    encode_matrix, encode_msgpack, msgpack_available
+)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -25,11 +53,105 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ==================== ADMIN ACCESS AND TRACING ====================
+
+def is_admin_token(token):
+    """Admin endpoints are disabled unless AI_ADMIN_TOKEN is set"""
+    expected = os.getenv("AI_ADMIN_TOKEN")
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Attach stage timings as a Server-Timing header when an admin sends X-Trace: 1
+    """
+    # Deadlines (X-Deadline-Ms) are counted from here
+    request.state.received_at = time.perf_counter()
+    traced = request.headers.get("x-trace") == "1" and is_admin_token(request.headers.get("x-admin-token"))
+    if traced:
+        timings = start_trace()
+        start = time.perf_counter()
+    response = await call_next(request)
+    if traced:
+        response.headers["Server-Timing"] = server_timing_header(timings, time.perf_counter() - start)
+    stack_sampler.note_request()
+    return response
+
+# ==================== REQUEST COALESCING ====================
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical requests into one computation
+    
+    The first request for a payload runs the computation in the threadpool;
+    duplicates arriving while it is in flight await the same task instead of
+    repeating the work. Nothing is cached once the computation finishes.
+    """
+    
+    def __init__(self):
+        self.in_flight = {}
+        self.counters = {}
+    
+    @staticmethod
+    def payload_key(namespace, payload):
+        """Hash of the canonical JSON form of a payload"""
+        canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return namespace + ":" + hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    async def run(self, namespace, payload, func, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) once for all concurrent identical payloads
+        
+        Args:
+            namespace (str): Endpoint name, keeps payloads of different endpoints apart
+            payload (dict): Normalized request payload
+            func (callable): Synchronous computation
+            
+        Returns:
+            The computation's result, shared by every coalesced request
+        """
+        key = self.payload_key(namespace, payload)
+        counters = self.counters.setdefault(namespace, {'executions': 0, 'coalesced': 0})
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(run_in_threadpool(func, *args, **kwargs))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+            counters['executions'] += 1
+        else:
+            counters['coalesced'] += 1
+        # A disconnecting client must not cancel the computation for the others
+        return await asyncio.shield(task)
+    
+    def stats(self):
+        """Executions and coalesced requests per endpoint"""
+        return {
+            'in_flight': len(self.in_flight),
+            'endpoints': {namespace: dict(counters) for namespace, counters in self.counters.items()}
+        }
+
+single_flight = SingleFlight()
+
 # ==================== RECOMMENDATION SYSTEM ====================
 
+class RankingWeights(BaseModel):
+    text: float = Field(1.0, ge=0, description="Weight of TF-IDF similarity")
+    funding: float = Field(0.05, ge=0, description="Weight of normalized log funding")
+    market_size: float = Field(0.05, ge=0, description="Weight of ordinal market size")
+
 class IndustryInput(BaseModel):
     industry: str = Field(..., description="Industry to get recommendations for")
     top_n: Optional[int] = Field(6, description="Number of recommendations to return")
+    industries: Optional[List[str]] = Field(None, description="Only recommend companies in these industries")
+    market_sizes: Optional[List[str]] = Field(None, description="Only recommend companies with these market sizes (Small, Medium, Large)")
+    min_funding_usd: Optional[float] = Field(None, ge=0, description="Minimum funding in USD")
+    max_funding_usd: Optional[float] = Field(None, ge=0, description="Maximum funding in USD")
+    include_facets: bool = Field(False, description="Include industry and market size counts for the filtered catalog")
+    ranking_weights: Optional[RankingWeights] = Field(None, description="Weights of the hybrid ranking score")
 
 @app.post("/ai/recommendations", tags=["Recommendations"])
 async def get_company_recommendations(input_data: IndustryInput):
@@ -37,18 +159,121 @@ async def get_company_recommendations(input_data: IndustryInput):
     Get company recommendations based on industry input using TF-IDF similarity
     """
     try:
-        recommendations = recommendation_model.get_recommendations(
-            input_data.industry, 
-            input_data.top_n
+        payload = input_data.dict()
+        payload['industry'] = " ".join(input_data.industry.lower().split())
+        response = await single_flight.run("recommendations", payload, _recommendation_response, input_data)
+        # Only requests that succeeded are worth replaying at start-up
+        hot_key_recorder.record("recommendations", payload)
+        return {**response, "industry": input_data.industry}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting recommendations: {str(e)}")
+
+def _recommendation_response(input_data):
+    with serving_recommendations.use() as recommendation_model:
+        return _recommendation_payload(recommendation_model, input_data)
+
+def _recommendation_payload(recommendation_model, input_data):
+    recommendations = recommendation_model.get_recommendations(
+        input_data.industry, 
+        input_data.top_n,
+        industries=input_data.industries,
+        market_sizes=input_data.market_sizes,
+        min_funding=input_data.min_funding_usd,
+        max_funding=input_data.max_funding_usd,
+        weights=input_data.ranking_weights.dict() if input_data.ranking_weights else None
+    )
+    response = {
+        "success": True,
+        "resolved_industries": recommendation_model.resolve_query(input_data.industry),
+        "recommendations": recommendations,
+        "count": len(recommendations)
+    }
+    if input_data.include_facets:
+        candidates = recommendation_model.filter_rows(
+            input_data.industries,
+            input_data.market_sizes,
+            input_data.min_funding_usd,
+            input_data.max_funding_usd
         )
-        return {
+        response["facets"] = recommendation_model.get_facets(candidates)
+    return response
+
+class BatchIndustryInput(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=100, description="Industries to get recommendations for")
+    top_n: Optional[int] = Field(6, description="Number of recommendations per industry")
+    blend: bool = Field(False, description="Also return one deduplicated list across all industries")
+    industries: Optional[List[str]] = Field(None, description="Only recommend companies in these industries")
+    market_sizes: Optional[List[str]] = Field(None, description="Only recommend companies with these market sizes (Small, Medium, Large)")
+    min_funding_usd: Optional[float] = Field(None, ge=0, description="Minimum funding in USD")
+    max_funding_usd: Optional[float] = Field(None, ge=0, description="Maximum funding in USD")
+    ranking_weights: Optional[RankingWeights] = Field(None, description="Weights of the hybrid ranking score")
+
+@app.post("/ai/recommendations/batch", tags=["Recommendations"])
+async def get_batch_company_recommendations(input_data: BatchIndustryInput):
+    """
+    Get company recommendations for several industries in one call
+    """
+    try:
+        with serving_recommendations.use() as recommendation_model:
+            batch = recommendation_model.get_batch_recommendations(
+                input_data.queries,
+                input_data.top_n,
+                blend=input_data.blend,
+                industries=input_data.industries,
+                market_sizes=input_data.market_sizes,
+                min_funding=input_data.min_funding_usd,
+                max_funding=input_data.max_funding_usd,
+                weights=input_data.ranking_weights.dict() if input_data.ranking_weights else None
+            )
+            resolved = [recommendation_model.resolve_query(industry) for industry in input_data.queries]
+        response = {
             "success": True,
-            "industry": input_data.industry,
-            "recommendations": recommendations,
-            "count": len(recommendations)
+            "results": [
+                {
+                    "industry": industry,
+                    "resolved_industries": resolved_industries,
+                    "recommendations": recommendations,
+                    "count": len(recommendations)
+                }
+                for industry, resolved_industries, recommendations in zip(input_data.queries, resolved, batch['results'])
+            ]
         }
+        if input_data.blend:
+            response["blended"] = batch['blended']
+        return response
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error getting batch recommendations: {str(e)}")
+
+class SimilarCompaniesInput(BaseModel):
+    company_name: str = Field(..., description="Catalog company to find similar companies for")
+    top_n: Optional[int] = Field(6, ge=1, description="Number of similar companies to return")
+
+def _similar_companies(company_name, top_n):
+    with serving_recommendations.use() as recommendation_model:
+        return recommendation_model.get_similar_companies(company_name, top_n)
+
+@app.post("/ai/similar-companies", tags=["Recommendations"])
+async def get_similar_companies(input_data: SimilarCompaniesInput):
+    """
+    Get companies similar to a catalog company from the precomputed neighbour graph
+    """
+    try:
+        similar = _similar_companies(input_data.company_name, input_data.top_n)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting similar companies: {str(e)}")
+    
+    if similar is None:
+        raise HTTPException(status_code=404, detail=f"Unknown company: {input_data.company_name}")
+    
+    hot_key_recorder.record("similar_companies", {
+        'company_name': input_data.company_name.strip().lower(), 'top_n': input_data.top_n
+    })
+    return {
+        "success": True,
+        "company_name": input_data.company_name,
+        "similar_companies": similar,
+        "count": len(similar)
+    }
 
 # ==================== STARTUP SUCCESS PREDICTION ====================
 
@@ -69,15 +294,40 @@ class StartupSuccessInput(BaseModel):
     is_otherstate: int = Field(..., description="Is located in other states (0 or 1)")
     age_first_funding_years: float = Field(..., description="Age at first funding in years")
 
+# Time kept back from a deadline for response encoding
+DEADLINE_RESERVE_SECONDS = 0.002
+
 @app.post("/ai/predict-startup-success", tags=["Startup Success"])
-async def predict_startup_success(input_data: StartupSuccessInput):
+async def predict_startup_success(
+    input_data: StartupSuccessInput,
+    request: Request,
+    response: Response,
+    early_exit: bool = Query(False, description="Stop evaluating forest trees once the class is decided"),
+    margin: Optional[float] = Query(None, ge=0, le=0.5, description="Early-exit margin around 0.5; trades probability accuracy for speed"),
+    x_deadline_ms: Optional[float] = Header(None, gt=0, description="Answer within this many milliseconds, degrading to cheaper models if needed")
+):
     """
     Predict startup success probability based on various factors
     """
     try:
         features = input_data.dict()
-        prediction = startup_success_model.predict_success(features)
+        payload = {'features': features, 'early_exit': early_exit, 'margin': margin}
+        drift_monitors['startup_success'].observe_row(features)
+        if x_deadline_ms is not None:
+            deadline = request.state.received_at + x_deadline_ms / 1000 - DEADLINE_RESERVE_SECONDS
+            prediction = await run_in_threadpool(startup_success_cascade.predict, features, deadline)
+            response.headers["X-Inference-Tier"] = prediction['tier']
+        elif early_exit:
+            prediction = await single_flight.run(
+                "startup_success", payload, startup_success_model.predict_success_early_exit, features, margin=margin
+            )
+        else:
+            prediction = await single_flight.run(
+                "startup_success", payload, startup_success_model.predict_success, features
+            )
         
+        if 'error' not in prediction:
+            hot_key_recorder.record("startup_success", payload)
         return {
             "success": True,
             "prediction": prediction,
@@ -90,30 +340,479 @@ async def predict_startup_success(input_data: StartupSuccessInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error predicting startup success: {str(e)}")
 
+class StartupSuccessBatchInput(BaseModel):
+    items: List[StartupSuccessInput] = Field(..., min_length=1, max_length=10000, description="Startups to predict")
+
+def _negotiated_media_type(accept):
+    """Pick the response encoding from the Accept header"""
+    accept = accept or ""
+    if FLOAT_MATRIX_MEDIA_TYPE in accept:
+        return FLOAT_MATRIX_MEDIA_TYPE
+    if MSGPACK_MEDIA_TYPE in accept and msgpack_available():
+        return MSGPACK_MEDIA_TYPE
+    return "application/json"
+
+@app.post("/ai/predict-startup-success/batch", tags=["Startup Success"])
+async def predict_startup_success_batch(request: Request):
+    """
+    Predict success for many startups in one call
+    
+    Accepts JSON ({"items": [...]} like the single endpoint), a float matrix
+    (application/x-startflow-f32, one row per startup with the 15 features
+    in the schema's order) or msgpack ({"rows": [[...], ...]}). Binary
+    requests get the encoding named by the Accept header, columnar JSON by
+    default; the float matrix response has the columns success_prediction
+    and success_probability.
+    """
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+    body = await request.body()
+    try:
+        if content_type == FLOAT_MATRIX_MEDIA_TYPE:
+            X = decode_matrix(body, len(STARTUP_FEATURE_COLUMNS))
+        elif content_type == MSGPACK_MEDIA_TYPE:
+            X = decode_msgpack_matrix(body, len(STARTUP_FEATURE_COLUMNS))
+        else:
+            items = StartupSuccessBatchInput.model_validate_json(body).items
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch request: {str(e)}")
+    
+    if content_type not in (FLOAT_MATRIX_MEDIA_TYPE, MSGPACK_MEDIA_TYPE):
+        features_list = [item.dict() for item in items]
+        for features in features_list:
+            drift_monitors['startup_success'].observe_row(features)
+        batch = startup_success_model.predict_success_batch(features_list)
+        if 'error' in batch:
+            raise HTTPException(status_code=500, detail=f"Error predicting startup success: {batch['error']}")
+        return {"success": True, **batch, "count": len(batch['predictions'])}
+    
+    try:
+        drift_monitors['startup_success'].observe_matrix(X)
+        predictions, probabilities = startup_success_model.predict_success_matrix(X)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting startup success: {str(e)}")
+    
+    # Binary requests are answered in the encoding the Accept header asks for
+    media_type = _negotiated_media_type(request.headers.get("accept"))
+    model_headers = {"X-Model-Name": startup_success_model.serving_name}
+    if media_type == FLOAT_MATRIX_MEDIA_TYPE:
+        return Response(encode_matrix(np.column_stack([predictions, probabilities])),
+                        media_type=media_type, headers=model_headers)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        payload = {
+            "success_prediction": predictions,
+            "success_probability": probabilities,
+            "model_name": startup_success_model.serving_name
+        }
+        return Response(encode_msgpack(payload), media_type=media_type, headers=model_headers)
+    
+    return {
+        "success": True,
+        "success_prediction": predictions.tolist(),
+        "success_probability": probabilities.tolist(),
+        "model_name": startup_success_model.serving_name,
+        "count": len(predictions)
+    }
+
+# ==================== STARTUP FEATURE STORE ====================
+
+class StoredStartupInput(StartupSuccessInput):
+    startup_id: str = Field(..., min_length=1, description="Startup ID used by later scoring requests")
+
+class StartupFeatureUpsertInput(BaseModel):
+    startups: List[StoredStartupInput] = Field(..., min_length=1, max_length=10000, description="Startups to insert or update")
+
+class StartupIdsInput(BaseModel):
+    startup_ids: List[str] = Field(..., min_length=1, max_length=10000, description="IDs of stored startups")
+
+@app.post("/ai/feature-store/startups", tags=["Startup Success"])
+async def upsert_startup_features(input_data: StartupFeatureUpsertInput):
+    """
+    Insert or update the stored success features of startups
+    """
+    try:
+        result = startup_feature_store.upsert_many([startup.dict() for startup in input_data.startups])
+        return {
+            "success": True,
+            **result
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error storing startup features: {str(e)}")
+
+@app.post("/ai/feature-store/startups/delete", tags=["Startup Success"])
+async def delete_startup_features(input_data: StartupIdsInput):
+    """
+    Remove stored startups and their cached scores
+    """
+    try:
+        return {
+            "success": True,
+            "deleted": startup_feature_store.delete_many(input_data.startup_ids)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting startup features: {str(e)}")
+
+@app.post("/ai/predict-startup-success/by-id", tags=["Startup Success"])
+async def predict_startup_success_by_id(input_data: StartupIdsInput):
+    """
+    Predict success for stored startups, reusing scores whose features did not change
+    """
+    try:
+        result = startup_feature_store.score(
+            input_data.startup_ids,
+            startup_success_model.predict_success_matrix,
+            startup_success_model.serving_fingerprint
+        )
+        return {
+            "success": True,
+            **result,
+            "model_name": startup_success_model.serving_name,
+            "count": len(result['predictions'])
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting startup success: {str(e)}")
+
 # ==================== PROFIT PREDICTION ====================
 
+# States the profit model was trained on; any other is rejected with 422
+ProfitState = Literal['California', 'Florida', 'New York']
+
 class ProfitPredictionInput(BaseModel):
     RnD_Spend: float = Field(..., description="Research and Development spending")
     Administration: float = Field(..., description="Administrative spending")
     Marketing_Spend: float = Field(..., description="Marketing spending")
+    State: Optional[ProfitState] = Field(None, description="California, Florida or New York; omit if unknown")
+
+# Coverage levels the prediction intervals are precomputed for
+IntervalLevel = Literal[0.8, 0.9, 0.95]
 
 @app.post("/ai/predict-profit", tags=["Profit Prediction"])
-async def predict_profit(input_data: ProfitPredictionInput):
+async def predict_profit(
+    input_data: ProfitPredictionInput,
+    interval_level: float = Query(0.9, description="Coverage of the prediction interval (0.8, 0.9 or 0.95)")
+):
     """
     Predict profit based on spending allocation
     """
+    # Query strings arrive as text, so the level is checked here rather than by a Literal
+    if interval_level not in IntervalLevel.__args__:
+        raise HTTPException(status_code=400, detail=f"Unsupported interval level {interval_level}, expected one of {list(IntervalLevel.__args__)}")
+    
     try:
         features = input_data.dict()
-        prediction = profit_prediction_model.predict_profit(features)
+        drift_monitors['profit'].observe_row(features)
+        prediction = profit_prediction_model.predict_profit(features, interval_level=interval_level)
         insights = profit_prediction_model.get_spending_insights(features)
-        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting profit: {str(e)}")
+    
+    # A failed prediction comes back as a zero with an error, never as a success
+    if 'error' in prediction:
+        raise HTTPException(status_code=500, detail=f"Error predicting profit: {prediction['error']}")
+    
+    hot_key_recorder.record("profit", {'features': features, 'interval_level': interval_level})
+    return {
+        "success": True,
+        "prediction": prediction,
+        "insights": insights
+    }
+
+class ProfitBatchInput(BaseModel):
+    items: List[ProfitPredictionInput] = Field(..., min_length=1, max_length=1000, description="Spending plans to predict")
+    interval_level: IntervalLevel = Field(0.9, description="Coverage of the prediction intervals (0.8, 0.9 or 0.95)")
+
+@app.post("/ai/predict-profit/batch", tags=["Profit Prediction"])
+async def predict_profit_batch(input_data: ProfitBatchInput):
+    """
+    Predict profit with prediction intervals for several spending plans
+    """
+    try:
+        features_list = [item.dict() for item in input_data.items]
+        for features in features_list:
+            drift_monitors['profit'].observe_row(features)
+        batch = profit_prediction_model.predict_profit_batch(features_list, interval_level=input_data.interval_level)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error predicting profit: {str(e)}")
+    
+    if 'error' in batch:
+        raise HTTPException(status_code=400, detail=batch['error'])
+    
+    return {
+        "success": True,
+        **batch
+    }
+
+class ProfitObservation(ProfitPredictionInput):
+    Profit: float = Field(..., description="Actual profit observed for this spending")
+
+class ProfitObservationsInput(BaseModel):
+    observations: List[ProfitObservation] = Field(..., min_length=1, description="Observed spending and profit pairs")
+    decay: float = Field(1.0, gt=0, le=1, description="Weight kept by earlier observations; below 1 favours recent data")
+
+@app.post("/ai/profit/observations", tags=["Profit Prediction"])
+async def ingest_profit_observations(input_data: ProfitObservationsInput):
+    """
+    Update the profit model incrementally with observed outcomes
+    """
+    try:
+        observations = [observation.dict() for observation in input_data.observations]
+        update = profit_prediction_model.update_with_observations(observations, decay=input_data.decay)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating profit model: {str(e)}")
+    
+    if 'error' in update:
+        raise HTTPException(status_code=400, detail=update['error'])
+    
+    return {
+        "success": True,
+        "update": update
+    }
+
+# ==================== PORTFOLIO ANALYTICS ====================
+
+class PortfolioStartupInput(StartupSuccessInput):
+    spending: Optional[ProfitPredictionInput] = Field(None, description="Spending plan; omit to leave the startup out of profit aggregates")
+
+class PortfolioInput(BaseModel):
+    startups: List[PortfolioStartupInput] = Field(..., min_length=1, max_length=10000, description="Startups in the portfolio")
+    quantiles: List[float] = Field(DEFAULT_QUANTILES, min_length=1, max_length=20, description="Quantile levels between 0 and 1")
+    interval_level: IntervalLevel = Field(0.9, description="Coverage of the summed profit intervals (0.8, 0.9 or 0.95)")
+
+@app.post("/ai/portfolio/analyze", tags=["Portfolio"])
+async def analyze_portfolio(input_data: PortfolioInput):
+    """
+    Score a whole portfolio in one pass and return aggregates: success
+    probability and profit distributions overall, by state and by funding round
+    """
+    if any(not 0 <= level <= 1 for level in input_data.quantiles):
+        raise HTTPException(status_code=400, detail="Quantile levels must be between 0 and 1")
+    
+    X = np.array([[getattr(startup, column) for column in STARTUP_FEATURE_COLUMNS] for startup in input_data.startups], dtype=float)
+    spending = [startup.spending.dict() if startup.spending else None for startup in input_data.startups]
+    drift_monitors['startup_success'].observe_matrix(X)
+    for plan in spending:
+        if plan is not None:
+            drift_monitors['profit'].observe_row(plan)
+    
+    summary = await run_in_threadpool(
+        portfolio_analyzer.analyze, X, spending, input_data.quantiles, input_data.interval_level
+    )
+    if 'error' in summary:
+        raise HTTPException(status_code=400, detail=summary['error'])
+    return {"success": True, **summary}
+
+# ==================== BACKGROUND JOBS ====================
+
+class JobSubmitInput(BaseModel):
+    kind: Literal["score_startups", "score_profit", "rebuild_recommendations"] = Field(..., description="Job to run")
+    startup_ids: Optional[List[str]] = Field(None, min_length=1, description="score_startups: IDs of stored startups")
+    rows: Optional[List[StartupSuccessInput]] = Field(None, min_length=1, description="score_startups: inline startups")
+    items: Optional[List[ProfitPredictionInput]] = Field(None, min_length=1, description="score_profit: spending plans")
+    interval_level: IntervalLevel = Field(0.9, description="score_profit: coverage of the prediction intervals (0.8, 0.9 or 0.95)")
+    companies: Optional[List[dict]] = Field(None, min_length=1, description="rebuild_recommendations: new catalog; omit to rebuild the current one")
+
+def _job_params(input_data):
+    """Parameters stored with a job; raises ValueError if the kind's inputs are missing"""
+    if input_data.kind == "score_startups":
+        if (input_data.startup_ids is None) == (input_data.rows is None):
+            raise ValueError("score_startups needs exactly one of startup_ids or rows")
+        if input_data.startup_ids is not None:
+            return {'startup_ids': input_data.startup_ids}
+        return {'rows': [row.dict() for row in input_data.rows]}
+    if input_data.kind == "score_profit":
+        if input_data.items is None:
+            raise ValueError("score_profit needs items")
+        return {'items': [item.dict() for item in input_data.items], 'interval_level': input_data.interval_level}
+    return {'companies': input_data.companies}
+
+def _public_job(job):
+    """Job state without its (possibly large) parameters and server paths"""
+    return {
+        "job_id": job['id'],
+        "kind": job['kind'],
+        "status": job['status'],
+        "progress": job['progress'],
+        "message": job['message'],
+        "error": job['error'],
+        "created_at": job['created_at'],
+        "started_at": job['started_at'],
+        "finished_at": job['finished_at'],
+        "result_url": f"/ai/jobs/{job['id']}/result" if job['status'] == "succeeded" else None
+    }
+
+@app.post("/ai/jobs", tags=["Jobs"], status_code=202)
+async def submit_job(input_data: JobSubmitInput):
+    """
+    Queue a large scoring job or a recommendation index rebuild
+    """
+    try:
+        params = _job_params(input_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        job_id = job_queue.submit(input_data.kind, params)
         return {
             "success": True,
-            "prediction": prediction,
-            "insights": insights
+            "job": _public_job(job_queue.get(job_id))
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error predicting profit: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error submitting job: {str(e)}")
+
+@app.get("/ai/jobs/{job_id}", tags=["Jobs"])
+async def job_status(job_id: str):
+    """
+    Status and progress of a job
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {
+        "success": True,
+        "job": _public_job(job)
+    }
+
+@app.get("/ai/jobs/{job_id}/result", tags=["Jobs"])
+async def job_result(job_id: str):
+    """
+    Stream the JSON-lines result file of a finished job
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if job['status'] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return FileResponse(job['result_path'], media_type="application/x-ndjson", filename=f"{job_id}.jsonl")
+
+# Each API worker process tracks the rebuild it serves
+applied_rebuild_id = None
+
+def _apply_finished_rebuilds():
+    """Load the latest catalog rebuilt by the workers into this process's recommendation model"""
+    global applied_rebuild_id
+    job = job_queue.latest_rebuild()
+    if job is None or job['id'] == applied_rebuild_id:
+        return
+    companies = read_rebuilt_catalog(job)
+    # Built off to the side and swapped in whole; the worker already
+    # saved the neighbour graph for this catalog
+    new_model = serving_recommendations.model.rebuilt(companies)
+    serving_recommendations.replace(new_model)
+    applied_rebuild_id = job['id']
+    print(f"Applied recommendation rebuild from job {job['id']} ({len(companies)} companies)")
+
+async def _watch_rebuilds(interval=1.0):
+    while True:
+        try:
+            await run_in_threadpool(_apply_finished_rebuilds)
+            # Take over the host's job workers if the process running them exited
+            job_workers.start()
+        except Exception as e:
+            print(f"Error watching background jobs: {e}")
+        await asyncio.sleep(interval)
+
+job_workers = JobWorkerPool(thread_budget.job_workers)
+rebuild_watcher = None
+
+@app.on_event("startup")
+async def start_job_workers():
+    global rebuild_watcher
+    # Job workers fork from here and then switch to the batch budget
+    thread_budget.apply('interactive')
+    thread_budget.configure_executor()
+    # Only jobs whose lease expired; other workers' running jobs are left alone
+    requeued = job_queue.requeue_interrupted()
+    if requeued:
+        print(f"Requeued {requeued} interrupted jobs")
+    if job_workers.start():
+        print(f"Started {job_workers.n_workers} job workers")
+    rebuild_watcher = asyncio.create_task(_watch_rebuilds())
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    if rebuild_watcher is not None:
+        rebuild_watcher.cancel()
+    job_workers.stop()
+
+# ==================== WARM-UP AND READINESS ====================
+
+def _replay_startup_success(payload):
+    # Also times every tier of the deadline cascade on real inputs
+    startup_success_cascade.calibrate(payload['features'], repeats=3)
+    if payload['early_exit']:
+        startup_success_model.predict_success_early_exit(payload['features'], margin=payload['margin'])
+    else:
+        startup_success_model.predict_success(payload['features'])
+
+def _replay_profit(payload):
+    profit_prediction_model.predict_profit(payload['features'], interval_level=payload['interval_level'])
+    profit_prediction_model.get_spending_insights(payload['features'])
+
+# Replays a recorded payload through the same model calls as its endpoint
+WARMUP_HANDLERS = {
+    "recommendations": lambda payload: _recommendation_response(IndustryInput(**payload)),
+    "similar_companies": lambda payload: _similar_companies(payload['company_name'], payload['top_n']),
+    "startup_success": _replay_startup_success,
+    "profit": _replay_profit,
+}
+
+def _warmup_probes():
+    """One typical payload per endpoint, replayed even when nothing was recorded"""
+    return {
+        "recommendations": IndustryInput(industry="fintech").dict(),
+        "similar_companies": {'company_name': serving_recommendations.model.catalog.names[0].lower(), 'top_n': 6},
+        "startup_success": {
+            'features': dict.fromkeys(STARTUP_FEATURE_COLUMNS, 1), 'early_exit': False, 'margin': None
+        },
+        "profit": {
+            'features': {'RnD_Spend': 100000.0, 'Administration': 120000.0, 'Marketing_Spend': 250000.0, 'State': None},
+            'interval_level': 0.9
+        },
+    }
+
+async def _save_hot_keys(interval):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(hot_key_recorder.save)
+        except Exception as e:
+            print(f"Error saving hot keys: {e}")
+
+hot_key_saver = None
+warm_up_task = None
+
+def _report_warm_up(task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Warm-up failed: {task.exception()}")
+
+@app.on_event("startup")
+async def start_warm_up():
+    global hot_key_saver, warm_up_task
+    # Replay in the background; /ready reports 503 until it finishes
+    warm_up_task = asyncio.create_task(run_in_threadpool(
+        warm_up.run, hot_key_recorder.top(), WARMUP_HANDLERS, _warmup_probes(), hot_key_recorder.recorded_volume()
+    ))
+    warm_up_task.add_done_callback(_report_warm_up)
+    hot_key_saver = asyncio.create_task(_save_hot_keys(float(os.getenv("HOT_KEYS_SAVE_SECONDS", "60"))))
+
+@app.on_event("shutdown")
+async def save_hot_keys():
+    if hot_key_saver is not None:
+        hot_key_saver.cancel()
+    hot_key_recorder.save()
+
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness probe: 503 until the start-up warm-up has finished
+    """
+    status = warm_up.status()
+    if not warm_up.ready:
+        return JSONResponse(status_code=503, content={"ready": False, "warmup": status})
+    return {
+        "ready": True,
+        "readiness_seconds": warm_up.finished_at - SERVICE_STARTED_AT,
+        "warmup": status
+    }
 
 # ==================== HEALTH CHECK ====================
 
@@ -133,6 +832,88 @@ async def health_check():
         }
     }
 
+# ==================== SERVICE STATISTICS ====================
+
+@app.get("/ai/stats", tags=["Health"])
+async def service_stats():
+    """
+    Runtime statistics of the AI service's caches and request coalescing
+    """
+    return {
+        "recommendation_query_cache": serving_recommendations.model.cache_stats(),
+        "single_flight": single_flight.stats(),
+        "startup_feature_store": startup_feature_store.stats(),
+        "jobs": job_queue.stats(),
+        "hot_keys": hot_key_recorder.stats(),
+        "deadline_cascade": startup_success_cascade.stats(),
+        "thread_budget": thread_budget.stats()
+    }
+
+# ==================== INPUT DRIFT ====================
+
+@app.get("/ai/drift", tags=["Health"])
+async def input_drift(
+    model: Optional[Literal["startup_success", "profit"]] = Query(None, description="Only this model's inputs"),
+    histograms: bool = Query(True, description="Include per-feature histograms")
+):
+    """
+    Live input statistics per feature against the training data: mean and
+    standard deviation, out-of-range counts and the population stability index
+    """
+    names = [model] if model else list(drift_monitors)
+    snapshots = await run_in_threadpool(
+        lambda: {name: drift_monitors[name].snapshot(histograms=histograms) for name in names}
+    )
+    return {"success": True, "models": snapshots}
+
+@app.post("/admin/drift/reset", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def reset_input_drift():
+    """
+    Start the input statistics afresh, e.g. after a client release
+    """
+    for monitor in drift_monitors.values():
+        monitor.reset()
+    return {"success": True}
+
+# ==================== PROFILING ====================
+
+class ProfileInput(BaseModel):
+    seconds: float = Field(10.0, gt=0, le=120, description="Sample for at most this long")
+    requests: Optional[int] = Field(None, ge=1, description="Stop earlier once this many requests completed")
+    interval_ms: float = Field(5.0, ge=1, le=1000, description="Milliseconds between samples")
+    include_idle: bool = Field(False, description="Keep stacks of threads that are only waiting")
+    format: Literal["collapsed", "flamegraph"] = Field("collapsed", description="Collapsed stack lines or a flame-graph tree")
+
+@app.post("/admin/profile", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def profile_service(input_data: ProfileInput):
+    """
+    Sample every thread's stack for a while and return the aggregated stacks
+    """
+    try:
+        stack_sampler.start(
+            seconds=input_data.seconds,
+            max_requests=input_data.requests,
+            interval=input_data.interval_ms / 1000,
+            include_idle=input_data.include_idle
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    # Let traffic flow while the sampler thread runs
+    while stack_sampler.running:
+        await asyncio.sleep(0.05)
+    stack_sampler.stop()
+    
+    if input_data.format == "collapsed":
+        return PlainTextResponse(stack_sampler.collapsed_text())
+    results = stack_sampler.results()
+    return {
+        "samples": results['samples'],
+        "requests": results['requests'],
+        "duration_seconds": results['duration_seconds'],
+        "flamegraph": flame_graph(results['collapsed'])
+    }
+
 # ==================== ROOT ENDPOINT ====================
 
 @app.get("/", tags=["Root"])
@@ -145,9 +926,21 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "recommendations": "/ai/recommendations",
+            "batch_recommendations": "/ai/recommendations/batch",
+            "similar_companies": "/ai/similar-companies",
             "startup_success": "/ai/predict-startup-success",
+            "batch_startup_success": "/ai/predict-startup-success/batch",
+            "startup_success_by_id": "/ai/predict-startup-success/by-id",
+            "startup_feature_store": "/ai/feature-store/startups",
             "profit_prediction": "/ai/predict-profit",
+            "batch_profit_prediction": "/ai/predict-profit/batch",
+            "portfolio": "/ai/portfolio/analyze",
+            "profit_observations": "/ai/profit/observations",
+            "jobs": "/ai/jobs",
             "health": "/health",
+            "ready": "/ready",
+            "stats": "/ai/stats",
+            "drift": "/ai/drift",
             "docs": "/docs"
         }
     }
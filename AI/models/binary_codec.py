@@ -0,0 +1,106 @@
+"""
+Compact binary encodings for batch requests and responses.
+
+JSON batches spend much of their time naming every field of every row. The
+float matrix format sends the bare matrix instead: a 12-byte header
+(magic b"SFM1", uint32 rows, uint32 columns) followed by rows x columns
+little-endian float32 values, row-major. The column order is fixed by the
+endpoint's schema. numpy reads such a body without copying and writes a
+result array the same way.
+
+msgpack is supported as well when the optional msgpack package is installed.
+"""
+
+import struct
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FLOAT_MATRIX_MEDIA_TYPE = "application/x-startflow-f32"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+_MAGIC = b"SFM1"
+_HEADER = struct.Struct("<4sII")
+
+
+def encode_matrix(array):
+    """
+    Encode a 1-D or 2-D array as a float matrix body
+
+    Args:
+        array (array-like): Values; a 1-D array becomes a single column
+
+    Returns:
+        bytes: Header followed by little-endian float32 values
+    """
+    array = np.asarray(array, dtype='<f4')
+    if array.ndim == 1:
+        array = array[:, None]
+    rows, columns = array.shape
+    return _HEADER.pack(_MAGIC, rows, columns) + np.ascontiguousarray(array).tobytes()
+
+
+def _checked_rows(X):
+    """Reject matrices the models cannot score: no rows, NaN or infinity"""
+    if X.shape[0] < 1:
+        raise ValueError("Expected at least one row")
+    if not np.isfinite(X).all():
+        raise ValueError("Values must be finite numbers")
+    return X
+
+
+def decode_matrix(body, n_columns=None):
+    """
+    Decode a float matrix body
+
+    Args:
+        body (bytes): Encoded matrix
+        n_columns (int, optional): Column count the schema requires
+
+    Returns:
+        np.ndarray: Shape (rows, columns), float64
+
+    Raises:
+        ValueError: If the body is malformed, has the wrong column count,
+            no rows or non-finite values
+    """
+    if len(body) < _HEADER.size:
+        raise ValueError("Body is shorter than the matrix header")
+    magic, rows, columns = _HEADER.unpack_from(body)
+    if magic != _MAGIC:
+        raise ValueError("Body is not a float matrix")
+    if n_columns is not None and columns != n_columns:
+        raise ValueError(f"Expected {n_columns} columns, got {columns}")
+    if len(body) != _HEADER.size + rows * columns * 4:
+        raise ValueError(f"Body length does not match {rows} x {columns} float32 values")
+    values = np.frombuffer(body, dtype='<f4', offset=_HEADER.size)
+    return _checked_rows(values.reshape(rows, columns).astype(np.float64))
+
+
+def msgpack_available():
+    return msgpack is not None
+
+
+def decode_msgpack(body):
+    if msgpack is None:
+        raise ValueError("msgpack is not installed")
+    return msgpack.unpackb(body)
+
+
+def decode_msgpack_matrix(body, n_columns=None):
+    """Decode a msgpack {"rows": [[...], ...]} body into a float64 matrix"""
+    X = np.asarray(decode_msgpack(body)['rows'], dtype=np.float64)
+    if X.ndim != 2 or (n_columns is not None and X.shape[1] != n_columns):
+        raise ValueError(f"Expected rows of {n_columns} values")
+    return _checked_rows(X)
+
+
+def encode_msgpack(payload):
+    """Encode a payload, turning numpy arrays into lists"""
+    if msgpack is None:
+        raise ValueError("msgpack is not installed")
+    return msgpack.packb(payload, default=lambda value: value.tolist() if isinstance(value, (np.ndarray, np.generic)) else value)
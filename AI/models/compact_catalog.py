@@ -0,0 +1,185 @@
+"""
+Memory-compact column store for the recommendation catalog.
+
+An object-dtype DataFrame keeps one Python str per cell, about 50-60 bytes
+of object overhead before the text itself, plus an 8-byte pointer. This store
+keeps instead:
+
+- company names in one contiguous UTF-8 buffer with an offsets array,
+- Industry, Market Size and the Funding Amount text as categorical codes
+  over their distinct values, with code -1 for a missing value (None or
+  NaN), which reads back as None,
+- parsed funding in USD as float64,
+- 64-bit hashes of the lowercased names, sorted, for name lookups.
+
+Rows are turned into dicts only when they are returned, so a request
+materializes its top-k rows and nothing else.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _smallest_int_dtype(max_value):
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _hash_strings(values):
+    return pd.util.hash_array(np.asarray(values, dtype=object), categorize=False)
+
+
+class StringColumn:
+    def __init__(self, values):
+        """
+        Args:
+            values (iterable): Strings, stored as one UTF-8 buffer
+        """
+        encoded = [value.encode('utf-8') for value in values]
+        lengths = np.fromiter((len(value) for value in encoded), dtype=np.int64, count=len(encoded))
+        total = int(lengths.sum())
+        offsets_dtype = np.uint32 if total <= np.iinfo(np.uint32).max else np.int64
+        self.offsets = np.zeros(len(encoded) + 1, dtype=offsets_dtype)
+        np.cumsum(lengths, out=self.offsets[1:], dtype=offsets_dtype)
+        self.buffer = b"".join(encoded)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]].decode('utf-8')
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+    def take(self, rows):
+        return [self[row] for row in rows]
+
+    @property
+    def nbytes(self):
+        return len(self.buffer) + self.offsets.nbytes
+
+
+class CategoricalColumn:
+    def __init__(self, values):
+        """
+        Args:
+            values (iterable): Strings, stored as codes into their distinct
+                values; None and NaN get code -1 and read back as None
+        """
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        self.values = [str(value) for value in uniques]
+        # Code -1 indexes the trailing None, so missing values never read as the last category
+        self._lookup = self.values + [None]
+        self.codes = codes.astype(_smallest_int_dtype(max(len(self.values) - 1, 0)))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self._lookup[self.codes[row]]
+
+    def __iter__(self):
+        for code in self.codes:
+            yield self._lookup[code]
+
+    def take(self, rows):
+        return [self._lookup[code] for code in self.codes[rows]]
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + sum(len(value.encode('utf-8')) for value in self.values)
+
+
+class CompactCatalog:
+    # Output column -> attribute holding it
+    COLUMNS = {
+        'Company Name': 'names',
+        'Industry': 'industries',
+        'Funding Amount': 'funding_text',
+        'Market Size': 'market_sizes',
+    }
+
+    def __init__(self, records, parse_funding):
+        """
+        Build the store from catalog records
+
+        Args:
+            records (list): Dicts with every column in COLUMNS; other keys
+                are dropped
+            parse_funding (callable): Funding Amount text -> USD
+        """
+        self.names = StringColumn(record['Company Name'] for record in records)
+        self.industries = CategoricalColumn([record['Industry'] for record in records])
+        self.market_sizes = CategoricalColumn([record['Market Size'] for record in records])
+        self.funding_text = CategoricalColumn([record['Funding Amount'] for record in records])
+        # Parse each distinct amount once; a missing amount (code -1) is NaN
+        parsed = np.array([parse_funding(value) for value in self.funding_text.values] + [np.nan], dtype=float)
+        self.funding_usd = parsed[self.funding_text.codes] if len(records) else np.zeros(0)
+
+        # Stable sort, so equal names keep catalog order
+        hashes = _hash_strings([name.lower() for name in self.names])
+        self.name_order = np.argsort(hashes, kind='stable')
+        self.name_hashes = hashes[self.name_order]
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, name):
+        """
+        Row of a company, matching the name case-insensitively
+
+        Returns:
+            int or None: The last row with that name, None if there is none
+        """
+        key = name.lower()
+        digest = _hash_strings([key])[0]
+        low = np.searchsorted(self.name_hashes, digest, side='left')
+        high = np.searchsorted(self.name_hashes, digest, side='right')
+        found = None
+        for row in self.name_order[low:high]:
+            if self.names[row].lower() == key:
+                found = int(row)
+        return found
+
+    def combined_texts(self):
+        """Industry and company name per row, the text the TF-IDF index is built on"""
+        for row in range(len(self)):
+            yield f"{self.industries[row] or ''} {self.names[row]}"
+
+    def records(self, rows=None, columns=None):
+        """
+        Materialize rows as dicts
+
+        Args:
+            rows (iterable, optional): Rows in output order; all rows if omitted
+            columns (list, optional): Output columns; all of COLUMNS if omitted
+
+        Returns:
+            list: One dict per row
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.intp)
+        columns = list(self.COLUMNS) if columns is None else columns
+        values = [getattr(self, self.COLUMNS[column]).take(rows) for column in columns]
+        return [dict(zip(columns, row_values)) for row_values in zip(*values)]
+
+    def memory_usage(self):
+        """
+        Bytes held per component
+
+        Returns:
+            dict: Component -> bytes, with the sum under 'total'
+        """
+        usage = {
+            'names': self.names.nbytes,
+            'industries': self.industries.nbytes,
+            'market_sizes': self.market_sizes.nbytes,
+            'funding_text': self.funding_text.nbytes,
+            'funding_usd': self.funding_usd.nbytes,
+            'name_index': self.name_hashes.nbytes + self.name_order.nbytes,
+        }
+        usage['total'] = sum(usage.values())
+        return usage
@@ -0,0 +1,271 @@
+"""
+Compact serving representation of the startup success random forest.
+
+The pickled RandomForestClassifier keeps every sklearn tree object with
+float64 thresholds, per-node class counts, impurities and sample counts that
+are only needed during training. CompactForest keeps just what prediction
+reads, in the narrowest dtypes that hold it:
+
+- thresholds as float32, rounded down so float32 features compare exactly as
+  sklearn compares them against the float64 originals
+- child and feature indexes as the smallest unsigned integer type that fits
+- leaf success probabilities optionally quantized to 8 or 16 bits
+- optionally, sibling leaves with equal (quantized) values merged into their
+  parent, repeatedly, which never changes a prediction
+
+All trees share one set of node arrays and leaves point to themselves, so
+prediction advances every unfinished (row, tree) pair by one level per step
+with no per-tree Python loop.
+
+Usage (from the AI directory):
+    python -m models.compact_forest --quantize-bits 8
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import joblib
+import numpy as np
+
+COMPACT_MODEL_PATH = "models/startup_success_compact.pkl"
+
+
+def _narrowest_uint(max_value):
+    """Smallest unsigned integer dtype that can hold max_value"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def _threshold_float32(threshold):
+    """Largest float32 not above each float64 threshold"""
+    rounded = threshold.astype(np.float32)
+    too_high = rounded.astype(np.float64) > threshold
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+class CompactForest:
+    def __init__(self, forest, quantize_bits=8, merge_subtrees=True):
+        """
+        Compact a fitted binary RandomForestClassifier
+
+        Args:
+            forest (RandomForestClassifier): Fitted forest with two classes
+            quantize_bits (int, optional): 8 or 16 to quantize leaf
+                probabilities, None to keep them as float32
+            merge_subtrees (bool): Collapse subtrees whose leaves all carry
+                the same stored value
+        """
+        if len(forest.classes_) != 2:
+            raise ValueError("CompactForest requires a binary classifier")
+        if quantize_bits not in (None, 8, 16):
+            raise ValueError("quantize_bits must be 8, 16 or None")
+
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.n_trees = len(forest.estimators_)
+        # Fingerprint of the forest and scaler files this was built from, set on export
+        self.source_fingerprint = None
+        self.quantize_bits = quantize_bits
+        self.value_scale = None if quantize_bits is None else float(2 ** quantize_bits - 1)
+
+        trees = [self._compact_tree(estimator.tree_, merge_subtrees)
+                 for estimator in forest.estimators_]
+
+        sizes = [len(tree[0]) for tree in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        node_dtype = _narrowest_uint(sum(sizes) - 1)
+
+        self.roots = offsets.astype(node_dtype)
+        self.left = np.concatenate([tree[0] + offset for tree, offset in zip(trees, offsets)]).astype(node_dtype)
+        self.right = np.concatenate([tree[1] + offset for tree, offset in zip(trees, offsets)]).astype(node_dtype)
+        self.feature = np.concatenate([tree[2] for tree in trees]).astype(_narrowest_uint(self.n_features_in_ - 1))
+        self.threshold = np.concatenate([tree[3] for tree in trees])
+        self.value = np.concatenate([tree[4] for tree in trees])
+        self.max_depth = max(tree[5] for tree in trees)
+
+    def _quantize(self, probability):
+        if self.value_scale is None:
+            return probability.astype(np.float32)
+        dtype = np.uint8 if self.quantize_bits == 8 else np.uint16
+        return np.rint(probability * self.value_scale).astype(dtype)
+
+    def _compact_tree(self, tree, merge_subtrees):
+        """Renumber one sklearn tree into dense arrays, dropping merged nodes"""
+        counts = tree.value[:, 0, :]
+        stored = self._quantize(counts[:, 1] / counts.sum(axis=1))
+        left_in, right_in = tree.children_left, tree.children_right
+
+        # Post-order pass: a node whose children are equal-valued leaves
+        # becomes a leaf itself
+        is_leaf = left_in == -1
+        if merge_subtrees:
+            stack = [(0, False)]
+            while stack:
+                node, children_done = stack.pop()
+                if is_leaf[node]:
+                    continue
+                if not children_done:
+                    stack.append((node, True))
+                    stack.append((left_in[node], False))
+                    stack.append((right_in[node], False))
+                    continue
+                left_child, right_child = left_in[node], right_in[node]
+                if is_leaf[left_child] and is_leaf[right_child] and stored[left_child] == stored[right_child]:
+                    is_leaf[node] = True
+                    stored[node] = stored[left_child]
+
+        # Pre-order renumbering of the reachable nodes
+        order, depth = [], {0: 0}
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            if not is_leaf[node]:
+                for child in (right_in[node], left_in[node]):
+                    depth[child] = depth[node] + 1
+                    stack.append(child)
+        new_index = {old: new for new, old in enumerate(order)}
+
+        n_nodes = len(order)
+        left = np.arange(n_nodes)
+        right = np.arange(n_nodes)
+        feature = np.zeros(n_nodes, dtype=np.int64)
+        for new, old in enumerate(order):
+            if not is_leaf[old]:
+                left[new] = new_index[left_in[old]]
+                right[new] = new_index[right_in[old]]
+                feature[new] = tree.feature[old]
+
+        order = np.array(order)
+        threshold = _threshold_float32(tree.threshold[order])
+        # Leaves never test their threshold; keep them uniform
+        threshold[is_leaf[order]] = 0
+        return left, right, feature, threshold, stored[order], max(depth.values())
+
+    @property
+    def nbytes(self):
+        """Bytes held by the node arrays"""
+        return sum(array.nbytes for array in (
+            self.roots, self.left, self.right, self.feature, self.threshold, self.value
+        ))
+
+    def predict_proba(self, X):
+        """
+        Class probabilities, matching RandomForestClassifier.predict_proba
+
+        Args:
+            X (np.ndarray): Scaled feature matrix
+
+        Returns:
+            np.ndarray: Shape (n_rows, 2)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        rows = np.repeat(np.arange(n_rows), self.n_trees)
+        nodes = np.tile(self.roots, n_rows).astype(np.intp)
+
+        # Advance only the pairs still at an internal node
+        active = np.arange(len(nodes))
+        for _ in range(self.max_depth):
+            current = nodes[active]
+            go_left = X[rows[active], self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+            still_internal = self.left[current] != current
+            active = active[still_internal]
+            if not len(active):
+                break
+
+        values = self.value[nodes].reshape(n_rows, self.n_trees).astype(np.float64)
+        success = values.mean(axis=1)
+        if self.value_scale is not None:
+            success /= self.value_scale
+        return np.column_stack([1.0 - success, success])
+
+    def predict(self, X):
+        """Predicted classes, matching RandomForestClassifier.predict"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _load_rss_kib(path):
+    """Resident memory added by loading a pickle, measured in a fresh process"""
+    script = (
+        "import joblib, sklearn.ensemble, numpy\n"
+        "def rss():\n"
+        "    with open('/proc/self/status') as f:\n"
+        "        return next(int(l.split()[1]) for l in f if l.startswith('VmRSS'))\n"
+        "before = rss()\n"
+        f"model = joblib.load({path!r})\n"
+        "print(rss() - before)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True)
+    try:
+        return int(result.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _latency_us(model, X, repeats=200):
+    """Median single-row and per-row batch latency in microseconds"""
+    single = []
+    for i in range(repeats):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.predict_proba(X)
+    batch = time.perf_counter() - start
+    return float(np.median(single) * 1e6), float(batch / len(X) * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the startup success forest")
+    parser.add_argument('--quantize-bits', type=int, choices=[8, 16], default=8)
+    parser.add_argument('--no-quantize', action='store_true', help="keep float32 leaf values")
+    parser.add_argument('--no-merge', action='store_true', help="keep redundant subtrees")
+    args = parser.parse_args()
+
+    # Pickle the class under its importable name, not __main__
+    from models import compact_forest
+    from models.startup_success_model import FEATURE_COLUMNS, startup_success_model
+
+    forest = startup_success_model.model
+    compact = compact_forest.CompactForest(
+        forest,
+        quantize_bits=None if args.no_quantize else args.quantize_bits,
+        merge_subtrees=not args.no_merge,
+    )
+    compact.source_fingerprint = startup_success_model.forest_fingerprint
+    joblib.dump(compact, COMPACT_MODEL_PATH)
+
+    df = startup_success_model._generate_sample_data()
+    X = startup_success_model.scaler.transform(df[FEATURE_COLUMNS])
+    reference = forest.predict_proba(X)[:, 1]
+    compacted = compact.predict_proba(X)[:, 1]
+
+    forest_nodes = sum(estimator.tree_.node_count for estimator in forest.estimators_)
+    forest_single, forest_batch = _latency_us(forest, X)
+    compact_single, compact_batch = _latency_us(compact, X)
+
+    print(f"{'':<22}{'forest':>14}{'compact':>14}")
+    print(f"{'nodes':<22}{forest_nodes:>14,}{len(compact.left):>14,}")
+    print(f"{'size on disk (KiB)':<22}{os.path.getsize(startup_success_model.model_path) / 1024:>14,.1f}"
+          f"{os.path.getsize(COMPACT_MODEL_PATH) / 1024:>14,.1f}")
+    print(f"{'RSS after load (KiB)':<22}{_load_rss_kib(startup_success_model.model_path) or 0:>14,}"
+          f"{_load_rss_kib(COMPACT_MODEL_PATH) or 0:>14,}")
+    print(f"{'single row (us)':<22}{forest_single:>14.1f}{compact_single:>14.1f}")
+    print(f"{'batch (us/row)':<22}{forest_batch:>14.2f}{compact_batch:>14.2f}")
+    print(f"Max |probability error|: {np.abs(reference - compacted).max():.5f}")
+    print(f"Class agreement: {((reference > 0.5) == (compacted > 0.5)).mean() * 100:.2f}%")
+    print(f"Compact forest saved to {COMPACT_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
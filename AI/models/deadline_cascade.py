@@ -0,0 +1,188 @@
+"""
+Deadline-aware startup success inference.
+
+A request may carry a time budget. The cascade answers with the most accurate
+tier whose expected latency fits the time remaining:
+
+    full        the serving model (forest by default)
+    cache       an earlier full answer for the same features
+    early_exit  the forest, stopping once the vote is clear by a margin
+    surrogate   the distilled logistic regression, one dot product
+
+A cached full answer is as accurate as a fresh one, so it is preferred to
+the approximate tiers whenever the full model does not fit. Expected latency
+per tier is a running mean plus two mean absolute deviations of its observed
+latencies. Tiers skipped for lack of time drift back towards their
+calibrated latency, so the full model is tried again once load drops. The
+tier that answered and every missed deadline are counted, so heavy load
+shows up as degraded quality rather than timeouts.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from models.startup_success_model import FEATURE_COLUMNS
+
+TIERS = ('full', 'cache', 'early_exit', 'surrogate')
+
+
+class LatencyEstimate:
+    def __init__(self, initial, alpha=0.1):
+        """
+        Args:
+            initial (float): Seconds assumed before any observation
+            alpha (float): Weight of each new observation
+        """
+        self.mean = initial
+        self.deviation = initial / 2
+        self.alpha = alpha
+        self.baseline = initial
+
+    def observe(self, seconds):
+        self.deviation += self.alpha * (abs(seconds - self.mean) - self.deviation)
+        self.mean += self.alpha * (seconds - self.mean)
+
+    def relax(self):
+        """Move towards the unloaded baseline while the tier is skipped"""
+        self.observe(self.baseline)
+
+    @property
+    def expected(self):
+        return self.mean + 2 * self.deviation
+
+
+class DeadlineCascade:
+    def __init__(self, model, cache_size=10000, early_exit_margin=0.2):
+        """
+        Args:
+            model (StartupSuccessModel): Model providing every tier
+            cache_size (int): Full answers kept, least recently used evicted
+            early_exit_margin (float): Margin of the early-exit tier
+        """
+        self.model = model
+        self.cache_size = cache_size
+        self.early_exit_margin = early_exit_margin
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.estimates = {
+            'full': LatencyEstimate(0.02),
+            'cache': LatencyEstimate(0.00001),
+            'early_exit': LatencyEstimate(0.002),
+            'surrogate': LatencyEstimate(0.0001),
+        }
+        self.answered = dict.fromkeys(TIERS, 0)
+        self.missed = dict.fromkeys(TIERS, 0)
+        self.requests = 0
+
+    def calibrate(self, features, repeats=5):
+        """Seed the latency estimates and baselines by timing each computed tier"""
+        for tier in ('full', 'early_exit', 'surrogate'):
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                self._compute(tier, features)
+                timings.append(time.perf_counter() - start)
+            estimate = self.estimates[tier]
+            for seconds in timings:
+                estimate.observe(seconds)
+            estimate.baseline = min(timings)
+
+    def _compute(self, tier, features):
+        if tier == 'full':
+            return self.model.predict_success(features)
+        if tier == 'early_exit':
+            return self.model.predict_success_early_exit(features, margin=self.early_exit_margin)
+        return self.model.predict_success_surrogate(features)
+
+    @staticmethod
+    def _cache_key(features):
+        return tuple(float(features[column]) for column in FEATURE_COLUMNS)
+
+    def _cached(self, key):
+        with self.lock:
+            prediction = self.cache.get(key)
+            if prediction is not None:
+                self.cache.move_to_end(key)
+            return prediction
+
+    def _store(self, key, prediction):
+        with self.lock:
+            self.cache[key] = prediction
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def choose_tier(self, remaining, has_cached):
+        """
+        Most accurate tier expected to finish within the remaining seconds
+
+        The surrogate answers when nothing fits, since it is the cheapest
+        computed tier.
+        """
+        for tier in TIERS:
+            if tier == 'cache' and not has_cached:
+                continue
+            if self.estimates[tier].expected <= remaining:
+                return tier
+        return 'cache' if has_cached else 'surrogate'
+
+    def predict(self, features, deadline=None):
+        """
+        Predict startup success within a deadline
+
+        Args:
+            features (dict): Dictionary containing startup features
+            deadline (float, optional): time.perf_counter() value by which
+                the answer is due; None always uses the full model
+
+        Returns:
+            dict: Prediction result plus 'tier' and 'deadline_missed'
+        """
+        start = time.perf_counter()
+        key = self._cache_key(features)
+        cached = self._cached(key)
+        if deadline is None:
+            tier = 'full'
+        else:
+            tier = self.choose_tier(deadline - start, cached is not None)
+
+        if tier == 'cache':
+            prediction = dict(cached)
+        else:
+            prediction = self._compute(tier, features)
+            if tier == 'full' and 'error' not in prediction:
+                self._store(key, prediction)
+        finished = time.perf_counter()
+        self.estimates[tier].observe(finished - start)
+        for skipped in TIERS[:TIERS.index(tier)]:
+            if skipped != 'cache':
+                self.estimates[skipped].relax()
+
+        missed = deadline is not None and finished > deadline
+        with self.lock:
+            self.requests += 1
+            self.answered[tier] += 1
+            if missed:
+                self.missed[tier] += 1
+        return {**prediction, 'tier': tier, 'deadline_missed': missed}
+
+    def stats(self):
+        """Answers and deadline misses per tier, and the current latency estimates"""
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'answered': dict(self.answered),
+                'deadline_misses': dict(self.missed),
+                'expected_ms': {tier: estimate.expected * 1000 for tier, estimate in self.estimates.items()},
+                'cached_answers': len(self.cache)
+            }
+
+
+def _default_cascade():
+    from models.startup_success_model import startup_success_model
+    return DeadlineCascade(startup_success_model)
+
+
+# Global instance
+startup_success_cascade = _default_cascade()
@@ -0,0 +1,213 @@
+"""
+Streaming input-distribution monitoring for the prediction endpoints.
+
+Each monitor keeps, per feature and since it started:
+
+- a fixed-bin histogram over the training z-score range, whose two outer
+  bins count values below and above it (out of range),
+- the running count, mean and variance (Welford, merged batch by batch),
+- the minimum and maximum,
+- the population stability index (PSI) against the training histogram.
+
+Z-scores use the serving scaler's mean_ and scale_ captured at start-up, so
+everything is measured against the data the model was trained on.
+
+The request path only appends the row to a deque, which is thread-safe
+without a lock. Once enough rows are pending, the appending thread folds
+them into the statistics with a few vectorized numpy calls, but only if no
+other thread is already doing so; otherwise it returns at once. Snapshots
+fold in whatever is pending first.
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Smoothing for empty bins in the PSI
+PSI_EPSILON = 1e-4
+
+
+class FeatureDriftMonitor:
+    def __init__(self, columns, mean, scale, reference=None, bins=20, z_limit=4.0, flush_every=256):
+        """
+        Args:
+            columns (list): Feature names, in the order rows are given
+            mean (array): Training mean per feature (the scaler's mean_)
+            scale (array): Training standard deviation per feature (scale_)
+            reference (array, optional): Training rows, binned as the
+                baseline of the PSI
+            bins (int): Histogram bins between -z_limit and +z_limit
+            z_limit (float): Z-score beyond which a value is out of range
+            flush_every (int): Pending requests that trigger a fold
+        """
+        self.columns = list(columns)
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.bins = bins
+        self.z_limit = z_limit
+        self.flush_every = flush_every
+        self.pending = deque()
+        self.flush_lock = threading.Lock()
+        self.reference_counts = None
+        if reference is not None:
+            self.reference_counts = self._histogram(np.asarray(reference, dtype=float))
+        self.reset()
+
+    def reset(self):
+        """Forget everything observed so far"""
+        with self.flush_lock:
+            self.pending.clear()
+            n_features = len(self.columns)
+            self.started_at = time.time()
+            self.count = 0
+            self.running_mean = np.zeros(n_features)
+            self.m2 = np.zeros(n_features)
+            self.minimum = np.full(n_features, np.inf)
+            self.maximum = np.full(n_features, -np.inf)
+            self.counts = np.zeros((n_features, self.bins + 2), dtype=np.int64)
+
+    def bin_edges(self, feature):
+        """Inner bin edges of a feature, in its raw units"""
+        z_edges = np.linspace(-self.z_limit, self.z_limit, self.bins + 1)
+        return self.mean[feature] + z_edges * self.scale[feature]
+
+    def _histogram(self, X):
+        """Bin counts per feature; bin 0 and the last bin are out of range"""
+        z = (X - self.mean) / self.scale
+        width = 2 * self.z_limit / self.bins
+        index = np.floor((z + self.z_limit) / width).astype(np.int64) + 1
+        np.clip(index, 0, self.bins + 1, out=index)
+        n_features = len(self.columns)
+        flat = index + np.arange(n_features) * (self.bins + 2)
+        return np.bincount(flat.ravel(), minlength=n_features * (self.bins + 2)).reshape(n_features, self.bins + 2)
+
+    def observe_row(self, features):
+        """Queue one request's features (dict keyed by column); O(1)"""
+        self.pending.append(tuple(features[column] for column in self.columns))
+        if len(self.pending) >= self.flush_every:
+            self.flush(wait=False)
+
+    def observe_matrix(self, X):
+        """Queue a batch of rows in column order; O(1)"""
+        self.pending.append(np.asarray(X, dtype=float))
+        if len(self.pending) >= self.flush_every:
+            self.flush(wait=False)
+
+    def flush(self, wait=True):
+        """
+        Fold pending rows into the statistics
+
+        Args:
+            wait (bool): Wait for a fold already running in another thread;
+                when False, leave the rows to that thread and return
+        """
+        if not self.flush_lock.acquire(blocking=wait):
+            return
+        try:
+            rows, matrices = [], []
+            while self.pending:
+                item = self.pending.popleft()
+                (matrices if isinstance(item, np.ndarray) else rows).append(item)
+            if rows:
+                matrices.append(np.array(rows, dtype=float))
+            if matrices:
+                self._update(np.vstack(matrices))
+        finally:
+            self.flush_lock.release()
+
+    def _update(self, X):
+        X = X[np.isfinite(X).all(axis=1)]
+        if not len(X):
+            return
+        # Chan et al.'s merge of the batch moments into the running ones
+        n_batch = len(X)
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n_batch
+        delta = batch_mean - self.running_mean
+        self.running_mean = self.running_mean + delta * n_batch / total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.count * n_batch / total
+        self.count = total
+        np.minimum(self.minimum, X.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, X.max(axis=0), out=self.maximum)
+        self.counts += self._histogram(X)
+
+    def _psi(self, feature):
+        if self.reference_counts is None or not self.count:
+            return None
+        expected = self.reference_counts[feature] / self.reference_counts[feature].sum() + PSI_EPSILON
+        actual = self.counts[feature] / self.count + PSI_EPSILON
+        return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+    def snapshot(self, histograms=True):
+        """
+        Statistics per feature since the monitor started
+
+        Args:
+            histograms (bool): Include bin edges and counts
+
+        Returns:
+            dict: Row count, start time and one entry per feature
+        """
+        self.flush()
+        with self.flush_lock:
+            features = {}
+            for feature, column in enumerate(self.columns):
+                observed = self.count > 0
+                std = float(np.sqrt(self.m2[feature] / self.count)) if observed else None
+                below, above = int(self.counts[feature, 0]), int(self.counts[feature, -1])
+                entry = {
+                    'mean': float(self.running_mean[feature]) if observed else None,
+                    'std': std,
+                    'min': float(self.minimum[feature]) if observed else None,
+                    'max': float(self.maximum[feature]) if observed else None,
+                    'training_mean': float(self.mean[feature]),
+                    'training_std': float(self.scale[feature]),
+                    # Shift of the live mean, in training standard deviations
+                    'mean_shift': float((self.running_mean[feature] - self.mean[feature]) / self.scale[feature]) if observed else None,
+                    'out_of_range': {
+                        'below': below,
+                        'above': above,
+                        'rate': (below + above) / self.count if observed else 0.0
+                    },
+                    'psi': self._psi(feature)
+                }
+                if histograms:
+                    entry['histogram'] = {
+                        'edges': self.bin_edges(feature).tolist(),
+                        'counts': self.counts[feature].tolist()
+                    }
+                features[column] = entry
+            return {
+                'rows': int(self.count),
+                'since': self.started_at,
+                'z_limit': self.z_limit,
+                'features': features
+            }
+
+
+def _default_monitors():
+    from models.startup_success_model import FEATURE_COLUMNS as SUCCESS_COLUMNS, startup_success_model
+    from models.profit_prediction_model import FEATURE_COLUMNS as PROFIT_COLUMNS, profit_prediction_model
+    from models.profit_training import load_profit_data, PROFIT_DATA_PATH
+
+    success_scaler = startup_success_model.serving_scaler
+    success_reference = startup_success_model._generate_sample_data()[SUCCESS_COLUMNS].to_numpy(dtype=float)
+    # The profit scaler also covers the state indicators, which come after the spending
+    profit_scaler = profit_prediction_model.scaler
+    profit_data = load_profit_data(profit_prediction_model.meta.get('data_path', PROFIT_DATA_PATH))
+    return {
+        'startup_success': FeatureDriftMonitor(
+            SUCCESS_COLUMNS, success_scaler.mean_, success_scaler.scale_, reference=success_reference
+        ),
+        'profit': FeatureDriftMonitor(
+            PROFIT_COLUMNS, profit_scaler.mean_[:len(PROFIT_COLUMNS)], profit_scaler.scale_[:len(PROFIT_COLUMNS)],
+            reference=profit_data[PROFIT_COLUMNS].to_numpy(dtype=float)
+        ),
+    }
+
+
+# Global instance
+drift_monitors = _default_monitors()
@@ -0,0 +1,142 @@
+"""
+Early-exit evaluation for the startup success random forest.
+
+The forest averages per-tree class probabilities and predicts success when
+the average exceeds 0.5. Walking the trees one by one, the running sum of
+success probabilities bounds the final average: once the remaining trees can
+no longer move it across 0.5 the class is decided and evaluation stops.
+Trees are visited in an order chosen offline so that the ones that agree
+most strongly with the full forest come first.
+"""
+
+import numpy as np
+
+
+class EarlyExitForest:
+    def __init__(self, forest, tree_order=None):
+        """
+        Flatten a fitted binary RandomForestClassifier for row-wise traversal
+
+        Args:
+            forest (RandomForestClassifier): Fitted forest with two classes
+            tree_order (array-like, optional): Evaluation order of the trees
+        """
+        if len(forest.classes_) != 2:
+            raise ValueError("Early exit requires a binary classifier")
+
+        self.classes_ = forest.classes_
+        self.n_trees = len(forest.estimators_)
+        self.trees = [self._flatten_tree(estimator.tree_) for estimator in forest.estimators_]
+        self.tree_order = (
+            np.arange(self.n_trees) if tree_order is None else np.asarray(tree_order)
+        )
+        if sorted(self.tree_order.tolist()) != list(range(self.n_trees)):
+            raise ValueError("tree_order must be a permutation of the forest's trees")
+
+    @staticmethod
+    def _flatten_tree(tree):
+        """Keep only what traversal needs, as plain lists for fast indexing"""
+        value = tree.value[:, 0, :]
+        leaf_probability = value[:, 1] / value.sum(axis=1)
+        return (
+            tree.children_left.tolist(),
+            tree.children_right.tolist(),
+            tree.feature.tolist(),
+            tree.threshold.tolist(),
+            leaf_probability.tolist(),
+        )
+
+    @staticmethod
+    def _tree_probability(tree, row):
+        """Success probability of one tree for one row"""
+        left, right, feature, threshold, leaf_probability = tree
+        node = 0
+        while left[node] != -1:
+            if row[feature[node]] <= threshold[node]:
+                node = left[node]
+            else:
+                node = right[node]
+        return leaf_probability[node]
+
+    def tree_probabilities(self, X):
+        """
+        Per-tree success probabilities in the forest's original tree order
+
+        Args:
+            X (np.ndarray): Scaled feature matrix
+
+        Returns:
+            np.ndarray: Shape (n_rows, n_trees)
+        """
+        # sklearn compares float32 features against the thresholds
+        rows = np.asarray(X, dtype=np.float32).astype(float).tolist()
+        return np.array([
+            [self._tree_probability(tree, row) for tree in self.trees]
+            for row in rows
+        ])
+
+    def optimize_order(self, X):
+        """
+        Choose the evaluation order offline from calibration rows
+
+        Trees are ranked by how strongly, on average, they push towards the
+        full forest's decision, so confident agreement accumulates first and
+        the exit test fires early.
+
+        Args:
+            X (np.ndarray): Scaled calibration rows
+
+        Returns:
+            np.ndarray: The new tree order
+        """
+        probabilities = self.tree_probabilities(X)
+        direction = np.where(probabilities.mean(axis=1) > 0.5, 1.0, -1.0)
+        support = ((probabilities - 0.5) * direction[:, None]).mean(axis=0)
+        # Stable sort keeps the result reproducible for equally useful trees
+        self.tree_order = np.argsort(-support, kind='stable')
+        return self.tree_order
+
+    def predict_row(self, row, margin=None, min_trees=1):
+        """
+        Evaluate trees until the class can no longer change
+
+        Args:
+            row (np.ndarray): One scaled feature vector
+            margin (float, optional): If set, additionally stop once at least
+                min_trees trees were evaluated and their average is at least
+                this far from 0.5. Trades probability accuracy for speed; the
+                default None only stops when the class is exactly decided.
+            min_trees (int): Minimum trees evaluated before a margin exit
+
+        Returns:
+            dict: Prediction, probability estimate, bounds and exit details
+        """
+        row = np.asarray(row, dtype=np.float32).astype(float).tolist()
+        n_trees = self.n_trees
+        half = n_trees / 2
+        total = 0.0
+        evaluated = 0
+
+        for index in self.tree_order:
+            total += self._tree_probability(self.trees[index], row)
+            evaluated += 1
+            remaining = n_trees - evaluated
+            # Success needs the full average strictly above 0.5
+            if total > half or total + remaining <= half:
+                break
+            if margin is not None and evaluated >= min_trees:
+                if abs(total / evaluated - 0.5) >= margin:
+                    break
+
+        success_probability = total / evaluated
+        prediction = self.classes_[1] if success_probability > 0.5 else self.classes_[0]
+        return {
+            'success_prediction': int(prediction),
+            'success_probability': float(success_probability),
+            'success_probability_bounds': (
+                float(total / n_trees),
+                float((total + n_trees - evaluated) / n_trees),
+            ),
+            'trees_evaluated': evaluated,
+            'early_exit': evaluated < n_trees,
+        }
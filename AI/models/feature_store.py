@@ -0,0 +1,224 @@
+"""
+Server-side startup feature store with a score cache, backed by SQLite.
+
+The backend upserts each startup's 15 success features once, keyed by its
+startup ID, and later scoring requests send only IDs. A row's version
+increases only when an upsert actually changes its features. Scores are
+cached per ID together with the feature version and the fingerprint of the
+model that produced them, so a cached score is reused until the features
+change or the serving model is retrained or replaced, even under the same
+name. Cache misses in a request are scored together in one model call.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+FEATURE_STORE_PATH = os.getenv("FEATURE_STORE_PATH", "data/startup_features.sqlite3")
+
+# SQLite caps the number of bound parameters per statement
+_ID_CHUNK = 500
+
+
+class StartupFeatureStore:
+    def __init__(self, feature_columns, path=FEATURE_STORE_PATH):
+        """
+        Open (and create if needed) the store
+
+        Args:
+            feature_columns (list): Feature names, in model column order
+            path (str): SQLite database file; ":memory:" for a private store
+        """
+        self.feature_columns = list(feature_columns)
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.reopen()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        columns = ", ".join(f'"{column}" REAL NOT NULL' for column in self.feature_columns)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS startup_features ("
+                f"startup_id TEXT PRIMARY KEY, {columns}, "
+                f"version INTEGER NOT NULL DEFAULT 1, updated_at REAL NOT NULL)"
+            )
+            score_columns = [row[1] for row in self.connection.execute("PRAGMA table_info(startup_scores)")]
+            if score_columns and 'model_fingerprint' not in score_columns:
+                # Scores cached by model name alone cannot be trusted; it is only a cache
+                self.connection.execute("DROP TABLE startup_scores")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS startup_scores ("
+                "startup_id TEXT PRIMARY KEY, feature_version INTEGER NOT NULL, "
+                "model_fingerprint TEXT NOT NULL, success_prediction INTEGER NOT NULL, "
+                "success_probability REAL NOT NULL, scored_at REAL NOT NULL)"
+            )
+
+    def reopen(self):
+        """Open a fresh connection and lock, e.g. in a forked worker process"""
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+
+    def upsert_many(self, records):
+        """
+        Insert or update startups in one transaction
+
+        Args:
+            records (list): Dicts with 'startup_id' and every feature column
+
+        Returns:
+            dict: Number of records written and of startups whose features changed
+        """
+        quoted = [f'"{column}"' for column in self.feature_columns]
+        changed_test = " OR ".join(f"{column} IS NOT excluded.{column}" for column in quoted)
+        statement = (
+            f"INSERT INTO startup_features (startup_id, {', '.join(quoted)}, updated_at) "
+            f"VALUES (?, {', '.join('?' for _ in quoted)}, ?) "
+            f"ON CONFLICT(startup_id) DO UPDATE SET "
+            f"{', '.join(f'{column} = excluded.{column}' for column in quoted)}, "
+            f"version = version + 1, updated_at = excluded.updated_at "
+            f"WHERE {changed_test}"
+        )
+        now = time.time()
+        rows = [
+            (str(record['startup_id']), *(float(record[column]) for column in self.feature_columns), now)
+            for record in records
+        ]
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(statement, rows)
+            changed = self.connection.total_changes - before
+        return {'upserted': len(rows), 'changed': changed}
+
+    def _fetch(self, table, columns, startup_ids):
+        """Rows of a table for the given IDs, keyed by ID"""
+        found = {}
+        for start in range(0, len(startup_ids), _ID_CHUNK):
+            chunk = startup_ids[start:start + _ID_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor = self.connection.execute(
+                f"SELECT startup_id, {columns} FROM {table} WHERE startup_id IN ({placeholders})", chunk
+            )
+            for row in cursor:
+                found[row[0]] = row[1:]
+        return found
+
+    def get_features(self, startup_ids):
+        """
+        Stored features for the given IDs
+
+        Returns:
+            dict: startup_id -> (version, feature tuple); unknown IDs are absent
+        """
+        columns = ", ".join(["version"] + [f'"{column}"' for column in self.feature_columns])
+        with self.lock:
+            rows = self._fetch("startup_features", columns, [str(i) for i in startup_ids])
+        return {startup_id: (row[0], row[1:]) for startup_id, row in rows.items()}
+
+    def score(self, startup_ids, predict_matrix, model_fingerprint):
+        """
+        Scores for stored startups, computing only stale or missing ones
+
+        Args:
+            startup_ids (list): Startup IDs to score
+            predict_matrix (callable): Maps a feature matrix to
+                (predictions, success_probabilities) arrays
+            model_fingerprint (str): Fingerprint of the serving model's
+                artifacts; scores from any other model are not reused
+
+        Returns:
+            dict: 'predictions' per known ID in request order, 'missing' IDs
+                and the number of cache hits
+        """
+        startup_ids = [str(startup_id) for startup_id in startup_ids]
+        features = self.get_features(startup_ids)
+        with self.lock:
+            cached = self._fetch(
+                "startup_scores",
+                "feature_version, model_fingerprint, success_prediction, success_probability",
+                list(features)
+            )
+
+        results = {}
+        stale = []
+        for startup_id, (version, _) in features.items():
+            score = cached.get(startup_id)
+            if score is not None and score[0] == version and score[1] == model_fingerprint:
+                results[startup_id] = (int(score[2]), float(score[3]), True)
+            else:
+                stale.append(startup_id)
+
+        if stale:
+            # Score every cache miss with one model call
+            X = np.array([features[startup_id][1] for startup_id in stale], dtype=float)
+            predictions, probabilities = predict_matrix(X)
+            now = time.time()
+            rows = []
+            for startup_id, prediction, probability in zip(stale, predictions, probabilities):
+                results[startup_id] = (int(prediction), float(probability), False)
+                rows.append((startup_id, features[startup_id][0], model_fingerprint, int(prediction), float(probability), now))
+            with self.lock, self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO startup_scores VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+
+        hits = len(features) - len(stale)
+        with self.lock:
+            self.cache_hits += hits
+            self.cache_misses += len(stale)
+
+        predictions = []
+        seen = set()
+        for startup_id in startup_ids:
+            if startup_id in results and startup_id not in seen:
+                seen.add(startup_id)
+                prediction, probability, was_cached = results[startup_id]
+                predictions.append({
+                    'startup_id': startup_id,
+                    'success_prediction': prediction,
+                    'success_probability': probability,
+                    'failure_probability': 1.0 - probability,
+                    'cached': was_cached
+                })
+        return {
+            'predictions': predictions,
+            'missing': [startup_id for startup_id in dict.fromkeys(startup_ids) if startup_id not in features],
+            'cache_hits': hits
+        }
+
+    def delete_many(self, startup_ids):
+        """Remove startups and their cached scores; returns the number removed"""
+        startup_ids = [str(startup_id) for startup_id in startup_ids]
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM startup_scores WHERE startup_id = ?", [(i,) for i in startup_ids])
+            before = self.connection.total_changes
+            self.connection.executemany("DELETE FROM startup_features WHERE startup_id = ?", [(i,) for i in startup_ids])
+            return self.connection.total_changes - before
+
+    def stats(self):
+        """Stored startups, cached scores and cache hit counters"""
+        with self.lock:
+            startups = self.connection.execute("SELECT COUNT(*) FROM startup_features").fetchone()[0]
+            scores = self.connection.execute("SELECT COUNT(*) FROM startup_scores").fetchone()[0]
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'startups': startups,
+                'cached_scores': scores,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'hit_rate': self.cache_hits / lookups if lookups else 0.0
+            }
+
+
+def _default_store():
+    from models.startup_success_model import FEATURE_COLUMNS
+    return StartupFeatureStore(FEATURE_COLUMNS)
+
+
+# Global instance
+startup_feature_store = _default_store()
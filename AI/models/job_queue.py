@@ -0,0 +1,410 @@
+"""
+Persistent background job queue for long-running AI work, backed by SQLite.
+
+Jobs are rows in a SQLite table. Worker processes claim queued jobs
+atomically, report progress while they run, and write their output as a
+JSON-lines result file that the API streams back once the job has succeeded.
+A claim is a lease: the claiming process records itself as the owner and
+renews a heartbeat while the job runs. Only jobs whose lease has expired
+are queued again, so a restarting API worker never requeues a job another
+process is still running. One worker pool runs per host, in whichever API
+worker first takes the host lock.
+
+Job kinds:
+    score_startups           Startup success for stored IDs or inline rows
+    score_profit             Profit predictions with intervals for inline rows
+    rebuild_recommendations  Rebuild the recommendation index and neighbour
+                             graph, optionally from a new catalog
+"""
+
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from models.thread_budget import thread_budget
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "data/jobs.sqlite3")
+JOB_RESULTS_DIR = os.getenv("JOB_RESULTS_DIR", "data/job_results")
+JOB_CHUNK_SIZE = 1000
+# A running job whose heartbeat is older than this is considered abandoned
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+
+class JobQueue:
+    def __init__(self, path=JOB_QUEUE_PATH, results_dir=JOB_RESULTS_DIR):
+        """
+        Open (and create if needed) the queue
+
+        Args:
+            path (str): SQLite database file
+            results_dir (str): Directory of the result files
+        """
+        self.path = path
+        self.results_dir = results_dir
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        os.makedirs(results_dir, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, "
+                "status TEXT NOT NULL, progress REAL NOT NULL DEFAULT 0, message TEXT, "
+                "result_path TEXT, error TEXT, owner TEXT, heartbeat_at REAL, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            # Queues created before leases existed lack the lease columns
+            columns = {row['name'] for row in self.connection.execute("PRAGMA table_info(jobs)")}
+            for column, declaration in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if column not in columns:
+                    self.connection.execute(f"ALTER TABLE jobs ADD COLUMN {column} {declaration}")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def submit(self, kind, params):
+        """
+        Queue a job
+
+        Raises:
+            ValueError: If the job kind is unknown
+
+        Returns:
+            str: Job ID
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind '{kind}', expected one of {sorted(JOB_HANDLERS)}")
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, kind, json.dumps(params), time.time())
+            )
+        return job_id
+
+    def get(self, job_id):
+        """Job state as a dict, None if unknown"""
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def claim_next(self):
+        """
+        Atomically mark the oldest queued job as running under this queue's owner
+
+        Returns:
+            dict or None: The claimed job
+        """
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    now = time.time()
+                    self.connection.execute(
+                        "UPDATE jobs SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+                        (self.owner, now, now, row['id'])
+                    )
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return None if row is None else self.get(row['id'])
+
+    # Updates of a running job only apply while this queue still owns it
+
+    def heartbeat(self, job_id):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running' AND owner = ?",
+                (time.time(), job_id, self.owner)
+            )
+
+    def set_progress(self, job_id, progress, message=None):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET progress = ?, message = ?, heartbeat_at = ? "
+                "WHERE id = ? AND status = 'running' AND owner = ?",
+                (float(progress), message, time.time(), job_id, self.owner)
+            )
+
+    def finish(self, job_id, result_path):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'succeeded', progress = 1, result_path = ?, finished_at = ? "
+                "WHERE id = ? AND status = 'running' AND owner = ?",
+                (result_path, time.time(), job_id, self.owner)
+            )
+
+    def fail(self, job_id, error):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE id = ? AND status = 'running' AND owner = ?",
+                (str(error), time.time(), job_id, self.owner)
+            )
+
+    def requeue_interrupted(self, lease_seconds=JOB_LEASE_SECONDS):
+        """Queue again the running jobs whose owner stopped renewing the lease"""
+        with self.lock:
+            return self.connection.execute(
+                "UPDATE jobs SET status = 'queued', progress = 0, owner = NULL, started_at = NULL, "
+                "heartbeat_at = NULL WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (time.time() - lease_seconds,)
+            ).rowcount
+
+    def latest_rebuild(self):
+        """
+        The most recently finished index rebuild
+
+        Returns:
+            dict or None: 'id' and 'result_path' of the rebuild
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT id, result_path FROM jobs WHERE kind = 'rebuild_recommendations' "
+                "AND status = 'succeeded' ORDER BY finished_at DESC LIMIT 1"
+            ).fetchone()
+        return None if row is None else dict(row)
+
+    def stats(self):
+        """Number of jobs per status"""
+        with self.lock:
+            rows = self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+# ==================== JOB HANDLERS ====================
+
+def _chunks(items, size=JOB_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def _score_startups(params, progress, output, queue):
+    """Score stored startups by ID, or inline feature dicts under 'rows'"""
+    from models.startup_success_model import FEATURE_COLUMNS, startup_success_model
+
+    if 'startup_ids' in params:
+        from models.feature_store import startup_feature_store
+        ids = [str(startup_id) for startup_id in params['startup_ids']]
+        for start, chunk in _chunks(ids):
+            scored = startup_feature_store.score(
+                chunk, startup_success_model.predict_success_matrix, startup_success_model.serving_fingerprint
+            )
+            for prediction in scored['predictions']:
+                output.write(json.dumps(prediction) + "\n")
+            for startup_id in scored['missing']:
+                output.write(json.dumps({'startup_id': startup_id, 'error': 'unknown startup'}) + "\n")
+            progress((start + len(chunk)) / len(ids), f"{start + len(chunk)} of {len(ids)} startups scored")
+        return
+
+    rows = params['rows']
+    for start, chunk in _chunks(rows):
+        X = np.array([[row[column] for column in FEATURE_COLUMNS] for row in chunk], dtype=float)
+        predictions, probabilities = startup_success_model.predict_success_matrix(X)
+        for offset, (prediction, probability) in enumerate(zip(predictions, probabilities)):
+            output.write(json.dumps({
+                'row': start + offset,
+                'success_prediction': int(prediction),
+                'success_probability': float(probability)
+            }) + "\n")
+        progress((start + len(chunk)) / len(rows), f"{start + len(chunk)} of {len(rows)} startups scored")
+
+
+def _score_profit(params, progress, output, queue):
+    """Profit predictions with intervals for inline spending plans under 'items'"""
+    from models.profit_prediction_model import profit_prediction_model
+
+    items = params['items']
+    level = params.get('interval_level', 0.9)
+    for start, chunk in _chunks(items):
+        batch = profit_prediction_model.predict_profit_batch(chunk, interval_level=level)
+        if 'error' in batch:
+            raise ValueError(batch['error'])
+        for offset, prediction in enumerate(batch['predictions']):
+            output.write(json.dumps(dict(prediction, row=start + offset)) + "\n")
+        progress((start + len(chunk)) / len(items), f"{start + len(chunk)} of {len(items)} plans scored")
+
+
+def read_rebuilt_catalog(rebuild):
+    """Companies written by a finished rebuild job, as returned by latest_rebuild"""
+    with open(rebuild['result_path']) as result:
+        return [json.loads(line) for line in result]
+
+
+def _rebuild_recommendations(params, progress, output, queue):
+    """
+    Rebuild the recommendation index and neighbour graph off the serving process
+
+    Without 'companies' the catalog being served is rebuilt: the one from the
+    latest successful rebuild, or COMPANY_DATA if there has been none.
+    """
+    from models.recommendation_model import COMPANY_DATA, NEIGHBOUR_K, RecommendationModel
+    from models.neighbour_graph import build_neighbour_graph, save_neighbour_graph
+
+    companies = params.get('companies')
+    if companies is None:
+        latest = queue.latest_rebuild()
+        companies = COMPANY_DATA if latest is None else read_rebuilt_catalog(latest)
+    progress(0.1, f"Indexing {len(companies)} companies")
+    model = RecommendationModel(companies, num_shards=1)
+
+    progress(0.3, "Building the neighbour graph")
+    indices, scores = build_neighbour_graph(model.tfidf_matrix, k=NEIGHBOUR_K, n_jobs=thread_budget.batch_threads)
+    save_neighbour_graph(model.neighbours_path, indices, scores, model.catalog_fingerprint)
+
+    # The serving process reloads the catalog from the result file
+    for company in companies:
+        output.write(json.dumps(company) + "\n")
+    progress(1.0, f"Rebuilt index for {len(companies)} companies")
+
+
+JOB_HANDLERS = {
+    'score_startups': _score_startups,
+    'score_profit': _score_profit,
+    'rebuild_recommendations': _rebuild_recommendations,
+}
+
+
+def run_job(queue, job, heartbeat_interval=JOB_LEASE_SECONDS / 3):
+    """Execute one claimed job, renewing its lease, and record its outcome"""
+    result_path = os.path.join(queue.results_dir, f"{job['id']}.jsonl")
+    partial_path = result_path + ".part"
+    done = threading.Event()
+
+    def renew_lease():
+        while not done.wait(heartbeat_interval):
+            queue.heartbeat(job['id'])
+
+    renewer = threading.Thread(target=renew_lease, daemon=True)
+    renewer.start()
+    try:
+        with open(partial_path, 'w') as output:
+            JOB_HANDLERS[job['kind']](
+                job['params'], lambda fraction, message=None: queue.set_progress(job['id'], fraction, message), output,
+                queue
+            )
+        os.replace(partial_path, result_path)
+        queue.finish(job['id'], result_path)
+    except Exception as e:
+        print(f"Job {job['id']} failed: {e}")
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        queue.fail(job['id'], e)
+    finally:
+        done.set()
+        renewer.join()
+
+
+def _worker_loop(path, results_dir, stop_event, poll_interval):
+    # SQLite connections must not be shared with the parent process
+    feature_store_module = sys.modules.get('models.feature_store')
+    if feature_store_module is not None:
+        feature_store_module.startup_feature_store.reopen()
+    queue = JobQueue(path, results_dir)
+    with thread_budget.limit('batch'):
+        while not stop_event.is_set():
+            job = queue.claim_next()
+            if job is None:
+                # Idle workers take over jobs abandoned by crashed processes
+                queue.requeue_interrupted()
+                stop_event.wait(poll_interval)
+                continue
+            run_job(queue, job)
+
+
+class JobWorkerPool:
+    def __init__(self, n_workers=1, path=JOB_QUEUE_PATH, results_dir=JOB_RESULTS_DIR, poll_interval=0.5):
+        """
+        Args:
+            n_workers (int): Worker processes to start
+            path (str): SQLite database file of the queue
+            results_dir (str): Directory of the result files
+            poll_interval (float): Seconds an idle worker waits between polls
+        """
+        self.n_workers = n_workers
+        self.path = path
+        self.results_dir = results_dir
+        self.poll_interval = poll_interval
+        self.stop_event = multiprocessing.Event()
+        self.processes = []
+        self.lock_file = None
+
+    def _acquire_host_lock(self):
+        """Non-blocking lock next to the queue; one pool per host holds it"""
+        if fcntl is None:
+            return True
+        lock_file = open(self.path + ".workers.lock", 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    @property
+    def running(self):
+        return bool(self.processes)
+
+    def start(self):
+        """
+        Start the workers, unless another process on this host runs them
+
+        Forked workers share the loaded models copy-on-write. Call again
+        later to take over when the process holding the pool exits.
+
+        Returns:
+            bool: Whether this process now runs the pool
+        """
+        if self.running:
+            return True
+        if self.n_workers < 1 or not self._acquire_host_lock():
+            return False
+        self.stop_event.clear()
+        for _ in range(self.n_workers):
+            process = multiprocessing.Process(
+                target=_worker_loop,
+                args=(self.path, self.results_dir, self.stop_event, self.poll_interval),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        return True
+
+    def stop(self, timeout=5):
+        """Ask the workers to finish their current job and exit"""
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
+
+# Global instance
+job_queue = JobQueue()
@@ -0,0 +1,238 @@
+"""
+Latency-budgeted model selection for startup success prediction.
+
+Trains several model families on the same data split, measures AUC next to
+single-row and batch inference latency, and exports the cheapest candidate
+that is accurate enough and fits inside the declared latency budget.
+StartupSuccessModel picks the exported artifact up automatically.
+
+Usage (from the AI directory):
+    python -m models.model_selection --budget-ms 2.0
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+import joblib
+import numpy as np
+import sklearn
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from models.startup_success_model import FEATURE_COLUMNS, StartupSuccessModel
+
+SELECTED_MODEL_PATH = "models/startup_success_selected.pkl"
+REPORT_PATH = "reports/model_selection_report.json"
+RANDOM_STATE = 42
+
+
+def build_candidates(random_state=RANDOM_STATE):
+    """
+    Build the untrained candidate estimators
+
+    Args:
+        random_state (int): Seed shared by every stochastic estimator
+
+    Returns:
+        dict: Candidate name -> unfitted estimator
+    """
+    return {
+        'logistic_regression': LogisticRegression(max_iter=1000),
+        'hist_gradient_boosting': HistGradientBoostingClassifier(
+            max_iter=100, random_state=random_state
+        ),
+        'shallow_forest': RandomForestClassifier(
+            n_estimators=25, max_depth=6, random_state=random_state
+        ),
+        'pruned_forest': RandomForestClassifier(
+            n_estimators=50, ccp_alpha=0.002, min_samples_leaf=3,
+            random_state=random_state
+        ),
+        # Current production model, kept as the reference point
+        'random_forest': RandomForestClassifier(n_estimators=100, random_state=random_state),
+    }
+
+
+def measure_latency(estimator, scaler, X_raw, single_repeats=200, batch_repeats=20):
+    """
+    Measure serving latency of scaler.transform + predict_proba
+
+    Args:
+        estimator: Fitted classifier
+        scaler (StandardScaler): Fitted scaler used in front of the estimator
+        X_raw (np.ndarray): Unscaled rows to feed through the serving path
+        single_repeats (int): Number of timed single-row calls
+        batch_repeats (int): Number of timed full-batch calls
+
+    Returns:
+        dict: Single-row p50/p99 and batch per-call/per-row timings
+    """
+    # Warm up once so lazy initialisation is not charged to the first sample
+    estimator.predict_proba(scaler.transform(X_raw[:1]))
+
+    single = np.empty(single_repeats)
+    for i in range(single_repeats):
+        row = X_raw[i % len(X_raw)][None, :]
+        start = time.perf_counter()
+        estimator.predict_proba(scaler.transform(row))
+        single[i] = time.perf_counter() - start
+
+    batch = np.empty(batch_repeats)
+    for i in range(batch_repeats):
+        start = time.perf_counter()
+        estimator.predict_proba(scaler.transform(X_raw))
+        batch[i] = time.perf_counter() - start
+
+    batch_ms = float(np.median(batch) * 1000)
+    return {
+        'single_row_p50_ms': float(np.percentile(single, 50) * 1000),
+        'single_row_p99_ms': float(np.percentile(single, 99) * 1000),
+        'batch_size': int(len(X_raw)),
+        'batch_ms': batch_ms,
+        'batch_per_row_us': batch_ms * 1000 / len(X_raw),
+    }
+
+
+def select_candidate(results, budget_ms, auc_tolerance=0.005):
+    """
+    Pick the candidate to serve
+
+    Among candidates whose single-row p99 latency fits the budget, every one
+    within auc_tolerance of the best AUC counts as accurate enough, and the
+    fastest of those wins.
+
+    Args:
+        results (dict): Candidate name -> metrics from run_selection
+        budget_ms (float): Single-row p99 latency budget in milliseconds
+        auc_tolerance (float): Allowed AUC loss relative to the best candidate
+
+    Returns:
+        str or None: Name of the selected candidate, None if nothing fits
+    """
+    within_budget = {
+        name: metrics for name, metrics in results.items()
+        if metrics['single_row_p99_ms'] <= budget_ms
+    }
+    if not within_budget:
+        return None
+
+    best_auc = max(metrics['auc'] for metrics in within_budget.values())
+    accurate_enough = [
+        name for name, metrics in within_budget.items()
+        if metrics['auc'] >= best_auc - auc_tolerance
+    ]
+    return min(accurate_enough, key=lambda name: (within_budget[name]['single_row_p99_ms'], name))
+
+
+def run_selection(budget_ms, auc_tolerance=0.005, export=True,
+                  model_path=SELECTED_MODEL_PATH, report_path=REPORT_PATH):
+    """
+    Train, benchmark and compare every candidate, then export the winner
+
+    Args:
+        budget_ms (float): Single-row p99 latency budget in milliseconds
+        auc_tolerance (float): Allowed AUC loss relative to the best candidate
+        export (bool): Whether to write the winning artifact
+        model_path (str): Where the winning artifact is written
+        report_path (str): Where the JSON report is written
+
+    Returns:
+        dict: The report that was written
+    """
+    # Same generator, seed and split as StartupSuccessModel._train_model
+    df = StartupSuccessModel._generate_sample_data()
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=float)
+    y = df['success'].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=RANDOM_STATE
+    )
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    results = {}
+    fitted = {}
+    for name, estimator in build_candidates().items():
+        print(f"Training candidate: {name}")
+        start = time.perf_counter()
+        estimator.fit(X_train_scaled, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        probability = estimator.predict_proba(X_test_scaled)[:, 1]
+        results[name] = {
+            'auc': float(roc_auc_score(y_test, probability)),
+            'accuracy': float(accuracy_score(y_test, (probability > 0.5).astype(int))),
+            'fit_seconds': fit_seconds,
+            **measure_latency(estimator, scaler, X_test),
+        }
+        fitted[name] = estimator
+
+    selected = select_candidate(results, budget_ms, auc_tolerance)
+
+    report = {
+        'budget_ms': budget_ms,
+        'auc_tolerance': auc_tolerance,
+        'selected': selected,
+        'candidates': results,
+        'data': {
+            'n_train': int(len(X_train)),
+            'n_test': int(len(X_test)),
+            'random_state': RANDOM_STATE,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scikit_learn': sklearn.__version__,
+            'machine': platform.machine(),
+        },
+    }
+
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Report written to {report_path}")
+
+    if selected is None:
+        print(f"No candidate fits a {budget_ms} ms budget; nothing exported")
+    elif export:
+        joblib.dump({
+            'name': selected,
+            'estimator': fitted[selected],
+            'scaler': scaler,
+            'feature_columns': FEATURE_COLUMNS,
+            'metrics': results[selected],
+            'budget_ms': budget_ms,
+        }, model_path)
+        print(f"Exported {selected} to {model_path}")
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=2.0,
+                        help="single-row p99 latency budget in milliseconds")
+    parser.add_argument('--auc-tolerance', type=float, default=0.005,
+                        help="AUC loss accepted in exchange for lower latency")
+    parser.add_argument('--no-export', action='store_true',
+                        help="only write the report")
+    args = parser.parse_args()
+
+    report = run_selection(args.budget_ms, args.auc_tolerance, export=not args.no_export)
+
+    print(f"{'candidate':<24}{'auc':>8}{'p99 ms':>10}{'batch us/row':>14}")
+    for name, metrics in sorted(report['candidates'].items()):
+        print(f"{name:<24}{metrics['auc']:>8.3f}{metrics['single_row_p99_ms']:>10.3f}"
+              f"{metrics['batch_per_row_us']:>14.2f}")
+    print(f"Selected: {report['selected']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Precomputed "similar companies" neighbour graph.
+
+Computes, offline, the top-k most similar catalog companies for every company
+from the TF-IDF matrix. Rows are processed in blocks so only a
+block_size x n_companies slice of similarities exists at a time, and blocks
+are spread over worker processes. The result is two compact (n, k) arrays,
+neighbour row indexes and similarities, so serving "companies like X" is a
+dictionary lookup plus reading k entries.
+
+Usage (from the AI directory):
+    python -m models.neighbour_graph --k 20 --jobs 4
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from models.ranking import top_k_indices
+
+NEIGHBOURS_PATH = "models/recommendation_neighbours.npz"
+
+# Set in each worker by _init_worker so the matrix is sent once per process
+_worker_matrix = None
+
+
+def catalog_fingerprint(texts):
+    """Hash of the indexed texts, used to detect a stale neighbour file"""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _init_worker(matrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _block_neighbours(start, stop, k, matrix=None):
+    """Top-k neighbours, excluding the row itself, for rows [start, stop)"""
+    matrix = _worker_matrix if matrix is None else matrix
+    similarities = (matrix[start:stop] @ matrix.T).toarray()
+    similarities[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+    indices = np.full((stop - start, k), -1, dtype=np.int32)
+    scores = np.zeros((stop - start, k), dtype=np.float32)
+    for offset, row_scores in enumerate(similarities):
+        top = top_k_indices(row_scores, k)
+        # Unrelated companies are not neighbours; leave their slots empty
+        top = top[row_scores[top] > 0]
+        indices[offset, :len(top)] = top
+        scores[offset, :len(top)] = row_scores[top]
+    return start, indices, scores
+
+
+def build_neighbour_graph(tfidf_matrix, k=10, block_size=1024, n_jobs=None):
+    """
+    Compute the top-k neighbour lists for every row of an L2-normalized matrix
+
+    Args:
+        tfidf_matrix (scipy.sparse matrix): One normalized row per company
+        k (int): Neighbours kept per company
+        block_size (int): Rows scored per block, bounding peak memory
+        n_jobs (int, optional): Worker processes; defaults to the CPU count,
+            and a single block is always computed in-process
+
+    Returns:
+        tuple: (indices, scores) arrays of shape (n, k); empty slots hold -1
+    """
+    tfidf_matrix = tfidf_matrix.tocsr()
+    n_rows = tfidf_matrix.shape[0]
+    k = min(k, max(n_rows - 1, 0))
+    blocks = [(start, min(start + block_size, n_rows), k) for start in range(0, n_rows, block_size)]
+
+    indices = np.full((n_rows, k), -1, dtype=np.int32)
+    scores = np.zeros((n_rows, k), dtype=np.float32)
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if len(blocks) <= 1 or n_jobs == 1:
+        results = [_block_neighbours(*block, matrix=tfidf_matrix) for block in blocks]
+    else:
+        with multiprocessing.Pool(min(n_jobs, len(blocks)), _init_worker, (tfidf_matrix,)) as pool:
+            results = pool.starmap(_block_neighbours, blocks)
+
+    for start, block_indices, block_scores in results:
+        indices[start:start + len(block_indices)] = block_indices
+        scores[start:start + len(block_scores)] = block_scores
+    return indices, scores
+
+
+def save_neighbour_graph(path, indices, scores, fingerprint):
+    """Persist the neighbour arrays with the fingerprint of their catalog"""
+    np.savez(path, indices=indices, scores=scores, fingerprint=np.array(fingerprint))
+
+
+def load_neighbour_graph(path, fingerprint):
+    """
+    Load persisted neighbour arrays if they belong to this catalog
+
+    Returns:
+        tuple or None: (indices, scores), None if missing or stale
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        if str(data['fingerprint']) != fingerprint:
+            return None
+        return data['indices'], data['scores']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the similar-companies neighbour graph")
+    parser.add_argument('--k', type=int, default=20, help="neighbours per company")
+    parser.add_argument('--block-size', type=int, default=1024, help="rows per block")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+
+    from models.recommendation_model import recommendation_model
+
+    start = time.perf_counter()
+    indices, scores = build_neighbour_graph(
+        recommendation_model.tfidf_matrix, k=args.k, block_size=args.block_size, n_jobs=args.jobs
+    )
+    elapsed = time.perf_counter() - start
+
+    save_neighbour_graph(NEIGHBOURS_PATH, indices, scores, recommendation_model.catalog_fingerprint)
+    print(f"Built {indices.shape[0]} x {indices.shape[1]} neighbour graph in {elapsed:.2f}s")
+    print(f"Saved to {NEIGHBOURS_PATH} ({indices.nbytes + scores.nbytes:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
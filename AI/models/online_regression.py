@@ -0,0 +1,106 @@
+"""
+Running sufficient statistics for incrementally updated linear regression.
+
+Keeps the observation count, feature and target means, and the centered
+cross-product matrices sum((x - mean_x)(x - mean_x)^T) and
+sum((x - mean_x)(y - mean_y)). These are XᵀX and Xᵀy taken about the running
+means. Batches are merged with Chan et al.'s parallel update, which stays
+numerically stable for spending figures in the millions where raw XᵀX would
+lose precision. Folding in a batch of b rows costs O(b·d²). Refreshing the
+ordinary least squares coefficients solves one d x d system.
+"""
+
+import os
+
+import numpy as np
+
+
+class RunningRegressionStats:
+    def __init__(self, n_features):
+        """
+        Args:
+            n_features (int): Number of input features
+        """
+        self.n_features = n_features
+        self.count = 0.0
+        self.mean_x = np.zeros(n_features)
+        self.mean_y = 0.0
+        self.cov_xx = np.zeros((n_features, n_features))
+        self.cov_xy = np.zeros(n_features)
+        self.var_y = 0.0
+
+    def update(self, X, y, decay=1.0):
+        """
+        Fold a batch of observations into the statistics
+
+        Args:
+            X (np.ndarray): Shape (b, n_features)
+            y (np.ndarray): Shape (b,)
+            decay (float): Weight kept by the existing statistics, in (0, 1];
+                below 1 the model gradually forgets old observations
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.n_features)
+        y = np.asarray(y, dtype=float).reshape(-1)
+        if len(X) == 0:
+            return
+
+        # Moments of the batch on its own
+        batch_count = float(len(X))
+        batch_mean_x = X.mean(axis=0)
+        batch_mean_y = y.mean()
+        centered_x = X - batch_mean_x
+        centered_y = y - batch_mean_y
+        batch_cov_xx = centered_x.T @ centered_x
+        batch_cov_xy = centered_x.T @ centered_y
+        batch_var_y = centered_y @ centered_y
+
+        # Chan et al. merge with the (optionally decayed) running moments
+        count = self.count * decay
+        total = count + batch_count
+        delta_x = batch_mean_x - self.mean_x
+        delta_y = batch_mean_y - self.mean_y
+        weight = count * batch_count / total
+
+        self.cov_xx = self.cov_xx * decay + batch_cov_xx + weight * np.outer(delta_x, delta_x)
+        self.cov_xy = self.cov_xy * decay + batch_cov_xy + weight * delta_x * delta_y
+        self.var_y = self.var_y * decay + batch_var_y + weight * delta_y * delta_y
+        self.mean_x = self.mean_x + delta_x * batch_count / total
+        self.mean_y = self.mean_y + delta_y * batch_count / total
+        self.count = total
+
+    @property
+    def feature_variances(self):
+        """Population variance of each feature, as StandardScaler stores it"""
+        return np.diag(self.cov_xx) / self.count if self.count else np.zeros(self.n_features)
+
+    def coefficients(self):
+        """
+        Least-squares solution on the raw features
+
+        Returns:
+            tuple: (coef, intercept)
+        """
+        coef = np.linalg.lstsq(self.cov_xx, self.cov_xy, rcond=None)[0]
+        intercept = self.mean_y - self.mean_x @ coef
+        return coef, float(intercept)
+
+    def save(self, path):
+        """Persist the statistics as an .npz file"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path, count=self.count, mean_x=self.mean_x, mean_y=self.mean_y,
+            cov_xx=self.cov_xx, cov_xy=self.cov_xy, var_y=self.var_y
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load statistics written by save"""
+        with np.load(path) as data:
+            stats = cls(len(data['mean_x']))
+            stats.count = float(data['count'])
+            stats.mean_x = data['mean_x']
+            stats.mean_y = float(data['mean_y'])
+            stats.cov_xx = data['cov_xx']
+            stats.cov_xy = data['cov_xy']
+            stats.var_y = float(data['var_y'])
+        return stats
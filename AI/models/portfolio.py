@@ -0,0 +1,149 @@
+"""
+Portfolio analytics: aggregate success and profit predictions for a set of
+startups.
+
+The whole portfolio is scored with one startup success model call and one
+profit model call. The predictions are then summarized with numpy, overall
+and by group, so the response size depends on the number of groups, not on
+the number of startups. Groups are exclusive, so their counts add up to the
+portfolio:
+
+    by_state  the first location flag set, in the order CA, NY, MA, TX,
+              other; 'unknown' when none is set
+    by_round  the latest funding round reached, D to A; 'no_round' otherwise
+"""
+
+import numpy as np
+
+from models.startup_success_model import FEATURE_COLUMNS
+
+STATE_GROUPS = [('CA', 'is_CA'), ('NY', 'is_NY'), ('MA', 'is_MA'), ('TX', 'is_TX'), ('other', 'is_otherstate')]
+ROUND_GROUPS = [('round_D', 'has_roundD'), ('round_C', 'has_roundC'), ('round_B', 'has_roundB'), ('round_A', 'has_roundA')]
+DEFAULT_QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+def group_codes(X, groups, fallback):
+    """
+    Exclusive group of each row from 0/1 flag columns
+
+    Args:
+        X (np.ndarray): Startup success features, FEATURE_COLUMNS order
+        groups (list): (label, flag column) pairs, highest priority first
+        fallback (str): Label of rows with no flag set
+
+    Returns:
+        tuple: (labels, codes) where codes index into labels
+    """
+    flags = X[:, [FEATURE_COLUMNS.index(column) for column in dict(groups).values()]] > 0
+    # argmax finds the first flag set; rows without any get the fallback
+    codes = np.where(flags.any(axis=1), flags.argmax(axis=1), len(groups))
+    return [label for label, _ in groups] + [fallback], codes
+
+
+def _distribution(values, quantiles):
+    return {
+        'mean': float(values.mean()),
+        'quantiles': np.quantile(values, quantiles).tolist()
+    }
+
+
+class PortfolioAnalyzer:
+    def __init__(self, success_model, profit_model):
+        """
+        Args:
+            success_model (StartupSuccessModel): Scores success probabilities
+            profit_model (ProfitPredictionModel): Predicts profit from spending
+        """
+        self.success_model = success_model
+        self.profit_model = profit_model
+
+    def _summary(self, rows, probabilities, predictions, funding, profits, quantiles):
+        """Aggregates over the rows selected by a boolean mask"""
+        with_profit = rows & ~np.isnan(profits)
+        summary = {
+            'count': int(rows.sum()),
+            'total_funding_usd': float(funding[rows].sum()),
+            'expected_successes': float(probabilities[rows].sum()),
+            'predicted_successes': int(predictions[rows].sum()),
+            'success_probability': _distribution(probabilities[rows], quantiles),
+            'profit': None
+        }
+        if with_profit.any():
+            summary['profit'] = {
+                'count': int(with_profit.sum()),
+                'total': float(profits[with_profit].sum()),
+                **_distribution(profits[with_profit], quantiles)
+            }
+        return summary
+
+    def analyze(self, X, spending=None, quantiles=DEFAULT_QUANTILES, interval_level=0.9):
+        """
+        Score a portfolio and summarize it overall, by state and by round
+
+        Args:
+            X (np.ndarray): Startup success features, one row per startup in
+                FEATURE_COLUMNS order
+            spending (list, optional): Per startup, a profit feature dict or
+                None; startups without one are left out of profit aggregates
+            quantiles (list): Quantile levels reported for each distribution
+            interval_level (float): Coverage of the profit intervals summed
+                in the overall summary
+
+        Returns:
+            dict: Overall and per-group aggregates
+        """
+        try:
+            X = np.asarray(X, dtype=float).reshape(-1, len(FEATURE_COLUMNS))
+            predictions, probabilities = self.success_model.predict_success_matrix(X)
+            funding = X[:, FEATURE_COLUMNS.index('funding_total_usd')]
+
+            profits = np.full(len(X), np.nan)
+            lower_total = upper_total = None
+            spending = spending or [None] * len(X)
+            planned = [row for row, plan in enumerate(spending) if plan is not None]
+            if planned:
+                batch = self.profit_model.predict_profit_arrays([spending[row] for row in planned], interval_level)
+                profits[planned] = batch['predicted']
+                lower_total, upper_total = float(batch['lower'].sum()), float(batch['upper'].sum())
+
+            everyone = np.ones(len(X), dtype=bool)
+            overall = self._summary(everyone, probabilities, predictions, funding, profits, quantiles)
+            if overall['profit'] is not None:
+                # Summed bounds: every plan at its lower or upper bound at once
+                overall['profit']['interval_total'] = {
+                    'level': interval_level, 'lower': lower_total, 'upper': upper_total
+                }
+
+            breakdowns = {}
+            for name, groups, fallback in (('by_state', STATE_GROUPS, 'unknown'), ('by_round', ROUND_GROUPS, 'no_round')):
+                labels, codes = group_codes(X, groups, fallback)
+                breakdowns[name] = {
+                    label: self._summary(codes == code, probabilities, predictions, funding, profits, quantiles)
+                    for code, label in enumerate(labels)
+                    if (codes == code).any()
+                }
+
+            return {
+                'startups': len(X),
+                'quantile_levels': list(quantiles),
+                'overall': overall,
+                **breakdowns,
+                'model_name': self.success_model.serving_name
+            }
+
+        except Exception as e:
+            print(f"Error in portfolio analysis: {e}")
+            return {
+                'startups': 0,
+                'error': str(e)
+            }
+
+
+def _default_analyzer():
+    from models.startup_success_model import startup_success_model
+    from models.profit_prediction_model import profit_prediction_model
+    return PortfolioAnalyzer(startup_success_model, profit_prediction_model)
+
+
+# Global instance
+portfolio_analyzer = _default_analyzer()
@@ -0,0 +1,124 @@
+"""
+Precomputed prediction intervals for least-squares regression.
+
+For a new row x the prediction error of ordinary least squares has variance
+σ²(1 + h(x)), where the leverage h(x) = 1/n + zᵀ(ZᵀZ)⁻¹z is computed on the
+standardized, centered features z. Everything except z is fixed at training
+time: the feature centers and scales, the inverse Gram matrix, the residual
+standard deviation s, and empirical quantiles of the standardized
+leave-one-out residuals. An interval is then
+
+    prediction + quantile * s * sqrt(1 + h(x))
+
+which costs one d x d quadratic form per row, with no resampling.
+"""
+
+import numpy as np
+
+DEFAULT_LEVELS = (0.8, 0.9, 0.95)
+
+
+def _level_key(level):
+    return f"{float(level):g}"
+
+
+class PredictionIntervals:
+    def __init__(self, center, scale, inverse_gram, n_samples, residual_std, quantiles):
+        """
+        Args:
+            center (array-like): Feature means
+            scale (array-like): Feature standard deviations
+            inverse_gram (array-like): (ZᵀZ)⁻¹ of the standardized centered features
+            n_samples (float): Number of training rows
+            residual_std (float): Residual standard deviation s
+            quantiles (dict): Level -> (lower, upper) quantiles of the
+                standardized residuals, in units of s
+        """
+        self.center = np.asarray(center, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.inverse_gram = np.asarray(inverse_gram, dtype=float)
+        self.n_samples = float(n_samples)
+        self.residual_std = float(residual_std)
+        self.quantiles = {_level_key(level): tuple(bounds) for level, bounds in quantiles.items()}
+
+    @staticmethod
+    def standardized_quantiles(loo_residuals, leverage, residual_std, levels=DEFAULT_LEVELS):
+        """
+        Two-sided quantiles of leave-one-out residuals rescaled to unit variance
+
+        The leave-one-out residual of row i has variance σ²/(1 - h_i), so
+        multiplying by sqrt(1 - h_i)/s puts every row on the same scale.
+        """
+        standardized = loo_residuals * np.sqrt(1.0 - leverage) / residual_std
+        return {
+            level: (float(np.quantile(standardized, (1 - level) / 2)),
+                    float(np.quantile(standardized, (1 + level) / 2)))
+            for level in levels
+        }
+
+    @classmethod
+    def from_stats(cls, stats, quantiles):
+        """
+        Build the leverage terms from RunningRegressionStats
+
+        Args:
+            stats (RunningRegressionStats): Centered cross-products of the fit
+            quantiles (dict): Level -> (lower, upper) standardized quantiles
+        """
+        scale = np.sqrt(stats.feature_variances)
+        scale[scale == 0] = 1.0
+        gram = stats.cov_xx / np.outer(scale, scale)
+        coef, _ = stats.coefficients()
+        residual_sum = max(stats.var_y - stats.cov_xy @ coef, 0.0)
+        dof = max(stats.count - stats.n_features - 1, 1.0)
+        return cls(
+            stats.mean_x, scale, np.linalg.pinv(gram), stats.count,
+            np.sqrt(residual_sum / dof), quantiles
+        )
+
+    @property
+    def levels(self):
+        return sorted(float(level) for level in self.quantiles)
+
+    def leverage(self, X):
+        """Leverage of each row of X, shape (n,)"""
+        Z = (np.asarray(X, dtype=float) - self.center) / self.scale
+        return 1.0 / self.n_samples + np.einsum('ij,jk,ik->i', Z, self.inverse_gram, Z)
+
+    def bounds(self, X, predictions, level=0.9):
+        """
+        Lower and upper prediction bounds
+
+        Args:
+            X (np.ndarray): Raw features, shape (n, d)
+            predictions (np.ndarray): Point predictions, shape (n,)
+            level (float): One of the precomputed coverage levels
+
+        Returns:
+            tuple: (lower, upper) arrays of shape (n,)
+        """
+        key = _level_key(level)
+        if key not in self.quantiles:
+            raise ValueError(f"Unsupported interval level {level}, expected one of {self.levels}")
+        low, high = self.quantiles[key]
+        width = self.residual_std * np.sqrt(1.0 + self.leverage(X))
+        predictions = np.asarray(predictions, dtype=float)
+        return predictions + low * width, predictions + high * width
+
+    def to_dict(self):
+        """JSON-serializable form"""
+        return {
+            'center': self.center.tolist(),
+            'scale': self.scale.tolist(),
+            'inverse_gram': self.inverse_gram.tolist(),
+            'n_samples': self.n_samples,
+            'residual_std': self.residual_std,
+            'quantiles': {level: list(bounds) for level, bounds in self.quantiles.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['center'], data['scale'], data['inverse_gram'], data['n_samples'],
+            data['residual_std'], data['quantiles']
+        )
@@ -0,0 +1,190 @@
+"""
+On-demand sampling profiler and per-request stage tracing.
+
+StackSampler runs a background thread that reads every thread's Python stack
+from sys._current_frames() at a fixed interval. It aggregates them into
+collapsed stacks ("outer;inner;leaf count", the input format of flamegraph.pl
+and speedscope) or a nested flame-graph tree. Sampling costs nothing while it
+is off and one stack walk per thread per interval while it is on. The
+instrumented code does not need to change.
+
+Stage tracing is opt-in per request. While a request is traced, code wrapped
+in stage(name) records its wall time, and the service reports the totals in
+a Server-Timing response header. For untraced requests stage() costs a single
+context variable lookup.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Leaf functions of threads that are parked rather than working
+IDLE_FUNCTIONS = {'wait', 'select', 'poll', 'epoll', 'accept', 'get', '_wait_for_tstate_lock', 'sleep'}
+
+_trace_timings = ContextVar('trace_timings', default=None)
+
+
+@contextmanager
+def stage(name):
+    """Record the wall time of the enclosed block if the request is traced"""
+    timings = _trace_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((name, time.perf_counter() - start))
+
+
+def start_trace():
+    """Begin collecting stage timings for the current request"""
+    timings = []
+    _trace_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings, total):
+    """
+    Format stage timings as a Server-Timing header value
+
+    Args:
+        timings (list): (stage, seconds) pairs; repeated stages are summed
+        total (float): Wall time of the whole request in seconds
+    """
+    totals = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    # Time outside every stage: routing, validation and serialization
+    framework = max(total - sum(totals.values()), 0.0)
+    parts = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items()]
+    parts.append(f"framework;dur={framework * 1000:.3f}")
+    parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def flame_graph(collapsed):
+    """
+    Nest collapsed stack counts into a flame-graph tree
+
+    Args:
+        collapsed (dict): "outer;inner;leaf" -> sample count
+
+    Returns:
+        dict: {'name', 'value', 'children'} nodes, the d3-flame-graph format
+    """
+    root = {'name': 'all', 'value': 0, 'children': {}}
+    for stack, count in collapsed.items():
+        root['value'] += count
+        node = root
+        for label in stack.split(';'):
+            child = node['children'].setdefault(label, {'name': label, 'value': 0, 'children': {}})
+            child['value'] += count
+            node = child
+
+    def finalize(node):
+        children = sorted(node['children'].values(), key=lambda child: -child['value'])
+        return {'name': node['name'], 'value': node['value'], 'children': [finalize(child) for child in children]}
+
+    return finalize(root)
+
+
+class StackSampler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.counts = Counter()
+        self.samples = 0
+        self.requests_seen = 0
+        self.max_requests = None
+        self.started = None
+        self.elapsed = 0.0
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, seconds=10.0, max_requests=None, interval=0.005, include_idle=False):
+        """
+        Start sampling in a background thread
+
+        Args:
+            seconds (float): Stop after this long
+            max_requests (int, optional): Stop earlier once this many requests completed
+            interval (float): Seconds between samples
+            include_idle (bool): Keep stacks of threads parked in waits and selects
+
+        Raises:
+            RuntimeError: If a profiling session is already running
+        """
+        with self.lock:
+            if self.running:
+                raise RuntimeError("A profiling session is already running")
+            self.counts = Counter()
+            self.samples = 0
+            self.requests_seen = 0
+            self.max_requests = max_requests
+            self.stop_event.clear()
+            self.started = time.perf_counter()
+            self.thread = threading.Thread(
+                target=self._run, args=(seconds, interval, include_idle), name="stack-sampler", daemon=True
+            )
+            self.thread.start()
+
+    def _run(self, seconds, interval, include_idle):
+        own_id = threading.get_ident()
+        deadline = time.perf_counter() + seconds
+        while not self.stop_event.wait(interval) and time.perf_counter() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if not include_idle and frame.f_code.co_name in IDLE_FUNCTIONS:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.counts[";".join(reversed(labels))] += 1
+            self.samples += 1
+        self.elapsed = time.perf_counter() - self.started
+
+    def note_request(self):
+        """Count a completed request; ends a request-bounded session"""
+        if self.max_requests is not None and self.running:
+            self.requests_seen += 1
+            if self.requests_seen >= self.max_requests:
+                self.stop_event.set()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def results(self):
+        """Collapsed stack counts and session summary"""
+        return {
+            'samples': self.samples,
+            'requests': self.requests_seen,
+            'duration_seconds': self.elapsed,
+            'collapsed': dict(self.counts.most_common())
+        }
+
+    def collapsed_text(self):
+        """Collapsed stacks, one "stack count" line each, as flamegraph.pl reads them"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.counts.most_common())
+
+
+# Global instance
+stack_sampler = StackSampler()
@@ -1,100 +1,85 @@
-import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_squared_error, r2_score
 import joblib
 import os
+import threading
+from collections import namedtuple
+
+from models.online_regression import RunningRegressionStats
+from models.prediction_intervals import PredictionIntervals
+from models.profiler import stage
+from models.profit_training import (
+    PROFIT_DATA_PATH, META_PATH, SPEND_COLUMNS, MODEL_COLUMNS,
+    encode_states, load_meta, load_profit_data, model_matrix, save_meta, train_profit_model
+)
+
+FEATURE_COLUMNS = SPEND_COLUMNS
+
+# Everything a prediction reads, replaced as one reference so a concurrent
+# prediction never mixes a new scaler with old coefficients
+FittedProfitModel = namedtuple('FittedProfitModel', ['model', 'scaler', 'intervals'])
 
 class ProfitPredictionModel:
     def __init__(self):
-        self.model = None
-        self.scaler = StandardScaler()
+        self.fitted = None
+        self.meta = None
         self.model_path = "models/profit_prediction_model.pkl"
         self.scaler_path = "models/profit_prediction_scaler.pkl"
+        self.meta_path = META_PATH
+        self.stats_path = "models/profit_prediction_stats.npz"
+        self.online_stats = None
+        self.update_lock = threading.Lock()
         self._load_or_train_model()
+        self._load_online_stats()
     
-    def _generate_sample_data(self):
-        """Generate sample training data for profit prediction"""
-        np.random.seed(42)
-        n_samples = 1000
-        
-        # Generate realistic spending data
-        rnd_spend = np.random.uniform(10000, 1000000, n_samples)
-        admin_spend = np.random.uniform(5000, 500000, n_samples)
-        marketing_spend = np.random.uniform(5000, 800000, n_samples)
-        
-        # Create profit based on spending with some realistic relationships
-        # R&D typically has highest ROI, then marketing, then admin
-        base_profit = (
-            rnd_spend * 0.8 +  # R&D has high ROI
-            marketing_spend * 0.6 +  # Marketing has medium ROI
-            admin_spend * 0.3 +  # Admin has lower ROI
-            np.random.normal(0, 50000, n_samples)  # Add some noise
-        )
-        
-        # Ensure profit is positive (most businesses aim for profit)
-        profit = np.maximum(base_profit, 1000)
-        
-        data = {
-            'RnD_Spend': rnd_spend,
-            'Administration': admin_spend,
-            'Marketing_Spend': marketing_spend,
-            'Profit': profit
-        }
-        
-        return pd.DataFrame(data)
+    @property
+    def model(self):
+        return self.fitted.model
+    
+    @property
+    def scaler(self):
+        return self.fitted.scaler
     
-    def _train_model(self):
-        """Train the Linear Regression model"""
+    @property
+    def intervals(self):
+        return self.fitted.intervals
+    
+    def _train_model(self, data_path=PROFIT_DATA_PATH, n_folds=5):
+        """Train the Linear Regression model on profitPredictionData.csv"""
         print("Training profit prediction model...")
         
-        # Generate sample data
-        df = self._generate_sample_data()
-        
-        # Prepare features and target
-        X = df[['RnD_Spend', 'Administration', 'Marketing_Spend']]
-        y = df['Profit']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        model, scaler, self.meta, self.online_stats = train_profit_model(data_path, n_folds)
+        self.fitted = FittedProfitModel(model, scaler, PredictionIntervals.from_dict(self.meta['prediction_intervals']))
         
-        # Train model
-        self.model = LinearRegression()
-        self.model.fit(X_train_scaled, y_train)
+        metrics = self.meta['metrics']
+        print(f"Training R²: {metrics['train_r2']:.3f}")
+        print(f"Leave-one-out R²: {metrics['loo_r2']:.3f}")
+        print(f"{metrics['n_folds']}-fold R²: {metrics['kfold_r2']:.3f}")
+        print(f"Training RMSE: ${metrics['train_rmse']:,.2f}")
+        print(f"Leave-one-out RMSE: ${metrics['loo_rmse']:,.2f}")
         
-        # Evaluate model
-        y_pred_train = self.model.predict(X_train_scaled)
-        y_pred_test = self.model.predict(X_test_scaled)
-        
-        train_r2 = r2_score(y_train, y_pred_train)
-        test_r2 = r2_score(y_test, y_pred_test)
-        train_rmse = np.sqrt(mean_squared_error(y_train, y_pred_train))
-        test_rmse = np.sqrt(mean_squared_error(y_test, y_pred_test))
-        
-        print(f"Training R²: {train_r2:.3f}")
-        print(f"Testing R²: {test_r2:.3f}")
-        print(f"Training RMSE: ${train_rmse:,.2f}")
-        print(f"Testing RMSE: ${test_rmse:,.2f}")
-        
-        # Save model and scaler
+        # Save model, scaler and metadata
         os.makedirs("models", exist_ok=True)
         joblib.dump(self.model, self.model_path)
         joblib.dump(self.scaler, self.scaler_path)
+        save_meta(self.meta, self.meta_path)
+        
+        # Seed the online statistics with the training rows
+        self.online_stats.save(self.stats_path)
         
         print("Profit prediction model saved successfully!")
     
     def _load_or_train_model(self):
         """Load existing model or train new one"""
         try:
-            if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-                self.model = joblib.load(self.model_path)
-                self.scaler = joblib.load(self.scaler_path)
+            self.meta = load_meta(self.meta_path)
+            if self.meta and os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
+                model = joblib.load(self.model_path)
+                scaler = joblib.load(self.scaler_path)
+                if scaler.n_features_in_ != len(MODEL_COLUMNS):
+                    raise ValueError("Saved profit model predates the current features")
+                self.fitted = FittedProfitModel(model, scaler, PredictionIntervals.from_dict(self.meta['prediction_intervals']))
                 print("Profit prediction model loaded successfully!")
             else:
                 self._train_model()
@@ -102,37 +87,126 @@ class ProfitPredictionModel:
             print(f"Error loading model: {e}")
             self._train_model()
     
-    def predict_profit(self, features):
+    def _load_online_stats(self):
+        """Load the running statistics, or rebuild them from the training data"""
+        if self.online_stats is not None:
+            return
+        if os.path.exists(self.stats_path):
+            stats = RunningRegressionStats.load(self.stats_path)
+            if stats.n_features == len(MODEL_COLUMNS):
+                self.online_stats = stats
+                if stats.count != self.meta['n_samples']:
+                    # Observations were ingested since training
+                    self.fitted = self.fitted._replace(
+                        intervals=PredictionIntervals.from_stats(stats, self.intervals.quantiles)
+                    )
+                return
+        df = load_profit_data(self.meta.get('data_path', PROFIT_DATA_PATH))
+        self.online_stats = RunningRegressionStats(len(MODEL_COLUMNS))
+        self.online_stats.update(model_matrix(df), df['Profit'].to_numpy(dtype=float))
+    
+    def _feature_matrix(self, rows):
+        """Model inputs for dicts of spending and an optional State"""
+        spend = np.array([[row[column] for column in FEATURE_COLUMNS] for row in rows], dtype=float)
+        states = encode_states([row.get('State') for row in rows], self.meta['state_means'])
+        return np.hstack([spend, states])
+    
+    def _apply_online_stats(self):
+        """Refit the scaler and coefficients from the running statistics and swap them in whole"""
+        coef, _ = self.online_stats.coefficients()
+        variances = self.online_stats.feature_variances
+        scale = np.sqrt(variances)
+        scale[scale == 0] = 1.0
+        
+        # New objects, never the served ones, so readers see all old or all new
+        scaler = StandardScaler()
+        scaler.mean_ = self.online_stats.mean_x.copy()
+        scaler.var_ = variances
+        scaler.scale_ = scale
+        scaler.n_samples_seen_ = int(round(self.online_stats.count))
+        scaler.n_features_in_ = len(MODEL_COLUMNS)
+        
+        # On standardized features the intercept is the target mean
+        model = LinearRegression()
+        model.coef_ = coef * scale
+        model.intercept_ = self.online_stats.mean_y
+        model.n_features_in_ = len(MODEL_COLUMNS)
+        
+        # Keep the residual quantiles, refresh leverage and residual spread
+        intervals = PredictionIntervals.from_stats(self.online_stats, self.intervals.quantiles)
+        self.fitted = FittedProfitModel(model, scaler, intervals)
+    
+    def update_with_observations(self, observations, decay=1.0, persist=True):
         """
-        Predict profit based on spending
+        Update the model with observed spending and actual profit
         
         Args:
-            features (dict): Dictionary containing spending features
+            observations (list): Dicts with the spending features and 'Profit'
+            decay (float): Weight kept by earlier observations, in (0, 1]
+            persist (bool): Save the statistics, model and scaler afterwards
             
         Returns:
-            dict: Prediction result with predicted profit and confidence
+            dict: Update summary with the refreshed coefficients
         """
         try:
-            # Prepare feature vector
-            feature_vector = np.array([[
-                features['RnD_Spend'],
-                features['Administration'],
-                features['Marketing_Spend']
-            ]])
+            if not observations:
+                raise ValueError("No observations given")
+            if not 0 < decay <= 1:
+                raise ValueError("decay must be in (0, 1]")
+            X = self._feature_matrix(observations)
+            y = np.array([obs['Profit'] for obs in observations], dtype=float)
+            
+            with self.update_lock:
+                self.online_stats.update(X, y, decay=decay)
+                self._apply_online_stats()
+                if persist:
+                    self.online_stats.save(self.stats_path)
+                    joblib.dump(self.model, self.model_path)
+                    joblib.dump(self.scaler, self.scaler_path)
+                coef, intercept = self.online_stats.coefficients()
+                total = self.online_stats.count
             
-            # Scale features
-            scaled_features = self.scaler.transform(feature_vector)
+            return {
+                'observations_ingested': len(observations),
+                'effective_observations': float(total),
+                'coefficients': dict(zip(MODEL_COLUMNS, coef.tolist())),
+                'intercept': intercept
+            }
+            
+        except Exception as e:
+            print(f"Error updating profit model: {e}")
+            return {
+                'observations_ingested': 0,
+                'error': str(e)
+            }
+    
+    def predict_profit(self, features, interval_level=0.9):
+        """
+        Predict profit based on spending
+        
+        Args:
+            features (dict): Dictionary containing spending features and an
+                optional 'State'
+            interval_level (float): Coverage of the prediction interval
             
-            # Make prediction
-            predicted_profit = self.model.predict(scaled_features)[0]
+        Returns:
+            dict: Prediction result with predicted profit, confidence and
+                prediction interval
+        """
+        try:
+            batch = self._predict_with_intervals([features], interval_level)
             
-            # Calculate confidence based on model performance
-            # For linear regression, we can use R² as a confidence indicator
-            confidence = 0.85  # This would be calculated from actual model performance
+            # Cross-validated R² measures how well unseen rows are predicted
+            confidence = float(np.clip(self.meta['metrics']['loo_r2'], 0.0, 1.0))
             
             return {
-                'predicted_profit': float(predicted_profit),
+                'predicted_profit': float(batch['predicted'][0]),
                 'confidence': confidence,
+                'prediction_interval': {
+                    'level': interval_level,
+                    'lower': float(batch['lower'][0]),
+                    'upper': float(batch['upper'][0])
+                },
                 'currency': 'USD'
             }
             
@@ -145,6 +219,66 @@ class ProfitPredictionModel:
                 'error': str(e)
             }
     
+    def predict_profit_batch(self, features_list, interval_level=0.9):
+        """
+        Predict profit with prediction intervals for many spending plans
+        
+        Args:
+            features_list (list): Feature dicts as accepted by predict_profit
+            interval_level (float): Coverage of the prediction intervals
+            
+        Returns:
+            dict: One prediction with lower/upper bounds per input row
+        """
+        try:
+            batch = self._predict_with_intervals(features_list, interval_level)
+            
+            return {
+                'predictions': [
+                    {
+                        'predicted_profit': float(predicted),
+                        'lower': float(lower),
+                        'upper': float(upper)
+                    }
+                    for predicted, lower, upper in zip(batch['predicted'], batch['lower'], batch['upper'])
+                ],
+                'interval_level': interval_level,
+                'confidence': float(np.clip(self.meta['metrics']['loo_r2'], 0.0, 1.0)),
+                'currency': 'USD'
+            }
+            
+        except Exception as e:
+            print(f"Error in batch profit prediction: {e}")
+            return {
+                'predictions': [],
+                'currency': 'USD',
+                'error': str(e)
+            }
+    
+    def predict_profit_arrays(self, features_list, interval_level=0.9):
+        """
+        Predicted profit and interval bounds for many spending plans
+        
+        Args:
+            features_list (list): Feature dicts as accepted by predict_profit
+            interval_level (float): Coverage of the prediction intervals
+            
+        Returns:
+            dict: 'predicted', 'lower' and 'upper' arrays in input order
+        """
+        return self._predict_with_intervals(features_list, interval_level)
+    
+    def _predict_with_intervals(self, features_list, interval_level):
+        """Point predictions and interval bounds as arrays"""
+        X = self._feature_matrix(features_list)
+        # One read of the fitted parts, consistent even while an update swaps them
+        fitted = self.fitted
+        with stage("model"):
+            predicted = fitted.model.predict(fitted.scaler.transform(X))
+        with stage("intervals"):
+            lower, upper = fitted.intervals.bounds(X, predicted, interval_level)
+        return {'predicted': predicted, 'lower': lower, 'upper': upper}
+    
     def get_spending_insights(self, features):
         """
         Provide insights on spending allocation
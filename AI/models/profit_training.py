@@ -0,0 +1,244 @@
+"""
+Training and closed-form cross-validation for the profit prediction model.
+
+Fits the profit regression on profitPredictionData.csv. The State column is
+one-hot encoded with California as the baseline. Leave-one-out and k-fold
+residuals come straight from the hat matrix H = A(AᵀA)⁻¹Aᵀ of the full fit,
+so no model is refit per fold:
+
+    leave-one-out:  e_i / (1 - h_ii)
+    k-fold:         (I - H_SS)⁻¹ e_S   for each held-out fold S
+
+Standardizing the features does not change least-squares predictions, so
+these are the residuals a per-fold refit of the scaler and model would give.
+Metrics, encoding details, the number of training rows and the prediction
+interval terms are stored in a JSON artifact next to the model.
+
+Usage (from the AI directory):
+    python -m models.profit_training --folds 5
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from models.online_regression import RunningRegressionStats
+from models.prediction_intervals import DEFAULT_LEVELS, PredictionIntervals
+from models.synthetic_data import dataset_parts
+
+PROFIT_DATA_PATH = os.path.join(
+    "StartUp_Predictions-main", "StartUp_Predictions-main",
+    "Startups_Profit_Prediction_ML-main", "profitPredictionData.csv"
+)
+META_PATH = "models/profit_prediction_meta.json"
+
+SPEND_COLUMNS = ['RnD_Spend', 'Administration', 'Marketing_Spend']
+# The first state is the baseline and gets no indicator column
+STATES = ['California', 'Florida', 'New York']
+STATE_COLUMNS = ['State_Florida', 'State_New_York']
+MODEL_COLUMNS = SPEND_COLUMNS + STATE_COLUMNS
+
+CSV_COLUMNS = {'R&D Spend': 'RnD_Spend', 'Marketing Spend': 'Marketing_Spend'}
+
+
+def load_profit_data(path=PROFIT_DATA_PATH):
+    """Read the profit CSV, or a directory of CSV part files, with the column names the API uses"""
+    if os.path.isdir(path):
+        df = pd.concat([pd.read_csv(part) for part in dataset_parts(path, "*.csv")], ignore_index=True)
+    else:
+        df = pd.read_csv(path)
+    df = df.rename(columns=CSV_COLUMNS)
+    return df[SPEND_COLUMNS + ['State', 'Profit']]
+
+
+def encode_states(states, state_means=None):
+    """
+    One-hot encode states against the California baseline
+
+    Args:
+        states (iterable): State names; None marks an unknown state
+        state_means (list, optional): Indicator values used for unknown
+            states, normally the training frequencies
+
+    Returns:
+        np.ndarray: Shape (n, len(STATE_COLUMNS))
+    """
+    states = list(states)
+    encoded = np.zeros((len(states), len(STATE_COLUMNS)))
+    for row, state in enumerate(states):
+        if state is None:
+            if state_means is not None:
+                encoded[row] = state_means
+            continue
+        if state not in STATES:
+            raise ValueError(f"Unknown State '{state}', expected one of {STATES}")
+        position = STATES.index(state)
+        if position:
+            encoded[row, position - 1] = 1.0
+    return encoded
+
+
+def model_matrix(df, state_means=None):
+    """Spend columns followed by the state indicators"""
+    states = df['State'] if 'State' in df else [None] * len(df)
+    states = [None if pd.isna(state) else state for state in states]
+    return np.hstack([df[SPEND_COLUMNS].to_numpy(dtype=float), encode_states(states, state_means)])
+
+
+def _hat_factor(X):
+    """Orthonormal basis Q of the design matrix, so H = QQᵀ"""
+    design = np.hstack([np.ones((len(X), 1)), X])
+    Q, _ = np.linalg.qr(design)
+    return Q
+
+
+def leverages(X):
+    """Diagonal of the hat matrix, with an intercept added to X"""
+    return np.sum(_hat_factor(X) ** 2, axis=1)
+
+
+def loo_residuals(X, y):
+    """
+    Leave-one-out residuals of ordinary least squares without refitting
+
+    Args:
+        X (np.ndarray): Features, shape (n, d); an intercept is added
+        y (np.ndarray): Targets, shape (n,)
+
+    Returns:
+        np.ndarray: Residual of each row when predicted by the other rows
+    """
+    Q = _hat_factor(X)
+    residuals = y - Q @ (Q.T @ y)
+    return residuals / (1.0 - np.sum(Q ** 2, axis=1))
+
+
+def kfold_residuals(X, y, n_folds=5, random_state=42):
+    """
+    k-fold cross-validated residuals of ordinary least squares without refitting
+
+    Args:
+        X (np.ndarray): Features, shape (n, d); an intercept is added
+        y (np.ndarray): Targets, shape (n,)
+        n_folds (int): Number of folds
+        random_state (int): Seed of the fold assignment
+
+    Returns:
+        np.ndarray: Residual of each row when predicted by the other folds
+    """
+    Q = _hat_factor(X)
+    residuals = y - Q @ (Q.T @ y)
+    order = np.random.default_rng(random_state).permutation(len(y))
+
+    cv_residuals = np.empty_like(residuals)
+    for fold in np.array_split(order, min(n_folds, len(y))):
+        Q_fold = Q[fold]
+        # (I - H_SS) e_cv = e_S for the held-out rows S; with H_SS = Q_S Q_Sᵀ the
+        # Woodbury identity leaves a (d+1) x (d+1) solve instead of |S| x |S|
+        inner = np.eye(Q.shape[1]) - Q_fold.T @ Q_fold
+        cv_residuals[fold] = residuals[fold] + Q_fold @ np.linalg.solve(inner, Q_fold.T @ residuals[fold])
+    return cv_residuals
+
+
+def regression_metrics(y, residuals):
+    """R² and RMSE from targets and residuals"""
+    total = np.sum((y - y.mean()) ** 2)
+    return {
+        'r2': float(1.0 - np.sum(residuals ** 2) / total),
+        'rmse': float(np.sqrt(np.mean(residuals ** 2)))
+    }
+
+
+def train_profit_model(data_path=PROFIT_DATA_PATH, n_folds=5, interval_levels=DEFAULT_LEVELS):
+    """
+    Fit the profit model on the CSV and evaluate it analytically
+
+    Args:
+        data_path (str): Path of profitPredictionData.csv
+        n_folds (int): Number of folds for k-fold cross-validation
+        interval_levels (tuple): Coverage levels of the prediction intervals
+
+    Returns:
+        tuple: (model, scaler, meta, stats) where meta holds the metrics,
+            encoding details and interval terms, and stats are the running
+            sufficient statistics of the training rows
+    """
+    df = load_profit_data(data_path)
+    X = model_matrix(df)
+    y = df['Profit'].to_numpy(dtype=float)
+
+    scaler = StandardScaler()
+    model = LinearRegression()
+    model.fit(scaler.fit_transform(X), y)
+
+    residuals = y - model.predict(scaler.transform(X))
+    cv_residuals = loo_residuals(X, y)
+    train = regression_metrics(y, residuals)
+    loo = regression_metrics(y, cv_residuals)
+    kfold = regression_metrics(y, kfold_residuals(X, y, n_folds))
+
+    # Interval terms: standardized residual quantiles plus the leverage matrix
+    residual_std = np.sqrt(np.sum(residuals ** 2) / max(len(y) - X.shape[1] - 1, 1))
+    quantiles = PredictionIntervals.standardized_quantiles(
+        cv_residuals, leverages(X), residual_std, interval_levels
+    )
+    stats = RunningRegressionStats(X.shape[1])
+    stats.update(X, y)
+    intervals = PredictionIntervals.from_stats(stats, quantiles)
+
+    meta = {
+        'data_path': data_path,
+        'n_samples': int(len(y)),
+        'feature_columns': MODEL_COLUMNS,
+        'states': STATES,
+        'state_means': X[:, len(SPEND_COLUMNS):].mean(axis=0).tolist(),
+        'metrics': {
+            'train_r2': train['r2'],
+            'train_rmse': train['rmse'],
+            'loo_r2': loo['r2'],
+            'loo_rmse': loo['rmse'],
+            'kfold_r2': kfold['r2'],
+            'kfold_rmse': kfold['rmse'],
+            'n_folds': int(min(n_folds, len(y)))
+        },
+        'prediction_intervals': intervals.to_dict()
+    }
+    return model, scaler, meta, stats
+
+
+def save_meta(meta, path=META_PATH):
+    """Write the training metadata as JSON"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_meta(path=META_PATH):
+    """Load the training metadata, None if it is missing or stale"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        meta = json.load(f)
+    if meta.get('feature_columns') != MODEL_COLUMNS or 'prediction_intervals' not in meta:
+        return None
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the profit model on profitPredictionData.csv")
+    parser.add_argument('--data', default=PROFIT_DATA_PATH, help="path of the profit CSV")
+    parser.add_argument('--folds', type=int, default=5, help="folds for k-fold cross-validation")
+    args = parser.parse_args()
+
+    from models.profit_prediction_model import profit_prediction_model
+
+    profit_prediction_model._train_model(args.data, args.folds)
+
+
+if __name__ == "__main__":
+    main()
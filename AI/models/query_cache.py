@@ -0,0 +1,132 @@
+"""
+Memoization of recommendation query vectors.
+
+Vectorizing a query runs sklearn's analyzer, tokenizer and stop-word filter,
+yet the distinct industry queries seen in practice are few and repetitive.
+QueryVectorCache keeps a bounded LRU map from normalized query text to its
+sparse TF-IDF vector, and once a query has been seen hot_threshold times it
+also keeps that query's full similarity row against the catalog. Everything
+is tied to a vocabulary version and dropped when the vocabulary changes.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def cache_key(query):
+    """Lowercase and collapse whitespace; the vectorizer ignores both"""
+    return " ".join(str(query).lower().split())
+
+
+class QueryVectorCache:
+    def __init__(self, max_size=4096, hot_threshold=8, max_hot_rows=32):
+        """
+        Args:
+            max_size (int): Query vectors kept, least recently used evicted
+            hot_threshold (int): Lookups after which a similarity row is kept
+            max_hot_rows (int): Similarity rows kept at most
+        """
+        self.max_size = max_size
+        self.hot_threshold = hot_threshold
+        self.max_hot_rows = max_hot_rows
+        self.lock = threading.Lock()
+        self.version = None
+        self._reset_state()
+
+    def _reset_state(self):
+        self.vectors = OrderedDict()
+        self.lookups = {}
+        self.similarity_rows = {}
+        self.hits = 0
+        self.misses = 0
+        self.row_hits = 0
+
+    def invalidate(self, version):
+        """Drop every cached entry unless the vocabulary version is unchanged"""
+        with self.lock:
+            if version != self.version:
+                self._reset_state()
+                self.version = version
+
+    def get_vectors(self, queries, transform):
+        """
+        Sparse vectors for queries, computing only the uncached ones
+
+        Args:
+            queries (list): Raw query strings
+            transform (callable): Maps a list of query strings to a sparse
+                matrix with one row per query
+
+        Returns:
+            list: One single-row sparse matrix per query, in input order
+        """
+        keys = [cache_key(query) for query in queries]
+        vectors = [None] * len(keys)
+        missing = []
+        with self.lock:
+            for position, key in enumerate(keys):
+                vector = self.vectors.get(key)
+                if vector is None:
+                    missing.append(position)
+                    self.misses += 1
+                else:
+                    self.vectors.move_to_end(key)
+                    vectors[position] = vector
+                    self.hits += 1
+                if key in self.lookups or len(self.lookups) < self.max_size:
+                    self.lookups[key] = self.lookups.get(key, 0) + 1
+
+        if missing:
+            # Vectorize every miss in one call
+            matrix = transform([keys[position] for position in missing]).tocsr()
+            with self.lock:
+                for row, position in enumerate(missing):
+                    vectors[position] = matrix[row]
+                    self.vectors[keys[position]] = matrix[row]
+                    self.vectors.move_to_end(keys[position])
+                while len(self.vectors) > self.max_size:
+                    evicted, _ = self.vectors.popitem(last=False)
+                    self.lookups.pop(evicted, None)
+        return vectors
+
+    def get_similarity_row(self, query, compute):
+        """
+        Full similarity row for a frequent query, None for the others
+
+        Args:
+            query (str): Raw query string
+            compute (callable): Returns the similarity row when called
+
+        Returns:
+            np.ndarray or None: Similarity against every catalog row
+        """
+        key = cache_key(query)
+        with self.lock:
+            row = self.similarity_rows.get(key)
+            if row is not None:
+                self.row_hits += 1
+                return row
+            frequent = self.lookups.get(key, 0) >= self.hot_threshold
+            if not frequent or len(self.similarity_rows) >= self.max_hot_rows:
+                return None
+            version = self.version
+
+        row = compute()
+        with self.lock:
+            if self.version == version:
+                self.similarity_rows[key] = row
+        return row
+
+    def stats(self):
+        """Cache sizes and hit counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.vectors),
+                'max_size': self.max_size,
+                'similarity_rows': len(self.similarity_rows),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'similarity_row_hits': self.row_hits,
+            }
@@ -0,0 +1,155 @@
+"""
+Typo-tolerant resolution of free-text industry queries.
+
+The TF-IDF vectorizer only matches whole words, so "fintek" or "ecommerce"
+share no vocabulary with the catalog and score zero against every company.
+IndustryQueryResolver maps such queries to the catalog's canonical industry
+names first, using a character-trigram index over the industry vocabulary and
+a synonym table. Resolutions are cached per normalized query.
+"""
+
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+# Normalized alias -> canonical industries. Aliases are matched fuzzily too.
+INDUSTRY_SYNONYMS = {
+    "fintech": ["Fintech"],
+    "financial technology": ["Fintech"],
+    "payments": ["Digital Payments", "Fintech"],
+    "ecommerce": ["E-commerce"],
+    "online shopping": ["E-commerce"],
+    "marketplace": ["E-commerce"],
+    "edtech": ["E-learning"],
+    "education": ["E-learning"],
+    "healthtech": ["Healthcare"],
+    "medtech": ["Healthcare"],
+    "health": ["Healthcare"],
+    "proptech": ["Real Estate"],
+    "property": ["Real Estate"],
+    "bank": ["Banking"],
+    "vc": ["Venture Capital"],
+    "venture": ["Venture Capital"],
+    "investing": ["Investment", "Venture Capital"],
+    "software": ["Tech", "Technology"],
+    "it": ["Technology", "Tech"],
+    "telecom": ["Telecommunications"],
+    "mobility": ["Transport"],
+    "ride hailing": ["Transport"],
+    "transportation": ["Transport"],
+    "shipping": ["Logistics"],
+    "freight": ["Logistics"],
+    "delivery": ["Food Delivery", "Logistics"],
+    "marketing": ["Advertising"],
+    "ads": ["Advertising"],
+    "energy": ["Industry & Energy"],
+    "restaurants": ["Food", "Food Delivery"],
+    "hospitality": ["Tourism", "Travel"],
+}
+
+
+def normalize_query(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = re.sub(r"[^a-z0-9 ]", "", str(text).lower().replace("&", " "))
+    return " ".join(text.split())
+
+
+def _trigrams(text):
+    """Character trigrams of a normalized string padded with spaces"""
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IndustryQueryResolver:
+    def __init__(self, industries, synonyms=None, min_similarity=0.5, max_results=3, cache_size=1024):
+        """
+        Build the trigram index over the known industry vocabulary
+
+        Args:
+            industries (iterable): Canonical industry names from the catalog
+            synonyms (dict, optional): Alias -> canonical industries
+            min_similarity (float): Minimum Dice similarity of trigram sets
+            max_results (int): Maximum number of industries per query
+            cache_size (int): Number of resolved queries kept in the cache
+        """
+        self.industries = sorted(set(industries))
+        self.min_similarity = min_similarity
+        self.max_results = max_results
+
+        # Every indexed term points at the canonical industries it stands for
+        known = set(self.industries)
+        self.terms = []
+        self.term_targets = []
+        for industry in self.industries:
+            self.terms.append(normalize_query(industry))
+            self.term_targets.append((industry,))
+        for alias, targets in (INDUSTRY_SYNONYMS if synonyms is None else synonyms).items():
+            targets = tuple(target for target in targets if target in known)
+            if targets:
+                self.terms.append(normalize_query(alias))
+                self.term_targets.append(targets)
+
+        self.exact_terms = defaultdict(list)
+        self.term_sizes = []
+        self.index = defaultdict(list)
+        for term_id, term in enumerate(self.terms):
+            self.exact_terms[term].append(term_id)
+            grams = _trigrams(term)
+            self.term_sizes.append(len(grams))
+            for gram in grams:
+                self.index[gram].append(term_id)
+
+        self._resolve_cached = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _match_terms(self, text):
+        """Indexed terms similar to text, as (similarity, term_id) pairs"""
+        if text in self.exact_terms:
+            return [(1.0, term_id) for term_id in self.exact_terms[text]]
+
+        grams = _trigrams(text)
+        overlaps = defaultdict(int)
+        for gram in grams:
+            for term_id in self.index.get(gram, ()):
+                overlaps[term_id] += 1
+
+        matches = []
+        for term_id, overlap in overlaps.items():
+            similarity = 2 * overlap / (len(grams) + self.term_sizes[term_id])
+            if similarity >= self.min_similarity:
+                matches.append((similarity, term_id))
+        return matches
+
+    def _resolve(self, normalized):
+        # Match the whole query and each word of a multi-word query
+        parts = [normalized]
+        words = normalized.split()
+        if len(words) > 1:
+            parts.extend(word for word in words if len(word) >= 3)
+
+        best = {}
+        for part in parts:
+            for similarity, term_id in self._match_terms(part):
+                # An alias lists its industries most relevant first
+                for position, industry in enumerate(self.term_targets[term_id]):
+                    score = similarity - 0.001 * position
+                    if score > best.get(industry, 0):
+                        best[industry] = score
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return tuple(industry for industry, _ in ranked[:self.max_results])
+
+    def resolve(self, query):
+        """
+        Map a free-text query to canonical industries
+
+        Args:
+            query (str): Industry text as typed by the user
+
+        Returns:
+            tuple: Canonical industries, best match first; empty if none match
+        """
+        return self._resolve_cached(normalize_query(query))
+
+    def cache_info(self):
+        """Hit and miss counters of the resolution cache"""
+        return self._resolve_cached.cache_info()
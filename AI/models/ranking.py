@@ -0,0 +1,32 @@
+"""
+Shared ranking helpers for the recommendation models.
+"""
+
+import numpy as np
+
+
+def top_k_indices(scores, k):
+    """
+    Indexes of the k highest scores, ties broken by lower index
+    
+    Partitioning first keeps this O(n) for large inputs, and every row tied
+    with the k-th score is kept in the pool, so the result never depends on
+    how the partition happened to order equal scores.
+    
+    Args:
+        scores (np.ndarray): One score per row
+        k (int or None): Number of indexes to return; None returns all
+        
+    Returns:
+        np.ndarray: Indexes into scores, best first
+    """
+    if k is None:
+        k = len(scores)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        kth_best = np.partition(scores, len(scores) - k)[len(scores) - k]
+        pool = np.flatnonzero(scores >= kth_best)
+    else:
+        pool = np.arange(len(scores))
+    return pool[np.lexsort((pool, -scores[pool]))][:k]
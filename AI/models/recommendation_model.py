@@ -1,6 +1,19 @@
-import pandas as pd
+import os
+import re
+import threading
+from contextlib import contextmanager
+import numpy as np
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from models.query_resolver import IndustryQueryResolver
+from models.ranking import top_k_indices
+from models.profiler import stage
+from models.query_cache import QueryVectorCache
+from models.sharded_index import ShardedRecommendationIndex
+from models.compact_catalog import CompactCatalog
+from models.neighbour_graph import (
+    build_neighbour_graph, catalog_fingerprint, load_neighbour_graph, save_neighbour_graph
+)
 
 # Sample data for recommendations
 COMPANY_DATA = [
@@ -63,56 +76,482 @@ COMPANY_DATA = [
     {"Company Name": "Aqarmap", "Industry": "Real Estate", "Funding Amount": "541 million", "Market Size": "Medium"},
 ]
 
+# Ordinal encoding of the Market Size column
+MARKET_SIZE_ORDER = {"Small": 0, "Medium": 1, "Large": 2}
+
+# Multipliers for the unit words used in Funding Amount strings
+FUNDING_UNITS = {"thousand": 1e3, "k": 1e3, "million": 1e6, "m": 1e6, "billion": 1e9, "b": 1e9}
+
+OUTPUT_COLUMNS = ['Company Name', 'Industry', 'Funding Amount', 'Market Size']
+
+# Neighbours kept per company in the precomputed similar-companies graph
+NEIGHBOUR_K = 20
+
+# Default weights of the hybrid ranking score
+DEFAULT_RANKING_WEIGHTS = {"text": 1.0, "funding": 0.05, "market_size": 0.05}
+
+def parse_funding_amount(amount):
+    """
+    Parse a funding string such as "197 million" into US dollars
+    
+    Args:
+        amount (str): Funding amount with an optional unit word
+        
+    Returns:
+        float: Amount in USD, NaN if the string cannot be parsed
+    """
+    match = re.match(r"^\s*\$?([\d,.]+)\s*([a-zA-Z]*)\s*$", str(amount))
+    if not match:
+        return float('nan')
+    value = float(match.group(1).replace(',', ''))
+    unit = match.group(2).lower()
+    if unit and unit not in FUNDING_UNITS:
+        return float('nan')
+    return value * FUNDING_UNITS.get(unit, 1.0)
+
 class RecommendationModel:
-    def __init__(self):
-        self.df = pd.DataFrame(COMPANY_DATA)
+    def __init__(self, company_data=None, num_shards=None):
+        self.catalog = CompactCatalog(COMPANY_DATA if company_data is None else company_data, parse_funding_amount)
+        # Worker processes the catalog is partitioned across; 1 scores in-process
+        self.num_shards = int(os.environ.get("RECOMMENDATION_SHARDS", "1")) if num_shards is None else num_shards
+        self.sharded_index = None
+        self.query_cache = QueryVectorCache()
         self.vectorizer = None
         self.tfidf_matrix = None
+        self.ranking_weights = dict(DEFAULT_RANKING_WEIGHTS)
+        self.neighbours_path = "models/recommendation_neighbours.npz"
+        self.neighbour_indices = None
+        self.neighbour_scores = None
+        self._prepare_catalog()
         self._prepare_model()
     
+    def _prepare_catalog(self):
+        """Parse numeric columns and build the structured filter indexes once"""
+        # Categorical codes plus one bitmap per value, keyed case-insensitively
+        industry_codes = self.catalog.industries.codes
+        market_codes = self.catalog.market_sizes.codes
+        self.industry_values = self.catalog.industries.values
+        self.market_size_values = self.catalog.market_sizes.values
+        self.industry_codes = industry_codes
+        self.market_size_codes = market_codes
+        self.industry_bitmaps = {
+            value.lower(): industry_codes == code for code, value in enumerate(self.industry_values)
+        }
+        self.market_size_bitmaps = {
+            value.lower(): market_codes == code for code, value in enumerate(self.market_size_values)
+        }
+        
+        # Numeric ranking signals normalized to [0, 1]; funding on a log scale
+        funding = self.catalog.funding_usd
+        log_funding = np.log1p(np.nan_to_num(funding, nan=0.0))
+        spread = log_funding.max() - log_funding.min()
+        self.funding_score = (log_funding - log_funding.min()) / spread if spread > 0 else np.zeros(len(funding))
+        # A missing market size (code -1) picks the trailing 0, like an unknown one
+        market_ordinal = np.array(
+            [MARKET_SIZE_ORDER.get(value, 0) for value in self.market_size_values] + [0], dtype=float
+        )[market_codes]
+        self.market_size_score = market_ordinal / max(MARKET_SIZE_ORDER.values())
+        
+        # Sorted funding array for range lookups with searchsorted
+        self.funding_order = np.argsort(funding, kind='stable')
+        self.funding_sorted = funding[self.funding_order]
+        # Unparsable amounts are NaN and sort last; no funding range includes them
+        self.funding_known = int(np.count_nonzero(~np.isnan(funding)))
+        
+        # Typo-tolerant mapping of free-text queries onto the known industries
+        self.query_resolver = IndustryQueryResolver(self.industry_values)
+    
     def _prepare_model(self):
         """Prepare the TF-IDF model"""
-        # Combine industry and company name for better matching
-        self.df['Combined'] = self.df['Industry'] + " " + self.df['Company Name']
-        
-        # Initialize TF-IDF vectorizer
+        # Combine industry and company name for better matching; the texts
+        # are generated row by row rather than stored
         self.vectorizer = TfidfVectorizer(stop_words='english')
-        self.tfidf_matrix = self.vectorizer.fit_transform(self.df['Combined'])
+        self.tfidf_matrix = self.vectorizer.fit_transform(self.catalog.combined_texts())
+        self.catalog_fingerprint = catalog_fingerprint(self.catalog.combined_texts())
+        # Cached query vectors and similarity rows belong to the old vocabulary
+        self.query_cache.invalidate(self.catalog_fingerprint)
+        
+        if self.sharded_index is not None:
+            self.sharded_index.close()
+            self.sharded_index = None
+        if self.num_shards > 1:
+            self.sharded_index = ShardedRecommendationIndex(
+                self.tfidf_matrix, self.funding_score, self.market_size_score, self.num_shards
+            )
+    
+    def resolve_query(self, industry_input: str):
+        """
+        Canonical industries a free-text query refers to
+        
+        Args:
+            industry_input (str): The industry as typed by the user
+            
+        Returns:
+            list: Matching catalog industries, best first
+        """
+        return list(self.query_resolver.resolve(industry_input))
+    
+    def _query_text(self, industry_input):
+        """Append the resolved canonical industries so misspelled or
+        unsegmented queries still share vocabulary with the catalog"""
+        resolved = self.query_resolver.resolve(industry_input)
+        if not resolved:
+            return industry_input
+        return " ".join([industry_input, *resolved])
+    
+    def _transform_queries(self, queries):
+        """Vectorize queries after appending their resolved industries"""
+        return self.vectorizer.transform([self._query_text(query) for query in queries])
+    
+    def _query_vectors(self, queries):
+        """TF-IDF rows for queries, served from the query vector cache"""
+        return sp.vstack(self.query_cache.get_vectors(queries, self._transform_queries), format='csr')
+    
+    def cache_stats(self):
+        """
+        Query vector cache statistics
+        
+        Returns:
+            dict: Sizes, hits, misses and hit rate
+        """
+        return self.query_cache.stats()
+    
+    def rebuild(self, company_data=None):
+        """
+        Rebuild the catalog indexes and TF-IDF model in place
+        
+        Fields are replaced one at a time, so this must not run while the
+        model serves requests; a serving model is replaced through
+        RecommendationModelSlot instead.
+        
+        Args:
+            company_data (list, optional): New catalog records; defaults to the current ones
+        """
+        if company_data is not None:
+            self.catalog = CompactCatalog(company_data, parse_funding_amount)
+        self.neighbour_indices = None
+        self.neighbour_scores = None
+        self._prepare_catalog()
+        self._prepare_model()
+    
+    def rebuilt(self, company_data=None):
+        """
+        A new model over a catalog, with this model's shard count and weights
+        
+        Args:
+            company_data (list, optional): New catalog records; defaults to the current ones
+        """
+        records = self.catalog.records() if company_data is None else company_data
+        model = RecommendationModel(records, num_shards=self.num_shards)
+        model.ranking_weights = dict(self.ranking_weights)
+        return model
+    
+    def close(self):
+        """Stop the shard workers, if any"""
+        if self.sharded_index is not None:
+            self.sharded_index.close()
+            self.sharded_index = None
+    
+    def _union_bitmap(self, bitmaps, values):
+        """OR together the bitmaps of the requested values; unknown values match nothing"""
+        mask = np.zeros(len(self.catalog), dtype=bool)
+        for value in values:
+            bitmap = bitmaps.get(str(value).strip().lower())
+            if bitmap is not None:
+                mask |= bitmap
+        return mask
+    
+    def filter_rows(self, industries=None, market_sizes=None, min_funding=None, max_funding=None):
+        """
+        Intersect the filter indexes into the rows that may be scored
+        
+        Args:
+            industries (list, optional): Allowed industries
+            market_sizes (list, optional): Allowed market sizes
+            min_funding (float, optional): Minimum funding in USD
+            max_funding (float, optional): Maximum funding in USD
+            
+        Returns:
+            np.ndarray or None: Sorted row indexes, None when nothing is filtered
+        """
+        mask = None
+        if industries:
+            mask = self._union_bitmap(self.industry_bitmaps, industries)
+        if market_sizes:
+            market_mask = self._union_bitmap(self.market_size_bitmaps, market_sizes)
+            mask = market_mask if mask is None else mask & market_mask
+        if min_funding is not None or max_funding is not None:
+            low = 0 if min_funding is None else np.searchsorted(self.funding_sorted, min_funding, side='left')
+            high = self.funding_known if max_funding is None else np.searchsorted(
+                self.funding_sorted[:self.funding_known], max_funding, side='right'
+            )
+            funding_mask = np.zeros(len(self.catalog), dtype=bool)
+            funding_mask[self.funding_order[low:high]] = True
+            mask = funding_mask if mask is None else mask & funding_mask
+        return None if mask is None else np.flatnonzero(mask)
+    
+    def get_facets(self, rows=None):
+        """
+        Count companies per industry and market size
+        
+        Args:
+            rows (np.ndarray, optional): Restrict the counts to these rows
+            
+        Returns:
+            dict: Value -> count for each faceted column, zero counts omitted
+        """
+        industry_codes = self.industry_codes if rows is None else self.industry_codes[rows]
+        market_codes = self.market_size_codes if rows is None else self.market_size_codes[rows]
+        # Missing values (code -1) are not a facet value
+        industry_counts = np.bincount(industry_codes[industry_codes >= 0], minlength=len(self.industry_values))
+        market_counts = np.bincount(market_codes[market_codes >= 0], minlength=len(self.market_size_values))
+        return {
+            'industry': {value: int(count) for value, count in zip(self.industry_values, industry_counts) if count},
+            'market_size': {value: int(count) for value, count in zip(self.market_size_values, market_counts) if count}
+        }
+    
+    def _hybrid_scores(self, text_scores, rows=None, weights=None):
+        """
+        Blend text similarity with the precomputed numeric signals
+        
+        Args:
+            text_scores (np.ndarray): Cosine similarity per candidate row
+            rows (np.ndarray, optional): Catalog rows the scores belong to
+            weights (dict, optional): Overrides for the default ranking weights
+            
+        Returns:
+            np.ndarray: Hybrid score per candidate row
+        """
+        w = self.ranking_weights if not weights else {**self.ranking_weights, **weights}
+        funding = self.funding_score if rows is None else self.funding_score[rows]
+        market_size = self.market_size_score if rows is None else self.market_size_score[rows]
+        return w['text'] * text_scores + w['funding'] * funding + w['market_size'] * market_size
     
-    def get_recommendations(self, industry_input: str, top_n: int = 6):
+    def _rank(self, query_vectors, top_n, candidates=None, weights=None, similarities=None):
+        """
+        Top catalog rows for each query vector
+        
+        TF-IDF rows are L2-normalized, so one sparse product gives the cosine
+        similarities of every query against every candidate. With sharding
+        enabled the shard workers score their partitions instead.
+        
+        Args:
+            query_vectors (scipy.sparse matrix): One TF-IDF row per query
+            top_n (int): Rows returned per query
+            candidates (np.ndarray, optional): Catalog rows allowed
+            weights (dict, optional): Ranking weight overrides
+            similarities (np.ndarray, optional): Precomputed similarity rows
+                against the whole catalog, one per query
+            
+        Returns:
+            list: Per query, a (rows, scores) pair of arrays, best first
+        """
+        if self.sharded_index is not None:
+            merged = self.sharded_index.search(
+                query_vectors, top_n, {**self.ranking_weights, **(weights or {})}, candidates
+            )
+            return [
+                (np.array([row for row, _ in pairs], dtype=np.intp), np.array([score for _, score in pairs]))
+                for pairs in merged
+            ]
+        
+        if similarities is not None:
+            similarities = similarities if candidates is None else similarities[:, candidates]
+        else:
+            matrix = self.tfidf_matrix if candidates is None else self.tfidf_matrix[candidates]
+            similarities = (query_vectors @ matrix.T).toarray()
+        scores = self._hybrid_scores(similarities, candidates, weights)
+        
+        ranked = []
+        for row_scores in scores:
+            # Ties keep catalog order
+            order = top_k_indices(row_scores, top_n)
+            rows = order if candidates is None else candidates[order]
+            ranked.append((rows, row_scores[order]))
+        return ranked
+    
+    def get_recommendations(self, industry_input: str, top_n: int = 6, industries=None,
+                            market_sizes=None, min_funding=None, max_funding=None, weights=None):
         """
         Get company recommendations based on industry input
         
         Args:
             industry_input (str): The industry to search for
             top_n (int): Number of recommendations to return
+            industries (list, optional): Only consider these industries
+            market_sizes (list, optional): Only consider these market sizes
+            min_funding (float, optional): Minimum funding in USD
+            max_funding (float, optional): Maximum funding in USD
+            weights (dict, optional): Ranking weights for "text", "funding"
+                and "market_size"; missing keys keep their defaults
             
         Returns:
             list: List of recommended companies
         """
+        with stage("filter"):
+            candidates = self.filter_rows(industries, market_sizes, min_funding, max_funding)
+        if candidates is not None and len(candidates) == 0:
+            return []
+        
         try:
-            # Transform input using the same vectorizer
-            industry_input_tfidf = self.vectorizer.transform([industry_input])
-            
-            # Calculate cosine similarities
-            cosine_similarities = cosine_similarity(industry_input_tfidf, self.tfidf_matrix).flatten()
-            
-            # Add similarity scores to dataframe
-            df_with_scores = self.df.copy()
-            df_with_scores['Cosine Similarity'] = cosine_similarities
+            # Transform input using the same vectorizer, or reuse its cached vector
+            with stage("vectorize"):
+                industry_input_tfidf = self._query_vectors([industry_input])
             
-            # Sort by similarity and get top recommendations
-            recommendations = df_with_scores.sort_values(by='Cosine Similarity', ascending=False)
+            with stage("rank"):
+                # Frequent queries keep their whole similarity row
+                similarities = None
+                if self.sharded_index is None:
+                    row = self.query_cache.get_similarity_row(
+                        industry_input, lambda: (industry_input_tfidf @ self.tfidf_matrix.T).toarray()[0]
+                    )
+                    similarities = None if row is None else row[None, :]
+                
+                # Rank the filtered rows only by hybrid score
+                rows, _ = self._rank(industry_input_tfidf, top_n, candidates, weights, similarities)[0]
             
             # Return top N recommendations
-            top_recommendations = recommendations[['Company Name', 'Industry', 'Funding Amount', 'Market Size']].head(top_n)
-            
-            return top_recommendations.to_dict('records')
+            with stage("materialize"):
+                return self.catalog.records(rows, OUTPUT_COLUMNS)
             
         except Exception as e:
             print(f"Error in recommendation: {e}")
             # Return top companies by funding amount as fallback
-            return self.df.nlargest(top_n, 'Funding Amount')[['Company Name', 'Industry', 'Funding Amount', 'Market Size']].to_dict('records')
+            rows = np.arange(len(self.catalog)) if candidates is None else candidates
+            funding = self.catalog.funding_usd[rows]
+            known = rows[~np.isnan(funding)]
+            return self.catalog.records(known[top_k_indices(self.catalog.funding_usd[known], top_n)], OUTPUT_COLUMNS)
+
+    def _load_or_build_neighbours(self):
+        """Load the neighbour graph built by models.neighbour_graph, or build it"""
+        graph = load_neighbour_graph(self.neighbours_path, self.catalog_fingerprint)
+        if graph is None:
+            print("Building similar-companies neighbour graph...")
+            graph = build_neighbour_graph(self.tfidf_matrix, k=NEIGHBOUR_K)
+            save_neighbour_graph(self.neighbours_path, *graph, self.catalog_fingerprint)
+        self.neighbour_indices, self.neighbour_scores = graph
+    
+    def get_similar_companies(self, company_name: str, top_n: int = 6):
+        """
+        Get the companies most similar to a catalog company
+        
+        Args:
+            company_name (str): Name of a company in the catalog
+            top_n (int): Number of similar companies to return, at most NEIGHBOUR_K
+            
+        Returns:
+            list or None: Similar companies with their similarity, None if the
+                company is not in the catalog
+        """
+        row = self.catalog.find(str(company_name).strip())
+        if row is None:
+            return None
+        if self.neighbour_indices is None:
+            self._load_or_build_neighbours()
+        
+        neighbours = self.neighbour_indices[row, :top_n]
+        scores = self.neighbour_scores[row, :top_n]
+        found = neighbours >= 0
+        records = self.catalog.records(neighbours[found], OUTPUT_COLUMNS)
+        for record, score in zip(records, scores[found]):
+            record['Similarity'] = float(score)
+        return records
+    
+    def get_batch_recommendations(self, industry_inputs, top_n: int = 6, blend=False, industries=None,
+                                  market_sizes=None, min_funding=None, max_funding=None, weights=None):
+        """
+        Get recommendations for many industry queries at once
+        
+        All queries are vectorized together and scored against the catalog
+        with a single sparse matrix product.
+        
+        Args:
+            industry_inputs (list): Industry queries
+            top_n (int): Number of recommendations per query
+            blend (bool): Also return one combined list in which a company
+                matched by several queries appears once, at its best score
+            industries (list, optional): Only consider these industries
+            market_sizes (list, optional): Only consider these market sizes
+            min_funding (float, optional): Minimum funding in USD
+            max_funding (float, optional): Maximum funding in USD
+            weights (dict, optional): Ranking weight overrides
+            
+        Returns:
+            dict: "results" with one recommendation list per query, in input
+                order, and "blended" when blend is set
+        """
+        candidates = self.filter_rows(industries, market_sizes, min_funding, max_funding)
+        if not industry_inputs or (candidates is not None and len(candidates) == 0):
+            empty = {'results': [[] for _ in industry_inputs]}
+            if blend:
+                empty['blended'] = []
+            return empty
+        
+        query_matrix = self._query_vectors(industry_inputs)
+        ranked = self._rank(query_matrix, top_n, candidates, weights)
+        
+        def records(rows):
+            return self.catalog.records(rows, OUTPUT_COLUMNS)
+        
+        result = {'results': [records(rows) for rows, _ in ranked]}
+        
+        if blend:
+            # Deduplicate overlapping candidates by keeping each company's best
+            # score; a company in the blended top-k is always in the top-k of
+            # the query that gives it that score
+            best = {}
+            for query_index, (rows, scores) in enumerate(ranked):
+                for row, score in zip(rows.tolist(), scores.tolist()):
+                    if row not in best or score > best[row][0]:
+                        best[row] = (score, query_index)
+            blended_rows = sorted(best, key=lambda row: (-best[row][0], row))[:top_n]
+            blended = records(blended_rows)
+            for record, row in zip(blended, blended_rows):
+                record['Matched Query'] = industry_inputs[best[row][1]]
+            result['blended'] = blended
+        
+        return result
+
+class RecommendationModelSlot:
+    """
+    The serving recommendation model, replaced whole when the catalog changes
+    
+    Requests take the current model for their whole duration with use(), so
+    every read in a request sees one consistent catalog and index. A replaced
+    model is closed once its last request has finished.
+    """
+    
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.users = {}
+    
+    @contextmanager
+    def use(self):
+        with self.lock:
+            model = self.model
+            self.users[id(model)] = self.users.get(id(model), 0) + 1
+        try:
+            yield model
+        finally:
+            with self.lock:
+                self.users[id(model)] -= 1
+                retired = model is not self.model and not self.users[id(model)]
+                if not self.users[id(model)]:
+                    del self.users[id(model)]
+            if retired:
+                model.close()
+    
+    def replace(self, model):
+        """Serve a fully built model from now on; the old one closes when idle"""
+        with self.lock:
+            old = self.model
+            self.model = model
+            idle = id(old) not in self.users
+        if idle:
+            old.close()
+        return old
 
-# Global instance
-recommendation_model = RecommendationModel() 
\ No newline at end of file
+# Global instances
+recommendation_model = RecommendationModel()
+serving_recommendations = RecommendationModelSlot(recommendation_model) 
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Sharded recommendation index with scatter-gather top-k.
+
+The catalog's TF-IDF rows are split into contiguous shards, each owned by a
+local worker process. A query is scattered to every shard, each shard scores
+only its own rows and returns its local top-k, and the coordinator merges the
+already-sorted shard results with a heap. Memory and scan time per process
+therefore shrink with the shard count.
+"""
+
+import atexit
+import heapq
+import multiprocessing
+import threading
+from itertools import islice
+
+import numpy as np
+
+from models.ranking import top_k_indices
+
+
+def _shard_worker(connection, offset, matrix, funding_score, market_size_score):
+    """Serve queries for one shard until the coordinator sends None"""
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        query_vectors, k, weights, local_rows = request
+        matrix_part = matrix if local_rows is None else matrix[local_rows]
+        similarities = (query_vectors @ matrix_part.T).toarray()
+
+        funding = funding_score if local_rows is None else funding_score[local_rows]
+        market_size = market_size_score if local_rows is None else market_size_score[local_rows]
+        numeric = weights['funding'] * funding + weights['market_size'] * market_size
+        scores = weights['text'] * similarities + numeric
+
+        results = []
+        for row_scores in scores:
+            top = top_k_indices(row_scores, k)
+            rows = top if local_rows is None else local_rows[top]
+            results.append(list(zip((rows + offset).tolist(), row_scores[top].tolist())))
+        connection.send(results)
+    connection.close()
+
+
+class ShardedRecommendationIndex:
+    def __init__(self, tfidf_matrix, funding_score, market_size_score, n_shards):
+        """
+        Partition the catalog and start one worker process per shard
+
+        Args:
+            tfidf_matrix (scipy.sparse matrix): L2-normalized catalog rows
+            funding_score (np.ndarray): Normalized funding per row
+            market_size_score (np.ndarray): Normalized market size per row
+            n_shards (int): Number of shards and worker processes
+        """
+        tfidf_matrix = tfidf_matrix.tocsr()
+        n_rows = tfidf_matrix.shape[0]
+        self.n_shards = max(1, min(n_shards, n_rows))
+        self.boundaries = np.linspace(0, n_rows, self.n_shards + 1).astype(np.intp)
+
+        context = multiprocessing.get_context()
+        self.connections = []
+        self.processes = []
+        for start, stop in zip(self.boundaries[:-1], self.boundaries[1:]):
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_shard_worker,
+                args=(child, int(start), tfidf_matrix[start:stop],
+                      funding_score[start:stop], market_size_score[start:stop]),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+        # One query at a time on the pipes
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def search(self, query_vectors, k, weights, candidates=None):
+        """
+        Top-k catalog rows per query across all shards
+
+        Args:
+            query_vectors (scipy.sparse matrix): One normalized row per query
+            k (int): Results per query
+            weights (dict): Ranking weights for text, funding and market_size
+            candidates (np.ndarray, optional): Sorted catalog rows allowed
+
+        Returns:
+            list: Per query, a list of (row, score) pairs, best first
+        """
+        with self.lock:
+            # Scatter: every shard gets the queries plus its slice of candidates
+            for shard, connection in enumerate(self.connections):
+                local_rows = None
+                if candidates is not None:
+                    start, stop = self.boundaries[shard], self.boundaries[shard + 1]
+                    low, high = np.searchsorted(candidates, [start, stop])
+                    local_rows = candidates[low:high] - start
+                connection.send((query_vectors, k, weights, local_rows))
+
+            # Gather, then heap-merge the shard lists, which arrive sorted
+            shard_results = [connection.recv() for connection in self.connections]
+
+        merged = []
+        for per_query in zip(*shard_results):
+            ordered = heapq.merge(*per_query, key=lambda pair: (-pair[1], pair[0]))
+            merged.append(list(islice(ordered, k)))
+        return merged
+
+    def close(self):
+        """Stop the shard workers"""
+        for connection in self.connections:
+            try:
+                connection.send(None)
+                connection.close()
+            except (OSError, ValueError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+        self.connections = []
+        self.processes = []
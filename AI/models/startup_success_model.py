@@ -1,10 +1,31 @@
-import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import joblib
+import hashlib
 import os
+from models.early_exit_forest import EarlyExitForest
+from models.profiler import stage
+from models.synthetic_data import generate
+
+# Feature order expected by the scaler and every trained estimator
+FEATURE_COLUMNS = [
+    'funding_total_usd', 'milestones', 'has_VC', 'has_angel',
+    'has_roundA', 'has_roundB', 'has_roundC', 'has_roundD',
+    'avg_participants', 'is_CA', 'is_NY', 'is_MA', 'is_TX',
+    'is_otherstate', 'age_first_funding_years'
+]
+
+def artifact_fingerprint(*paths):
+    """SHA-256 over the bytes of the given artifact files, in order"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
 
 class StartupSuccessModel:
     def __init__(self):
@@ -12,51 +33,28 @@ class StartupSuccessModel:
         self.scaler = StandardScaler()
         self.model_path = "models/startup_success_model.pkl"
         self.scaler_path = "models/startup_success_scaler.pkl"
+        self.selected_model_path = "models/startup_success_selected.pkl"
+        self.tree_order_path = "models/startup_success_tree_order.npy"
+        self.compact_model_path = "models/startup_success_compact.pkl"
+        self.surrogate_path = "models/startup_success_surrogate.npz"
+        self.early_exit_forest = None
+        # Logistic surrogate folded with the scaler: (weights, intercept) on raw features
+        self.surrogate = None
+        # Estimator actually used by predict_success; defaults to the forest
+        self.serving_model = None
+        self.serving_scaler = None
+        self.serving_name = "random_forest"
+        # Hashes of the forest's and the serving model's files; change with any retraining
+        self.forest_fingerprint = None
+        self.serving_fingerprint = None
         self._load_or_train_model()
+        self._load_selected_model()
+        self._load_or_fit_surrogate()
     
-    def _generate_sample_data(self):
+    @staticmethod
+    def _generate_sample_data(n_samples=1000, seed=42):
         """Generate sample training data for startup success prediction"""
-        np.random.seed(42)
-        n_samples = 1000
-        
-        data = {
-            'funding_total_usd': np.random.uniform(10000, 10000000, n_samples),
-            'milestones': np.random.randint(0, 20, n_samples),
-            'has_VC': np.random.choice([0, 1], n_samples, p=[0.7, 0.3]),
-            'has_angel': np.random.choice([0, 1], n_samples, p=[0.6, 0.4]),
-            'has_roundA': np.random.choice([0, 1], n_samples, p=[0.8, 0.2]),
-            'has_roundB': np.random.choice([0, 1], n_samples, p=[0.9, 0.1]),
-            'has_roundC': np.random.choice([0, 1], n_samples, p=[0.95, 0.05]),
-            'has_roundD': np.random.choice([0, 1], n_samples, p=[0.98, 0.02]),
-            'avg_participants': np.random.uniform(1, 10, n_samples),
-            'is_CA': np.random.choice([0, 1], n_samples, p=[0.8, 0.2]),
-            'is_NY': np.random.choice([0, 1], n_samples, p=[0.85, 0.15]),
-            'is_MA': np.random.choice([0, 1], n_samples, p=[0.9, 0.1]),
-            'is_TX': np.random.choice([0, 1], n_samples, p=[0.9, 0.1]),
-            'is_otherstate': np.random.choice([0, 1], n_samples, p=[0.7, 0.3]),
-            'age_first_funding_years': np.random.uniform(0, 10, n_samples)
-        }
-        
-        df = pd.DataFrame(data)
-        
-        # Create target variable based on features
-        # Higher funding, more milestones, VC backing, and older age increase success probability
-        success_prob = (
-            df['funding_total_usd'] / 1000000 * 0.1 +
-            df['milestones'] * 0.05 +
-            df['has_VC'] * 0.3 +
-            df['has_angel'] * 0.2 +
-            df['has_roundA'] * 0.15 +
-            df['has_roundB'] * 0.1 +
-            df['has_roundC'] * 0.05 +
-            df['has_roundD'] * 0.05 +
-            df['age_first_funding_years'] * 0.02 +
-            np.random.normal(0, 0.1, n_samples)
-        )
-        
-        df['success'] = (success_prob > 0.5).astype(int)
-        
-        return df
+        return generate('success', n_samples, seed=seed)
     
     def _train_model(self):
         """Train the Random Forest model"""
@@ -66,14 +64,7 @@ class StartupSuccessModel:
         df = self._generate_sample_data()
         
         # Prepare features and target
-        feature_columns = [
-            'funding_total_usd', 'milestones', 'has_VC', 'has_angel',
-            'has_roundA', 'has_roundB', 'has_roundC', 'has_roundD',
-            'avg_participants', 'is_CA', 'is_NY', 'is_MA', 'is_TX',
-            'is_otherstate', 'age_first_funding_years'
-        ]
-        
-        X = df[feature_columns]
+        X = df[FEATURE_COLUMNS]
         y = df['success']
         
         # Split data
@@ -98,6 +89,16 @@ class StartupSuccessModel:
         os.makedirs("models", exist_ok=True)
         joblib.dump(self.model, self.model_path)
         joblib.dump(self.scaler, self.scaler_path)
+        self.forest_fingerprint = artifact_fingerprint(self.model_path, self.scaler_path)
+        
+        # A compacted copy of the previous forest no longer matches
+        if os.path.exists(self.compact_model_path):
+            os.remove(self.compact_model_path)
+        
+        # Order trees for early exit while the training rows are at hand
+        self.early_exit_forest = EarlyExitForest(self.model)
+        np.save(self.tree_order_path, self.early_exit_forest.optimize_order(X_train_scaled))
+        self._fit_surrogate(X_train_scaled)
         
         print("Model saved successfully!")
     
@@ -107,6 +108,7 @@ class StartupSuccessModel:
             if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
                 self.model = joblib.load(self.model_path)
                 self.scaler = joblib.load(self.scaler_path)
+                self.forest_fingerprint = artifact_fingerprint(self.model_path, self.scaler_path)
                 print("Startup success model loaded successfully!")
             else:
                 self._train_model()
@@ -114,6 +116,110 @@ class StartupSuccessModel:
             print(f"Error loading model: {e}")
             self._train_model()
     
+    def _load_selected_model(self):
+        """Serve the candidate exported by models.model_selection, if any,
+        otherwise the compacted forest from models.compact_forest, if any"""
+        self.serving_model = self.model
+        self.serving_scaler = self.scaler
+        self.serving_name = "random_forest"
+        self.serving_fingerprint = self.forest_fingerprint
+        
+        if not os.path.exists(self.selected_model_path):
+            self._load_compact_model()
+            return
+        
+        try:
+            artifact = joblib.load(self.selected_model_path)
+            if artifact.get('feature_columns') != FEATURE_COLUMNS:
+                print("Selected model ignored: feature columns do not match")
+                return
+            self.serving_model = artifact['estimator']
+            self.serving_scaler = artifact['scaler']
+            self.serving_name = artifact['name']
+            self.serving_fingerprint = artifact_fingerprint(self.selected_model_path)
+            print(f"Serving selected startup success model: {self.serving_name}")
+        except Exception as e:
+            print(f"Error loading selected model: {e}")
+    
+    def _load_compact_model(self):
+        """Serve the compacted forest in place of the sklearn one"""
+        if not os.path.exists(self.compact_model_path):
+            return
+        
+        try:
+            compact = joblib.load(self.compact_model_path)
+            if getattr(compact, 'source_fingerprint', None) != self.forest_fingerprint:
+                print("Compact model ignored: it was built from a different forest")
+                return
+            self.serving_model = compact
+            self.serving_name = "random_forest_compact"
+            self.serving_fingerprint = artifact_fingerprint(self.compact_model_path, self.scaler_path)
+            print("Serving compact startup success forest")
+        except Exception as e:
+            print(f"Error loading compact model: {e}")
+    
+    def _fit_surrogate(self, X_train_scaled):
+        """
+        Distill the forest into a logistic regression for deadline fallbacks
+        
+        The forest's probabilities are the soft targets: every row appears once
+        as success and once as failure, weighted by the forest's probability.
+        The scaler is folded into the coefficients, so serving the surrogate
+        is one dot product on the raw features.
+        """
+        probability = self.model.predict_proba(X_train_scaled)[:, list(self.model.classes_).index(1)]
+        n_rows = len(X_train_scaled)
+        logistic = LogisticRegression(max_iter=1000)
+        logistic.fit(
+            np.vstack([X_train_scaled, X_train_scaled]),
+            np.concatenate([np.ones(n_rows), np.zeros(n_rows)]),
+            sample_weight=np.concatenate([probability, 1.0 - probability])
+        )
+        weights = logistic.coef_[0] / self.scaler.scale_
+        intercept = float(logistic.intercept_[0] - np.dot(self.scaler.mean_, weights))
+        np.savez(self.surrogate_path, weights=weights, intercept=intercept, forest_fingerprint=self.forest_fingerprint)
+        self.surrogate = (weights, intercept)
+    
+    def _load_or_fit_surrogate(self):
+        """Load the logistic surrogate, or distill it from the training rows"""
+        try:
+            if os.path.exists(self.surrogate_path):
+                artifact = np.load(self.surrogate_path)
+                # Only a surrogate distilled from these exact forest and scaler files is reused
+                if 'forest_fingerprint' in artifact.files and str(artifact['forest_fingerprint']) == self.forest_fingerprint:
+                    self.surrogate = (artifact['weights'], float(artifact['intercept']))
+                    return
+            df = self._generate_sample_data()
+            X_train, _ = train_test_split(df[FEATURE_COLUMNS], test_size=0.2, random_state=42)
+            self._fit_surrogate(self.scaler.transform(X_train))
+        except Exception as e:
+            print(f"Error preparing surrogate model: {e}")
+    
+    def _get_early_exit_forest(self):
+        """Build the early-exit view of the forest, reusing the offline tree order"""
+        if self.early_exit_forest is not None:
+            return self.early_exit_forest
+        
+        forest = EarlyExitForest(self.model)
+        tree_order = None
+        if os.path.exists(self.tree_order_path):
+            tree_order = np.load(self.tree_order_path)
+        
+        if tree_order is not None and len(tree_order) == forest.n_trees:
+            forest.tree_order = tree_order
+        else:
+            # No usable order on disk: calibrate on the training rows
+            df = self._generate_sample_data()
+            X_train, _ = train_test_split(df[FEATURE_COLUMNS], test_size=0.2, random_state=42)
+            np.save(self.tree_order_path, forest.optimize_order(self.scaler.transform(X_train)))
+        
+        self.early_exit_forest = forest
+        return forest
+    
+    def _feature_vector(self, features):
+        """Arrange a feature dict as a single-row matrix in training column order"""
+        return np.array([[features[column] for column in FEATURE_COLUMNS]])
+    
     def predict_success(self, features):
         """
         Predict startup success probability
@@ -126,35 +232,23 @@ class StartupSuccessModel:
         """
         try:
             # Prepare feature vector
-            feature_vector = np.array([[
-                features['funding_total_usd'],
-                features['milestones'],
-                features['has_VC'],
-                features['has_angel'],
-                features['has_roundA'],
-                features['has_roundB'],
-                features['has_roundC'],
-                features['has_roundD'],
-                features['avg_participants'],
-                features['is_CA'],
-                features['is_NY'],
-                features['is_MA'],
-                features['is_TX'],
-                features['is_otherstate'],
-                features['age_first_funding_years']
-            ]])
+            feature_vector = self._feature_vector(features)
             
             # Scale features
-            scaled_features = self.scaler.transform(feature_vector)
+            with stage("scale"):
+                scaled_features = self.serving_scaler.transform(feature_vector)
             
-            # Make prediction
-            prediction = self.model.predict(scaled_features)[0]
-            probability = self.model.predict_proba(scaled_features)[0]
+            # Make prediction; the class is the argmax of the probabilities,
+            # so a separate predict() call would only traverse the model twice
+            with stage("model"):
+                probability = self.serving_model.predict_proba(scaled_features)[0]
+            prediction = self.serving_model.classes_[np.argmax(probability)]
             
             return {
                 'success_prediction': int(prediction),
                 'success_probability': float(probability[1]),
-                'failure_probability': float(probability[0])
+                'failure_probability': float(probability[0]),
+                'model_name': self.serving_name
             }
             
         except Exception as e:
@@ -166,5 +260,114 @@ class StartupSuccessModel:
                 'error': str(e)
             }
 
+    def predict_success_matrix(self, X):
+        """
+        Success probabilities for a raw feature matrix
+        
+        Args:
+            X (np.ndarray): Shape (n, len(FEATURE_COLUMNS)), training column order
+            
+        Returns:
+            tuple: (predictions, success_probabilities) arrays of shape (n,)
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, len(FEATURE_COLUMNS))
+        with stage("scale"):
+            scaled = self.serving_scaler.transform(X)
+        with stage("model"):
+            probabilities = self.serving_model.predict_proba(scaled)
+        success_column = list(self.serving_model.classes_).index(1)
+        predictions = self.serving_model.classes_[np.argmax(probabilities, axis=1)]
+        return predictions.astype(int), probabilities[:, success_column]
+    
+    def predict_success_batch(self, features_list):
+        """
+        Predict startup success for many startups with one model call
+        
+        Args:
+            features_list (list): Feature dicts as accepted by predict_success
+            
+        Returns:
+            dict: One prediction per startup, in input order
+        """
+        try:
+            X = np.array([[features[column] for column in FEATURE_COLUMNS] for features in features_list], dtype=float)
+            predictions, probabilities = self.predict_success_matrix(X)
+            
+            return {
+                'predictions': [
+                    {
+                        'success_prediction': int(prediction),
+                        'success_probability': float(probability),
+                        'failure_probability': float(1.0 - probability)
+                    }
+                    for prediction, probability in zip(predictions, probabilities)
+                ],
+                'model_name': self.serving_name
+            }
+            
+        except Exception as e:
+            print(f"Error in batch prediction: {e}")
+            return {
+                'predictions': [],
+                'error': str(e)
+            }
+    
+    def predict_success_surrogate(self, features):
+        """
+        Predict startup success with the distilled logistic surrogate
+        
+        Args:
+            features (dict): Dictionary containing startup features
+            
+        Returns:
+            dict: Prediction result with success probability and class
+        """
+        weights, intercept = self.surrogate
+        z = float(np.dot(self._feature_vector(features)[0], weights)) + intercept
+        probability = float(1.0 / (1.0 + np.exp(-np.clip(z, -500, 500))))
+        return {
+            'success_prediction': int(probability > 0.5),
+            'success_probability': probability,
+            'failure_probability': 1.0 - probability,
+            'model_name': 'logistic_surrogate'
+        }
+    
+    def predict_success_early_exit(self, features, margin=None, min_trees=10):
+        """
+        Predict startup success with the forest, stopping once the vote is decided
+        
+        Args:
+            features (dict): Dictionary containing startup features
+            margin (float, optional): Also stop once the running average is this
+                far from 0.5 after min_trees trees; None keeps the class exact
+            min_trees (int): Minimum trees evaluated before a margin exit
+            
+        Returns:
+            dict: Prediction result plus trees_evaluated and early_exit
+        """
+        try:
+            forest = self._get_early_exit_forest()
+            scaled_features = self.scaler.transform(self._feature_vector(features))
+            result = forest.predict_row(scaled_features[0], margin=margin, min_trees=min_trees)
+            
+            return {
+                'success_prediction': result['success_prediction'],
+                'success_probability': result['success_probability'],
+                'failure_probability': 1.0 - result['success_probability'],
+                'model_name': 'random_forest_early_exit',
+                'trees_evaluated': result['trees_evaluated'],
+                'total_trees': forest.n_trees,
+                'early_exit': result['early_exit']
+            }
+            
+        except Exception as e:
+            print(f"Error in early-exit prediction: {e}")
+            return {
+                'success_prediction': 0,
+                'success_probability': 0.0,
+                'failure_probability': 1.0,
+                'error': str(e)
+            }
+
 # Global instance
 startup_success_model = StartupSuccessModel() 
\ No newline at end of file
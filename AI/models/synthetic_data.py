@@ -0,0 +1,253 @@
+"""
+Vectorized synthetic data for training, batch-scoring and recommendation
+benchmarks at production scale.
+
+Three datasets are available:
+    success  Startup success features (FEATURE_COLUMNS) and a 'success' label
+    profit   Spending, state and profit in the layout of profitPredictionData.csv
+    catalog  Recommendation catalog records over the real industry mix
+
+Rows are generated in fixed-size chunks. Each chunk draws from its own
+np.random.Generator, spawned from one SeedSequence, so a dataset depends only
+on (seed, chunk_size). It does not depend on the number of worker processes
+or the order in which chunks finish. Nothing touches the global numpy RNG.
+
+Usage (from the AI directory):
+    python -m models.synthetic_data success --rows 20000000 --out data/synthetic/success --jobs 8
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+# Lists a dataset's part files; written last, so it only names complete parts
+MANIFEST_NAME = "manifest.json"
+
+SYLLABLES = np.array(["ka", "lo", "mi", "ra", "zen", "tor", "vi", "sa", "nu", "pex", "dor", "qi"])
+PROFIT_STATES = np.array(['California', 'Florida', 'New York'])
+
+
+def generate_success_chunk(rng, start, size):
+    """Startup success features with a label driven by funding, milestones and backing"""
+    def flag(p):
+        return (rng.random(size) < p).astype(np.int64)
+
+    df = pd.DataFrame({
+        'funding_total_usd': rng.uniform(10000, 10000000, size),
+        'milestones': rng.integers(0, 20, size),
+        'has_VC': flag(0.3),
+        'has_angel': flag(0.4),
+        'has_roundA': flag(0.2),
+        'has_roundB': flag(0.1),
+        'has_roundC': flag(0.05),
+        'has_roundD': flag(0.02),
+        'avg_participants': rng.uniform(1, 10, size),
+        'is_CA': flag(0.2),
+        'is_NY': flag(0.15),
+        'is_MA': flag(0.1),
+        'is_TX': flag(0.1),
+        'is_otherstate': flag(0.3),
+        'age_first_funding_years': rng.uniform(0, 10, size)
+    })
+
+    # Higher funding, more milestones, VC backing, and older age increase success probability
+    success_prob = (
+        df['funding_total_usd'].to_numpy() / 1000000 * 0.1 +
+        df['milestones'].to_numpy() * 0.05 +
+        df['has_VC'].to_numpy() * 0.3 +
+        df['has_angel'].to_numpy() * 0.2 +
+        df['has_roundA'].to_numpy() * 0.15 +
+        df['has_roundB'].to_numpy() * 0.1 +
+        df['has_roundC'].to_numpy() * 0.05 +
+        df['has_roundD'].to_numpy() * 0.05 +
+        df['age_first_funding_years'].to_numpy() * 0.02 +
+        rng.normal(0, 0.1, size)
+    )
+    df['success'] = (success_prob > 0.5).astype(int)
+    return df
+
+
+def generate_profit_chunk(rng, start, size):
+    """Spending plans and profit, roughly following the real 50-startup data"""
+    rnd = rng.uniform(0, 170000, size)
+    administration = rng.uniform(50000, 185000, size)
+    # Marketing grows with R&D in the real data
+    marketing = np.clip(rnd * 2.0 + rng.normal(50000, 80000, size), 0, None)
+    state = PROFIT_STATES[rng.integers(0, len(PROFIT_STATES), size)]
+    profit = 50000 + 0.8 * rnd + 0.03 * marketing - 0.02 * administration + rng.normal(0, 9000, size)
+    return pd.DataFrame({
+        'R&D Spend': rnd.round(2),
+        'Administration': administration.round(2),
+        'Marketing Spend': marketing.round(2),
+        'State': state,
+        'Profit': profit.round(2)
+    })
+
+
+def generate_catalog_chunk(rng, start, size):
+    """Companies with made-up unique names over the real industry and market size mix"""
+    from models.recommendation_model import COMPANY_DATA
+
+    industries = np.array([company["Industry"] for company in COMPANY_DATA])
+    market_sizes = np.array([company["Market Size"] for company in COMPANY_DATA])
+    # Every three-syllable stem, titled once, indexed by a base-12 code
+    stems = np.array([(a + b + c).title() for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES], dtype=object)
+    names = pd.Series(stems[rng.integers(0, len(stems), size)]) + " "
+    names += pd.Series(np.arange(start, start + size)).astype(str)
+    return pd.DataFrame({
+        'Company Name': names,
+        'Industry': industries[rng.integers(0, len(industries), size)],
+        'Funding Amount': pd.Series(rng.integers(10, 1200, size)).astype(str) + " million",
+        'Market Size': market_sizes[rng.integers(0, len(market_sizes), size)]
+    })
+
+
+DATASETS = {
+    'success': generate_success_chunk,
+    'profit': generate_profit_chunk,
+    'catalog': generate_catalog_chunk,
+}
+
+
+def chunk_plan(n_rows, seed=42, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Split a dataset into chunks with independent random streams
+
+    Returns:
+        list: (chunk index, first row, rows, SeedSequence) per chunk
+    """
+    starts = list(range(0, n_rows, chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    return [
+        (index, start, min(chunk_size, n_rows - start), chunk_seed)
+        for index, (start, chunk_seed) in enumerate(zip(starts, seeds))
+    ]
+
+
+def _generate_chunk(kind, start, size, chunk_seed):
+    return DATASETS[kind](np.random.default_rng(chunk_seed), start, size)
+
+
+def iter_chunks(kind, n_rows, seed=42, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield a dataset chunk by chunk as DataFrames, in row order"""
+    for _, start, size, chunk_seed in chunk_plan(n_rows, seed, chunk_size):
+        yield _generate_chunk(kind, start, size, chunk_seed)
+
+
+def generate(kind, n_rows, seed=42, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generate a dataset in memory
+
+    Args:
+        kind (str): 'success', 'profit' or 'catalog'
+        n_rows (int): Number of rows
+        seed (int): Root seed
+        chunk_size (int): Rows per random stream
+
+    Returns:
+        pd.DataFrame: The dataset
+    """
+    if kind not in DATASETS:
+        raise ValueError(f"Unknown dataset '{kind}', expected one of {sorted(DATASETS)}")
+    return pd.concat(list(iter_chunks(kind, n_rows, seed, chunk_size)), ignore_index=True)
+
+
+def _write_chunk(kind, out_dir, index, start, size, chunk_seed):
+    path = os.path.join(out_dir, f"part-{index:05d}.csv")
+    _generate_chunk(kind, start, size, chunk_seed).to_csv(path, index=False)
+    return path
+
+
+def write_dataset(kind, n_rows, out_dir, seed=42, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=None):
+    """
+    Generate a dataset in parallel, one CSV part file per chunk
+
+    Args:
+        kind (str): 'success', 'profit' or 'catalog'
+        n_rows (int): Number of rows
+        out_dir (str): Directory for the part files
+        seed (int): Root seed
+        chunk_size (int): Rows per part file
+        n_jobs (int, optional): Worker processes; defaults to the CPU count
+
+    Returns:
+        list: Paths of the part files, in row order
+
+    Part files and the manifest of an earlier dataset in out_dir are removed
+    first, so a smaller rewrite never leaves stale parts behind.
+    """
+    if kind not in DATASETS:
+        raise ValueError(f"Unknown dataset '{kind}', expected one of {sorted(DATASETS)}")
+    os.makedirs(out_dir, exist_ok=True)
+    for stale in [os.path.join(out_dir, MANIFEST_NAME)] + glob.glob(os.path.join(out_dir, "part-*.csv")):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    tasks = [(kind, out_dir, *chunk) for chunk in chunk_plan(n_rows, seed, chunk_size)]
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if len(tasks) <= 1 or n_jobs == 1:
+        paths = [_write_chunk(*task) for task in tasks]
+    else:
+        with multiprocessing.Pool(min(n_jobs, len(tasks))) as pool:
+            paths = pool.starmap(_write_chunk, tasks)
+
+    manifest = {'kind': kind, 'rows': n_rows, 'seed': seed, 'chunk_size': chunk_size,
+                'parts': [os.path.basename(path) for path in paths]}
+    temporary = os.path.join(out_dir, MANIFEST_NAME + ".tmp")
+    with open(temporary, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temporary, os.path.join(out_dir, MANIFEST_NAME))
+    return paths
+
+
+def dataset_parts(directory, pattern="part-*.csv"):
+    """
+    Part files of a dataset directory, in row order
+
+    Args:
+        directory (str): Directory of CSV part files
+        pattern (str): Files to read when the directory has no manifest
+
+    Returns:
+        list: The parts named by the manifest of write_dataset if there is
+            one, otherwise every file matching pattern, sorted
+    """
+    manifest = os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            return [os.path.join(directory, part) for part in json.load(f)['parts']]
+    return sorted(glob.glob(os.path.join(directory, pattern)))
+
+
+def read_dataset(out_dir):
+    """Concatenate the part files written by write_dataset"""
+    return pd.concat([pd.read_csv(path) for path in dataset_parts(out_dir)], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic dataset as CSV part files")
+    parser.add_argument('kind', choices=sorted(DATASETS), help="dataset to generate")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="rows to generate")
+    parser.add_argument('--out', help="output directory; defaults to data/synthetic/<kind>")
+    parser.add_argument('--seed', type=int, default=42, help="root seed")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="rows per part file")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    out_dir = args.out or os.path.join("data", "synthetic", args.kind)
+    start = time.perf_counter()
+    paths = write_dataset(args.kind, args.rows, out_dir, args.seed, args.chunk_size, args.jobs)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.rows:,} {args.kind} rows to {len(paths)} files in {out_dir} "
+          f"({elapsed:.1f}s, {args.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Thread budgets for the native thread pools under multi-worker serving.
+
+numpy's OpenBLAS, scikit-learn's OpenMP code and joblib (forest predictions
+with n_jobs) each size their pool to the machine by default. With several
+uvicorn workers and job worker processes on one host, every process then
+tries to use every core. This module gives each kind of work a fixed share:
+
+    interactive  per-request work in the API workers; defaults to 1 thread,
+                 since concurrency comes from requests, not from one request
+    batch        job worker processes; the cores left after the API
+                 workers, split between the job workers
+
+The job worker pool runs once per host, not once per API worker (see
+models.job_queue), so a host runs WEB_CONCURRENCY API workers plus
+JOB_WORKERS job workers, and the two budgets together fit its cores.
+
+Every setting can be overridden through the environment:
+
+    WEB_CONCURRENCY       API worker processes (the uvicorn --workers default)
+    JOB_WORKERS           job worker processes
+    INTERACTIVE_THREADS   native threads per API worker
+    BATCH_THREADS         native threads per job worker
+    EXECUTOR_THREADS      threads of the API's blocking-call executor;
+                          unset keeps the framework default
+
+Pool sizes are process-wide, so a budget is applied to a whole process,
+never around a single call in a threaded server.
+"""
+
+import os
+from contextlib import contextmanager
+
+# Read by OpenBLAS, MKL, OpenMP and numexpr when they are first loaded
+NATIVE_THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS'
+)
+
+
+def available_cores():
+    """Cores this process may run on, honouring CPU affinity"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _env_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+class ThreadBudget:
+    def __init__(self, cores=None, serving_workers=None, job_workers=None,
+                 interactive_threads=None, batch_threads=None, executor_threads=None):
+        """
+        Args:
+            cores (int, optional): Cores shared by all workers; defaults to
+                the cores available to this process
+            serving_workers (int, optional): API worker processes
+            job_workers (int, optional): Job worker processes on the host;
+                the pool runs once per host, whatever the API worker count
+            interactive_threads (int, optional): Native threads per API worker
+            batch_threads (int, optional): Native threads per job worker
+            executor_threads (int, optional): Threads of the API's
+                blocking-call executor; None keeps the framework default
+        """
+        self.cores = cores or available_cores()
+        self.serving_workers = serving_workers or _env_int("WEB_CONCURRENCY") or 1
+        job_workers = job_workers if job_workers is not None else _env_int("JOB_WORKERS")
+        self.job_workers = 1 if job_workers is None else job_workers
+        self.interactive_threads = interactive_threads or _env_int("INTERACTIVE_THREADS") or 1
+        spare_cores = self.cores - self.serving_workers * self.interactive_threads
+        self.batch_threads = (
+            batch_threads or _env_int("BATCH_THREADS")
+            or max(1, spare_cores // max(self.job_workers, 1))
+        )
+        self.executor_threads = executor_threads or _env_int("EXECUTOR_THREADS")
+        self.applied = None
+
+    def threads(self, kind):
+        """Native threads for 'interactive' or 'batch' work"""
+        if kind == 'interactive':
+            return self.interactive_threads
+        if kind == 'batch':
+            return self.batch_threads
+        raise ValueError(f"Unknown workload '{kind}', expected 'interactive' or 'batch'")
+
+    def pin_environment(self, kind='interactive'):
+        """
+        Set the thread variables the native libraries read when loaded
+
+        Must run before numpy is imported to size OpenBLAS's pool; variables
+        already set in the environment win.
+        """
+        for name in NATIVE_THREAD_ENV_VARS:
+            os.environ.setdefault(name, str(self.threads(kind)))
+
+    def apply(self, kind):
+        """Resize the BLAS and OpenMP pools of this process for a workload"""
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(limits=self.threads(kind))
+        self.applied = kind
+
+    @contextmanager
+    def limit(self, kind):
+        """
+        Run a block with the BLAS, OpenMP and joblib pools sized for a workload
+
+        The limits are process-wide while the block runs, so use this only
+        in processes that run one block at a time, such as job workers.
+        """
+        import joblib
+        from threadpoolctl import threadpool_limits
+
+        threads = self.threads(kind)
+        previous = self.applied
+        self.applied = kind
+        try:
+            with threadpool_limits(limits=threads), joblib.parallel_config(n_jobs=threads):
+                yield threads
+        finally:
+            self.applied = previous
+
+    def configure_executor(self):
+        """Cap the threads running blocking calls; call from the event loop"""
+        if self.executor_threads:
+            import anyio.to_thread
+
+            anyio.to_thread.current_default_thread_limiter().total_tokens = self.executor_threads
+
+    def stats(self):
+        from threadpoolctl import threadpool_info
+
+        return {
+            'cores': self.cores,
+            'serving_workers': self.serving_workers,
+            'job_workers': self.job_workers,
+            'interactive_threads': self.interactive_threads,
+            'batch_threads': self.batch_threads,
+            'executor_threads': self.executor_threads,
+            'applied': self.applied,
+            'native_pools': {
+                pool['prefix']: pool['num_threads']
+                for pool in threadpool_info()
+            }
+        }
+
+
+# Global instance
+thread_budget = ThreadBudget()
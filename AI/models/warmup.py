@@ -0,0 +1,183 @@
+"""
+Hot-key recording and start-up warm-up replay.
+
+While the service runs, HotKeyRecorder counts normalized request payloads per
+endpoint and periodically saves the most frequent ones to a small JSON file.
+On the next start, WarmUp replays those payloads through the same code paths
+as real requests, before the service reports ready. This fills the query
+caches, loads lazily built structures such as the neighbour graph, and gets
+sklearn's first-call validation out of the way. A fixed probe per endpoint is
+replayed too, so code paths are warmed even without a recording.
+"""
+
+import json
+import os
+import threading
+import time
+
+HOT_KEYS_PATH = os.getenv("HOT_KEYS_PATH", "data/hot_keys.json")
+
+
+def canonical_payload(payload):
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class HotKeyRecorder:
+    def __init__(self, path=HOT_KEYS_PATH, top_n=50, max_keys=5000, carry_over=0.5):
+        """
+        Args:
+            path (str): JSON file the hot keys are saved to and loaded from
+            top_n (int): Payloads saved per endpoint
+            max_keys (int): Distinct payloads counted per endpoint before the
+                least frequent half is dropped
+            carry_over (float): Weight of the counts loaded from the previous run
+        """
+        self.path = path
+        self.top_n = top_n
+        self.max_keys = max_keys
+        self.carry_over = carry_over
+        self.lock = threading.Lock()
+        self.counts = {}
+        # All requests counted per endpoint, including payloads since dropped
+        self.volume = {}
+        self.load()
+
+    def load(self):
+        """Seed the counters with the saved hot keys; returns them by endpoint"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            saved = data['endpoints']
+        except Exception as e:
+            print(f"Ignoring unreadable hot keys file {self.path}: {e}")
+            return {}
+        # Files written before the volume was saved only know the top-N counts
+        volume = data.get('volume') or {
+            endpoint: sum(entry['count'] for entry in entries) for endpoint, entries in saved.items()
+        }
+        with self.lock:
+            for endpoint, entries in saved.items():
+                counts = self.counts.setdefault(endpoint, {})
+                for entry in entries:
+                    key = canonical_payload(entry['payload'])
+                    counts[key] = counts.get(key, 0) + entry['count'] * self.carry_over
+            for endpoint, total in volume.items():
+                self.volume[endpoint] = self.volume.get(endpoint, 0) + total * self.carry_over
+        return saved
+
+    def record(self, endpoint, payload):
+        """Count one request with its normalized payload"""
+        key = canonical_payload(payload)
+        with self.lock:
+            counts = self.counts.setdefault(endpoint, {})
+            counts[key] = counts.get(key, 0) + 1
+            self.volume[endpoint] = self.volume.get(endpoint, 0) + 1
+            if len(counts) > self.max_keys:
+                keep = sorted(counts.items(), key=lambda item: -item[1])[:self.max_keys // 2]
+                self.counts[endpoint] = dict(keep)
+
+    def top(self):
+        """
+        Most frequent payloads per endpoint
+
+        Returns:
+            dict: endpoint -> list of {'payload', 'count'}, most frequent first
+        """
+        with self.lock:
+            snapshot = {endpoint: list(counts.items()) for endpoint, counts in self.counts.items()}
+        return {
+            endpoint: [
+                {'payload': json.loads(key), 'count': count}
+                for key, count in sorted(items, key=lambda item: -item[1])[:self.top_n]
+            ]
+            for endpoint, items in snapshot.items()
+        }
+
+    def recorded_volume(self):
+        """Requests counted per endpoint, the base of the warm-up coverage"""
+        with self.lock:
+            return dict(self.volume)
+
+    def save(self):
+        """Write the hot keys and the recorded volume atomically"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = self.path + ".tmp"
+        with open(temporary, 'w') as f:
+            json.dump({'saved_at': time.time(), 'endpoints': self.top(), 'volume': self.recorded_volume()}, f)
+        os.replace(temporary, self.path)
+
+    def stats(self):
+        with self.lock:
+            return {endpoint: len(counts) for endpoint, counts in self.counts.items()}
+
+
+class WarmUp:
+    def __init__(self):
+        self.state = 'pending'
+        self.started_at = None
+        self.finished_at = None
+        self.endpoints = {}
+        self.coverage = 0.0
+
+    def run(self, hot_keys, handlers, probes=None, recorded_volume=None):
+        """
+        Replay hot payloads, then mark the warm-up as done
+
+        Args:
+            hot_keys (dict): endpoint -> list of {'payload', 'count'}
+            handlers (dict): endpoint -> callable taking a payload
+            probes (dict, optional): endpoint -> payload replayed even
+                when nothing was recorded for it
+            recorded_volume (dict, optional): endpoint -> all requests
+                recorded, including payloads outside the top-N; defaults
+                to the top-N counts
+        """
+        self.state = 'running'
+        self.started_at = time.time()
+        replayed_volume = 0.0
+        total_volume = 0.0
+        try:
+            for endpoint, handler in handlers.items():
+                entries = list(hot_keys.get(endpoint, []))
+                if probes and endpoint in probes:
+                    entries.append({'payload': probes[endpoint], 'count': 0})
+                status = {'keys': len(entries), 'replayed': 0, 'failed': 0}
+                self.endpoints[endpoint] = status
+                if recorded_volume is not None:
+                    total_volume += recorded_volume.get(endpoint, 0)
+                else:
+                    total_volume += sum(entry['count'] for entry in entries)
+                for entry in entries:
+                    try:
+                        handler(entry['payload'])
+                        status['replayed'] += 1
+                        replayed_volume += entry['count']
+                    except Exception as e:
+                        status['failed'] += 1
+                        print(f"Warm-up replay failed for {endpoint}: {e}")
+        finally:
+            # Coverage is the share of all recorded traffic whose payloads were replayed
+            self.coverage = min(replayed_volume / total_volume, 1.0) if total_volume else 0.0
+            self.finished_at = time.time()
+            self.state = 'done'
+
+    @property
+    def ready(self):
+        return self.state == 'done'
+
+    def status(self):
+        return {
+            'state': self.state,
+            'duration_seconds': (self.finished_at - self.started_at) if self.finished_at else None,
+            'coverage': self.coverage,
+            'keys_replayed': sum(status['replayed'] for status in self.endpoints.values()),
+            'keys_failed': sum(status['failed'] for status in self.endpoints.values()),
+            'endpoints': {endpoint: dict(status) for endpoint, status in self.endpoints.items()}
+        }
+
+
+# Global instances
+hot_key_recorder = HotKeyRecorder()
+warm_up = WarmUp()
@@ -42,6 +42,12 @@ def test_recommendation_model():
                 print(f"    ❌ No recommendations for {industry}")
                 return False
         
+        # top_n=None asks for every company, ranked
+        everything = recommendation_model.get_recommendations("Fintech", top_n=None)
+        if len(everything) != len(recommendation_model.catalog):
+            print(f"  ❌ top_n=None returned {len(everything)} of {len(recommendation_model.catalog)} companies")
+            return False
+        
         print("  ✅ Recommendation model test passed!")
         return True
         
@@ -49,6 +55,371 @@ def test_recommendation_model():
         print(f"  ❌ Recommendation model test failed: {e}")
         return False
 
+def test_recommendation_filters():
+    """Test structured filtering and facets on recommendations"""
+    print("🧪 Testing Recommendation Filters...")
+    
+    try:
+        recommendations = recommendation_model.get_recommendations(
+            "Fintech", top_n=10, market_sizes=["Small"], max_funding=200e6
+        )
+        if not recommendations:
+            print("  ❌ No recommendations for a satisfiable filter")
+            return False
+        
+        for rec in recommendations:
+            funding = float(rec['Funding Amount'].split()[0]) * 1e6
+            if rec['Market Size'] != 'Small' or funding > 200e6:
+                print(f"  ❌ {rec['Company Name']} does not match the filters")
+                return False
+        print(f"  ✅ Filtered recommendations: {len(recommendations)}")
+        
+        if recommendation_model.get_recommendations("Fintech", industries=["Unknown"]):
+            print("  ❌ Unknown industry filter should match nothing")
+            return False
+        
+        # Companies with unparsable funding match no funding range, even an open-ended one
+        from models.recommendation_model import COMPANY_DATA, RecommendationModel
+        undisclosed = {"Company Name": "Quiet Co", "Industry": "Fintech", "Funding Amount": "undisclosed", "Market Size": "Small"}
+        with_undisclosed = RecommendationModel(COMPANY_DATA + [undisclosed], num_shards=1)
+        with_undisclosed.close()
+        names = [r['Company Name'] for r in with_undisclosed.get_recommendations("Fintech", top_n=None, min_funding=800e6)]
+        if not names or "Quiet Co" in names:
+            print(f"  ❌ Minimum-only funding filter returned {names}")
+            return False
+        
+        facets = recommendation_model.get_facets(recommendation_model.filter_rows(industries=["Fintech"]))
+        if facets['industry'] != {'Fintech': 7}:
+            print(f"  ❌ Unexpected facets: {facets['industry']}")
+            return False
+        
+        print("  ✅ Recommendation filters test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Recommendation filters test failed: {e}")
+        return False
+
+def test_query_resolution():
+    """Test typo-tolerant mapping of queries onto catalog industries"""
+    print("🧪 Testing Query Resolution...")
+    
+    try:
+        expected = {
+            "fintek": "Fintech",
+            "ecommerce": "E-commerce",
+            "helthcare": "Healthcare",
+            "Real-estate": "Real Estate",
+        }
+        for query, industry in expected.items():
+            resolved = recommendation_model.resolve_query(query)
+            if not resolved or resolved[0] != industry:
+                print(f"  ❌ {query!r} resolved to {resolved}, expected {industry}")
+                return False
+            top = recommendation_model.get_recommendations(query, top_n=1)[0]
+            print(f"    📋 {query!r} -> {resolved[0]} -> {top['Company Name']}")
+        
+        if recommendation_model.resolve_query("xyzzy"):
+            print("  ❌ Unrelated query should not resolve")
+            return False
+        
+        print("  ✅ Query resolution test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Query resolution test failed: {e}")
+        return False
+
+def test_hybrid_ranking():
+    """Test hybrid scoring weights and deterministic tie-breaking"""
+    print("🧪 Testing Hybrid Ranking...")
+    
+    try:
+        text_only = {'text': 1.0, 'funding': 0.0, 'market_size': 0.0}
+        names = [r['Company Name'] for r in recommendation_model.get_recommendations("xyzzy", top_n=5, weights=text_only)]
+        # Nothing matches, so every score ties and catalog order decides
+        expected = [r['Company Name'] for r in recommendation_model.catalog.records(range(5))]
+        if names != expected:
+            print(f"  ❌ Tied scores not in catalog order: {names}")
+            return False
+        
+        funding_only = {'text': 0.0, 'funding': 1.0, 'market_size': 0.0}
+        top = recommendation_model.get_recommendations("xyzzy", top_n=1, weights=funding_only)[0]
+        if top['Company Name'] != 'Orange Egypt':
+            print(f"  ❌ Expected the best-funded company, got {top['Company Name']}")
+            return False
+        
+        first = recommendation_model.get_recommendations("Tech", top_n=6)
+        second = recommendation_model.get_recommendations("Tech", top_n=6)
+        if first != second:
+            print("  ❌ Repeated queries returned different rankings")
+            return False
+        
+        print("  ✅ Hybrid ranking test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Hybrid ranking test failed: {e}")
+        return False
+
+def test_batch_recommendations():
+    """Test that batch recommendations match single-query results"""
+    print("🧪 Testing Batch Recommendations...")
+    
+    try:
+        queries = ["Fintech", "Transport", "helthcare", "Fintech"]
+        batch = recommendation_model.get_batch_recommendations(queries, top_n=4, blend=True)
+        
+        for query, recommendations in zip(queries, batch['results']):
+            single = recommendation_model.get_recommendations(query, top_n=4)
+            if [r['Company Name'] for r in recommendations] != [r['Company Name'] for r in single]:
+                print(f"  ❌ Batch result for {query} differs from the single query")
+                return False
+        
+        names = [r['Company Name'] for r in batch['blended']]
+        if len(names) != len(set(names)) or len(names) != 4:
+            print(f"  ❌ Blended list not deduplicated: {names}")
+            return False
+        
+        print(f"    📋 Blended: {', '.join(names)}")
+        print("  ✅ Batch recommendations test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Batch recommendations test failed: {e}")
+        return False
+
+def test_similar_companies():
+    """Test the precomputed neighbour graph against a full similarity scan"""
+    print("🧪 Testing Similar Companies...")
+    
+    try:
+        import numpy as np
+        from models.neighbour_graph import build_neighbour_graph
+        
+        matrix = recommendation_model.tfidf_matrix
+        # Blocks smaller than the catalog exercise the block boundaries
+        indices, scores = build_neighbour_graph(matrix, k=5, block_size=10, n_jobs=2)
+        full = (matrix @ matrix.T).toarray()
+        np.fill_diagonal(full, -np.inf)
+        for row in range(matrix.shape[0]):
+            found = indices[row] >= 0
+            expected = np.sort(full[row])[::-1][:found.sum()]
+            if not np.allclose(np.sort(scores[row][found])[::-1], expected, atol=1e-6):
+                print(f"  ❌ Neighbour scores wrong for row {row}")
+                return False
+        
+        similar = recommendation_model.get_similar_companies("Paymob", top_n=3)
+        if not similar or any(rec['Company Name'] == 'Paymob' for rec in similar):
+            print("  ❌ Similar companies should exclude the company itself")
+            return False
+        if recommendation_model.get_similar_companies("No Such Company") is not None:
+            print("  ❌ Unknown company should return None")
+            return False
+        
+        print(f"    📋 Like Paymob: {', '.join(rec['Company Name'] for rec in similar)}")
+        print("  ✅ Similar companies test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Similar companies test failed: {e}")
+        return False
+
+def test_sharded_recommendations():
+    """Test that scatter-gather over shards matches in-process scoring"""
+    print("🧪 Testing Sharded Recommendations...")
+    
+    try:
+        from models.recommendation_model import RecommendationModel
+        
+        sharded = RecommendationModel(num_shards=3)
+        try:
+            for query in ["Fintech", "Transport", "xyzzy"]:
+                expected = recommendation_model.get_recommendations(query, top_n=8)
+                actual = sharded.get_recommendations(query, top_n=8)
+                if actual != expected:
+                    print(f"  ❌ Sharded results differ for {query}")
+                    return False
+            
+            filtered = sharded.get_recommendations("Fintech", top_n=5, market_sizes=["Medium"])
+            if filtered != recommendation_model.get_recommendations("Fintech", top_n=5, market_sizes=["Medium"]):
+                print("  ❌ Sharded results differ with filters")
+                return False
+        finally:
+            sharded.sharded_index.close()
+        
+        print("  ✅ Sharded recommendations test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Sharded recommendations test failed: {e}")
+        return False
+
+def test_query_vector_cache():
+    """Test query vector memoization and its invalidation"""
+    print("🧪 Testing Query Vector Cache...")
+    
+    try:
+        from models.recommendation_model import RecommendationModel, COMPANY_DATA
+        
+        model = RecommendationModel()
+        expected = model.get_recommendations("Healthcare", top_n=5)
+        # Same query modulo case and spacing, past the similarity-row threshold
+        for _ in range(model.query_cache.hot_threshold + 2):
+            if model.get_recommendations("  healthcare ", top_n=5) != expected:
+                print("  ❌ Cached query returned different recommendations")
+                return False
+        
+        stats = model.cache_stats()
+        if stats['misses'] != 1 or stats['similarity_rows'] != 1:
+            print(f"  ❌ Unexpected cache stats: {stats}")
+            return False
+        print(f"    📊 Hit rate: {stats['hit_rate']:.2f}")
+        
+        model.rebuild(COMPANY_DATA[:20])
+        if model.cache_stats()['size'] != 0:
+            print("  ❌ Cache not invalidated after the vocabulary changed")
+            return False
+        
+        print("  ✅ Query vector cache test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Query vector cache test failed: {e}")
+        return False
+
+def test_recommendation_model_swap():
+    """Test replacing the serving recommendation model while it is in use"""
+    print("🧪 Testing Recommendation Model Swap...")
+    
+    try:
+        from models.recommendation_model import COMPANY_DATA, RecommendationModel, RecommendationModelSlot
+        
+        old = RecommendationModel(COMPANY_DATA, num_shards=2)
+        slot = RecommendationModelSlot(old)
+        with slot.use() as model:
+            slot.replace(old.rebuilt(COMPANY_DATA[:20]))
+            # The request that started on the old model keeps a working index
+            if model is not old or old.sharded_index is None or not model.get_recommendations("Fintech", 3):
+                print("  ❌ Old model was closed under an in-flight request")
+                return False
+        if old.sharded_index is not None:
+            print("  ❌ Old model was not closed after its last request")
+            return False
+        
+        with slot.use() as model:
+            if len(model.catalog) != 20 or model.num_shards != 2:
+                print("  ❌ New model not served after the swap")
+                return False
+        slot.model.close()
+        print("  ✅ Old model closed once idle; new catalog served")
+        
+        print("  ✅ Recommendation model swap test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Recommendation model swap test failed: {e}")
+        return False
+
+def test_single_flight():
+    """Test coalescing of concurrent identical requests"""
+    print("🧪 Testing Single-Flight Request Coalescing...")
+    
+    try:
+        import asyncio
+        import threading
+        from main import SingleFlight
+        
+        calls = []
+        release = threading.Event()
+        
+        def slow_square(value):
+            calls.append(value)
+            release.wait(5)
+            return value * value
+        
+        async def burst():
+            flight = SingleFlight()
+            duplicates = [flight.run("square", {'value': 7}, slow_square, 7) for _ in range(10)]
+            other = flight.run("square", {'value': 3}, slow_square, 3)
+            pending = asyncio.gather(*duplicates, other)
+            await asyncio.sleep(0.05)
+            release.set()
+            return await pending, flight.stats()
+        
+        results, stats = asyncio.run(burst())
+        if results != [49] * 10 + [9] or sorted(calls) != [3, 7]:
+            print(f"  ❌ Duplicates were recomputed: {calls}")
+            return False
+        counters = stats['endpoints']['square']
+        if counters != {'executions': 2, 'coalesced': 9} or stats['in_flight'] != 0:
+            print(f"  ❌ Unexpected counters: {stats}")
+            return False
+        print(f"  ✅ 11 requests ran {counters['executions']} computations, {counters['coalesced']} coalesced")
+        
+        print("  ✅ Single-flight test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Single-flight test failed: {e}")
+        return False
+
+def test_stack_profiler():
+    """Test the sampling profiler and per-request stage tracing"""
+    print("🧪 Testing Sampling Profiler...")
+    
+    try:
+        import contextvars
+        import threading
+        from models.profiler import StackSampler, flame_graph, server_timing_header, stage, start_trace
+        
+        def busy_loop(deadline):
+            total = 0
+            while time.perf_counter() < deadline:
+                total += 1
+            return total
+        
+        sampler = StackSampler()
+        worker = threading.Thread(target=busy_loop, args=(time.perf_counter() + 0.3,))
+        sampler.start(seconds=0.25, interval=0.002)
+        worker.start()
+        worker.join()
+        sampler.stop()
+        
+        results = sampler.results()
+        busy = sum(count for stack, count in results['collapsed'].items() if 'busy_loop' in stack.split(';')[-1])
+        if results['samples'] == 0 or busy == 0:
+            print(f"  ❌ Busy thread was not sampled: {results['samples']} samples")
+            return False
+        tree = flame_graph(results['collapsed'])
+        if tree['value'] != sum(results['collapsed'].values()):
+            print(f"  ❌ Flame graph does not account for every sample")
+            return False
+        print(f"  ✅ {results['samples']} samples, {busy} in the busy thread")
+        
+        # Stages only record inside a traced request
+        with stage("untraced"):
+            pass
+        def traced_request():
+            timings = start_trace()
+            with stage("model"):
+                busy_loop(time.perf_counter() + 0.002)
+            return timings
+        
+        timings = contextvars.copy_context().run(traced_request)
+        header = server_timing_header(timings, 0.01)
+        if len(timings) != 1 or not header.startswith("model;dur=") or "total;dur=10.000" not in header:
+            print(f"  ❌ Unexpected Server-Timing header: {header}")
+            return False
+        print(f"  ✅ Server-Timing: {header}")
+        
+        print("  ✅ Sampling profiler test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Sampling profiler test failed: {e}")
+        return False
+
 def test_startup_success_model():
     """Test the startup success prediction model directly"""
     print("🧪 Testing Startup Success Model...")
@@ -93,6 +464,608 @@ def test_startup_success_model():
         print(f"  ❌ Startup success model test failed: {e}")
         return False
 
+def test_binary_batch_format():
+    """Test the binary batch encoding and batch success predictions"""
+    print("🧪 Testing Binary Batch Format...")
+    
+    try:
+        import numpy as np
+        from models.binary_codec import decode_matrix, encode_matrix
+        from models.startup_success_model import FEATURE_COLUMNS
+        
+        df = startup_success_model._generate_sample_data().head(50)
+        X = df[FEATURE_COLUMNS].to_numpy(dtype=float)
+        
+        decoded = decode_matrix(encode_matrix(X), len(FEATURE_COLUMNS))
+        if decoded.shape != X.shape or not np.allclose(decoded, X.astype(np.float32)):
+            print(f"  ❌ Float matrix round trip changed the values")
+            return False
+        with_nan = X.copy()
+        with_nan[2, 0] = np.nan
+        empty = encode_matrix(np.empty((0, len(FEATURE_COLUMNS))))
+        for broken in (b"SFM1", encode_matrix(X)[:-4], encode_matrix(X[:, :3]), empty, encode_matrix(with_nan)):
+            try:
+                decode_matrix(broken, len(FEATURE_COLUMNS))
+                print(f"  ❌ Malformed body was accepted")
+                return False
+            except ValueError:
+                pass
+        print(f"  ✅ Float matrix round trip: {len(encode_matrix(X)):,} bytes for {len(X)} rows")
+        
+        # Batch and matrix predictions must match the single-row endpoint
+        batch = startup_success_model.predict_success_batch(df[FEATURE_COLUMNS].to_dict('records'))
+        _, probabilities = startup_success_model.predict_success_matrix(decoded)
+        single = [startup_success_model.predict_success(row)['success_probability']
+                  for row in df[FEATURE_COLUMNS].to_dict('records')[:10]]
+        batch_probabilities = [p['success_probability'] for p in batch['predictions']]
+        if not np.allclose(batch_probabilities[:10], single) or not np.allclose(probabilities, batch_probabilities, atol=1e-6):
+            print(f"  ❌ Batch predictions differ from single predictions")
+            return False
+        print(f"  ✅ {len(batch['predictions'])} batch predictions match single-row predictions")
+        
+        print("  ✅ Binary batch format test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Binary batch format test failed: {e}")
+        return False
+
+def test_feature_store():
+    """Test the startup feature store and its score cache"""
+    print("🧪 Testing Startup Feature Store...")
+    
+    try:
+        import os
+        import tempfile
+        import joblib
+        from models.feature_store import StartupFeatureStore
+        from models.startup_success_model import FEATURE_COLUMNS, artifact_fingerprint
+        
+        store = StartupFeatureStore(FEATURE_COLUMNS, path=":memory:")
+        rows = startup_success_model._generate_sample_data().head(20)[FEATURE_COLUMNS].to_dict('records')
+        records = [dict(row, startup_id=f"s{i}") for i, row in enumerate(rows)]
+        
+        first = store.upsert_many(records)
+        again = store.upsert_many(records)
+        if first['changed'] != 20 or again['changed'] != 0:
+            print(f"  ❌ Unchanged upserts were counted as changes: {first}, {again}")
+            return False
+        
+        calls = []
+        def predict(X):
+            calls.append(len(X))
+            return startup_success_model.predict_success_matrix(X)
+        
+        ids = [record['startup_id'] for record in records] + ["unknown"]
+        fingerprint = startup_success_model.serving_fingerprint
+        scored = store.score(ids, predict, fingerprint)
+        if scored['missing'] != ["unknown"] or len(scored['predictions']) != 20 or calls != [20]:
+            print(f"  ❌ Unexpected first scoring: calls={calls}, missing={scored['missing']}")
+            return False
+        expected = startup_success_model.predict_success(rows[3])['success_probability']
+        if abs(scored['predictions'][3]['success_probability'] - expected) > 1e-9:
+            print(f"  ❌ Stored features scored differently from the request path")
+            return False
+        
+        # Only the startup whose features changed is rescored
+        store.upsert_many([dict(records[5], milestones=records[5]['milestones'] + 1)])
+        rescored = store.score(ids, predict, fingerprint)
+        if calls != [20, 1] or rescored['cache_hits'] != 19 or rescored['predictions'][5]['cached']:
+            print(f"  ❌ Score cache was not invalidated correctly: calls={calls}")
+            return False
+        
+        # Retraining changes the artifact bytes, and so the fingerprint,
+        # even when the serving model keeps its name
+        with tempfile.TemporaryDirectory() as directory:
+            artifact = os.path.join(directory, "model.pkl")
+            joblib.dump(startup_success_model.model.estimators_[:2], artifact)
+            before = artifact_fingerprint(artifact)
+            joblib.dump(startup_success_model.model.estimators_[1:3], artifact)
+            retrained = artifact_fingerprint(artifact)
+        if before == retrained:
+            print(f"  ❌ Different artifacts share a fingerprint")
+            return False
+        
+        # A different serving model invalidates every cached score
+        store.score(ids[:4], predict, retrained)
+        if calls[-1] != 4:
+            print(f"  ❌ Scores were reused across models")
+            return False
+        print(f"  ✅ {store.stats()['cache_hits']} cache hits, model calls per request: {calls}")
+        
+        print("  ✅ Startup feature store test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Startup feature store test failed: {e}")
+        return False
+
+def test_job_queue():
+    """Test the persistent job queue and a worker process"""
+    print("🧪 Testing Job Queue...")
+    
+    try:
+        import tempfile
+        from models.job_queue import JobQueue, JobWorkerPool, read_rebuilt_catalog, run_job
+        from models.recommendation_model import COMPANY_DATA
+        from models.startup_success_model import FEATURE_COLUMNS
+        
+        directory = tempfile.mkdtemp()
+        path = f"{directory}/jobs.sqlite3"
+        queue = JobQueue(path, results_dir=f"{directory}/results")
+        rows = startup_success_model._generate_sample_data().head(30)[FEATURE_COLUMNS].to_dict('records')
+        
+        # Run a job in-process and check its result file against the model
+        job_id = queue.submit('score_startups', {'rows': rows})
+        run_job(queue, queue.claim_next())
+        job = queue.get(job_id)
+        with open(job['result_path']) as result:
+            lines = [json.loads(line) for line in result]
+        expected = startup_success_model.predict_success(rows[7])['success_probability']
+        if job['status'] != 'succeeded' or len(lines) != 30 or abs(lines[7]['success_probability'] - expected) > 1e-9:
+            print(f"  ❌ Unexpected job outcome: {job['status']}, {len(lines)} lines")
+            return False
+        
+        failing = queue.submit('score_profit', {'items': [{'RnD_Spend': 1.0}]})
+        run_job(queue, queue.claim_next())
+        if queue.get(failing)['status'] != 'failed' or queue.claim_next() is not None:
+            print("  ❌ A broken job was not marked as failed")
+            return False
+        
+        # A rebuild without a catalog rebuilds the latest rebuilt one, not the built-in one
+        catalog = COMPANY_DATA[:10] + [{"Company Name": "Rebuilt Co", "Industry": "Fintech",
+                                        "Funding Amount": "5 million", "Market Size": "Small"}]
+        queue.submit('rebuild_recommendations', {'companies': catalog})
+        run_job(queue, queue.claim_next())
+        again = queue.submit('rebuild_recommendations', {})
+        run_job(queue, queue.claim_next())
+        latest = queue.latest_rebuild()
+        if latest is None or latest['id'] != again or read_rebuilt_catalog(latest) != catalog:
+            print("  ❌ Rebuilding the current catalog restored the built-in one")
+            return False
+        
+        # A running job is requeued only once its lease has expired
+        stale = queue.submit('score_profit', {'items': [{'RnD_Spend': 1e5, 'Administration': 1e5, 'Marketing_Spend': 2e5}]})
+        queue.claim_next()
+        if queue.requeue_interrupted() != 0 or queue.get(stale)['owner'] != queue.owner:
+            print("  ❌ A job with a live lease was requeued")
+            return False
+        if queue.requeue_interrupted(lease_seconds=0) != 1 or queue.get(stale)['status'] != 'queued':
+            print("  ❌ Interrupted job was not requeued")
+            return False
+        
+        # A worker process picks the job up from the shared database; a
+        # second pool on the same host does not start
+        pool = JobWorkerPool(1, path=path, results_dir=queue.results_dir, poll_interval=0.05)
+        pool.start()
+        try:
+            if JobWorkerPool(1, path=path, results_dir=queue.results_dir).start():
+                print("  ❌ Two job worker pools started on one host")
+                return False
+            deadline = time.time() + 30
+            while queue.get(stale)['status'] not in ('succeeded', 'failed') and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            pool.stop()
+        job = queue.get(stale)
+        if job['status'] != 'succeeded' or job['progress'] != 1:
+            print(f"  ❌ Worker did not finish the job: {job['status']} {job['error']}")
+            return False
+        print(f"  ✅ Jobs by status: {queue.stats()}")
+        
+        print("  ✅ Job queue test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Job queue test failed: {e}")
+        return False
+
+def test_compact_catalog():
+    """Test the compact catalog store behind the recommendation model"""
+    print("🧪 Testing Compact Catalog...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        from models.compact_catalog import CompactCatalog
+        from models.recommendation_model import COMPANY_DATA, RecommendationModel, parse_funding_amount
+        
+        records = COMPANY_DATA + [
+            {"Company Name": "Café Ünïcode", "Industry": "Food", "Funding Amount": "12 million", "Market Size": "Small"},
+            {"Company Name": "SWVL", "Industry": "Transport", "Funding Amount": "3 billion", "Market Size": "Large"},
+        ]
+        catalog = CompactCatalog(records, parse_funding_amount)
+        if catalog.records() != records:
+            print("  ❌ Records did not round-trip through the store")
+            return False
+        if catalog.records([len(records) - 2], ['Company Name']) != [{'Company Name': "Café Ünïcode"}]:
+            print("  ❌ Non-ASCII name was not decoded correctly")
+            return False
+        
+        # Lookups are case-insensitive and the last duplicate wins, like a dict
+        if catalog.find("café ünïcode") != len(records) - 2 or catalog.find("swvl") != len(records) - 1 or catalog.find("nope") is not None:
+            print("  ❌ Name lookup returned the wrong rows")
+            return False
+        if catalog.funding_usd[-1] != 3e9:
+            print("  ❌ Funding was not parsed")
+            return False
+        
+        # Missing values read back as None, never as another row's value
+        gaps = records + [{"Company Name": "Gaps", "Industry": None, "Funding Amount": float('nan'), "Market Size": None}]
+        with_gaps = CompactCatalog(gaps, parse_funding_amount)
+        if with_gaps.records([len(gaps) - 1]) != [{"Company Name": "Gaps", "Industry": None, "Funding Amount": None, "Market Size": None}]:
+            print(f"  ❌ Missing values were misread: {with_gaps.records([len(gaps) - 1])}")
+            return False
+        if not np.isnan(with_gaps.funding_usd[-1]) or list(with_gaps.combined_texts())[-1] != " Gaps":
+            print("  ❌ Missing funding or industry leaked into derived columns")
+            return False
+        gap_model = RecommendationModel(gaps, num_shards=1)
+        gap_model.close()
+        if gap_model.market_size_score[-1] != 0:
+            print("  ❌ Missing market size was ranked like a known one")
+            return False
+        if sum(gap_model.get_facets()['industry'].values()) != len(records):
+            print("  ❌ Missing industry was counted as a facet value")
+            return False
+        
+        frame_bytes = pd.DataFrame(records).memory_usage(deep=True).sum()
+        compact_bytes = catalog.memory_usage()['total']
+        if compact_bytes >= frame_bytes:
+            print(f"  ❌ Compact store is not smaller: {compact_bytes} vs {frame_bytes} bytes")
+            return False
+        print(f"  ✅ {compact_bytes} bytes vs {frame_bytes} for the DataFrame")
+        
+        print("  ✅ Compact catalog test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Compact catalog test failed: {e}")
+        return False
+
+def test_synthetic_data():
+    """Test the chunked synthetic data generator"""
+    print("🧪 Testing Synthetic Data Generator...")
+    
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        from models.profit_training import load_profit_data
+        from models.startup_success_model import FEATURE_COLUMNS
+        from models.synthetic_data import generate, read_dataset, write_dataset
+        
+        np.random.seed(123)
+        expected_draw = np.random.random()
+        np.random.seed(123)
+        success = generate('success', 2500, chunk_size=1000)
+        if np.random.random() != expected_draw:
+            print("  ❌ Generator touched the global numpy RNG")
+            return False
+        if list(success.columns) != FEATURE_COLUMNS + ['success'] or len(success) != 2500:
+            print(f"  ❌ Unexpected success columns or size: {list(success.columns)}")
+            return False
+        
+        # Parallel part files match the in-memory dataset row for row
+        directory = tempfile.mkdtemp()
+        paths = write_dataset('profit', 2500, directory, chunk_size=1000, n_jobs=2)
+        written = read_dataset(directory)
+        profit = generate('profit', 2500, chunk_size=1000)
+        if len(paths) != 3 or not np.allclose(written['Profit'], profit['Profit']):
+            print("  ❌ Part files differ from the generated dataset")
+            return False
+        
+        # A smaller rewrite of the same directory leaves no stale parts behind,
+        # and stray CSV files next to the parts are not read
+        write_dataset('profit', 1500, directory, chunk_size=1000, n_jobs=1)
+        generate('profit', 10).to_csv(os.path.join(directory, "notes.csv"), index=False)
+        if len(read_dataset(directory)) != 1500 or len(load_profit_data(directory)) != 1500:
+            print("  ❌ Rewritten dataset mixed in stale or unrelated files")
+            return False
+        
+        catalog = generate('catalog', 3000, chunk_size=1000)
+        if catalog['Company Name'].nunique() != 3000 or generate('catalog', 3000, seed=1).equals(catalog):
+            print("  ❌ Catalog names are not unique or seeds are ignored")
+            return False
+        print(f"  ✅ Success rate {success['success'].mean():.2f}, {len(paths)} profit part files")
+        
+        print("  ✅ Synthetic data generator test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Synthetic data generator test failed: {e}")
+        return False
+
+def test_hot_key_warm_up():
+    """Test hot-key recording and the start-up warm-up replay"""
+    print("🧪 Testing Hot-Key Warm-Up...")
+    
+    try:
+        import tempfile
+        from models.warmup import HotKeyRecorder, WarmUp
+        
+        path = f"{tempfile.mkdtemp()}/hot_keys.json"
+        recorder = HotKeyRecorder(path, top_n=2)
+        for industry, hits in (("fintech", 5), ("healthcare", 3), ("retail", 1)):
+            for _ in range(hits):
+                recorder.record("recommendations", {'industry': industry, 'top_n': 6})
+        recorder.record("profit", {'features': {'RnD_Spend': 1.0}})
+        recorder.save()
+        
+        # The next run starts from the saved top-N, most frequent first
+        loaded = HotKeyRecorder(path)
+        hot_keys = loaded.top()
+        industries = [entry['payload']['industry'] for entry in hot_keys['recommendations']]
+        if industries != ["fintech", "healthcare"]:
+            print(f"  ❌ Unexpected hot keys: {industries}")
+            return False
+        
+        replayed = []
+        def replay_recommendations(payload):
+            replayed.append(payload['industry'])
+            recommendation_model.get_recommendations(payload['industry'], payload['top_n'])
+        def replay_profit(payload):
+            raise ValueError("broken payload")
+        
+        warm_up = WarmUp()
+        warm_up.run(hot_keys, {"recommendations": replay_recommendations, "profit": replay_profit},
+                    probes={"recommendations": {'industry': "transport", 'top_n': 6}},
+                    recorded_volume=loaded.recorded_volume())
+        status = warm_up.status()
+        # 8 of the 10 recorded requests had their payload replayed; "retail"
+        # was recorded but fell outside the top-N
+        if not warm_up.ready or replayed != ["fintech", "healthcare", "transport"] or abs(status['coverage'] - 8 / 10) > 1e-9:
+            print(f"  ❌ Unexpected warm-up outcome: {replayed}, {status}")
+            return False
+        if status['keys_failed'] != 1:
+            print("  ❌ Failed replay was not counted")
+            return False
+        print(f"  ✅ Coverage {status['coverage']:.2f} in {status['duration_seconds'] * 1000:.1f} ms")
+        
+        print("  ✅ Hot-key warm-up test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Hot-key warm-up test failed: {e}")
+        return False
+
+def test_deadline_cascade():
+    """Test deadline-aware tier selection for startup success"""
+    print("🧪 Testing Deadline Cascade...")
+    
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        from models.deadline_cascade import DeadlineCascade
+        from models.startup_success_model import FEATURE_COLUMNS
+        
+        rows = startup_success_model._generate_sample_data(200, seed=3)[FEATURE_COLUMNS].to_dict('records')
+        agreement = np.mean([
+            startup_success_model.predict_success_surrogate(row)['success_prediction'] ==
+            startup_success_model.predict_success(row)['success_prediction']
+            for row in rows
+        ])
+        if agreement < 0.9:
+            print(f"  ❌ Surrogate agrees with the forest on only {agreement:.0%} of rows")
+            return False
+        
+        # A saved surrogate is reused only for the forest it was distilled from;
+        # the surrogate file lives in a temporary directory for the test
+        original_path, original_surrogate = startup_success_model.surrogate_path, startup_success_model.surrogate
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "surrogate.npz")
+            startup_success_model.surrogate_path = path
+            try:
+                startup_success_model._load_or_fit_surrogate()
+                saved = dict(np.load(path))
+                np.savez(path, weights=saved['weights'] + 1, intercept=saved['intercept'],
+                         forest_fingerprint="another forest with as many trees")
+                startup_success_model._load_or_fit_surrogate()
+                refitted = np.allclose(startup_success_model.surrogate[0], saved['weights'])
+                np.savez(path, **dict(saved, weights=saved['weights'] + 1))
+                startup_success_model._load_or_fit_surrogate()
+                reused = np.allclose(startup_success_model.surrogate[0], saved['weights'] + 1)
+            finally:
+                startup_success_model.surrogate_path = original_path
+                startup_success_model.surrogate = original_surrogate
+        if not refitted:
+            print(f"  ❌ Surrogate of another forest was reused")
+            return False
+        if not reused:
+            print(f"  ❌ Surrogate of the serving forest was refitted")
+            return False
+        
+        cascade = DeadlineCascade(startup_success_model)
+        cascade.calibrate(rows[0], repeats=3)
+        first = cascade.predict(rows[0], deadline=time.perf_counter() + 10)
+        if first['tier'] != 'full' or first['deadline_missed']:
+            print(f"  ❌ A generous deadline did not get the full model: {first['tier']}")
+            return False
+        
+        # With the full model too slow, a cached full answer beats approximations
+        cascade.estimates['full'].mean = 1.0
+        cascade.estimates['full'].baseline = 1.0
+        cached = cascade.predict(rows[0], deadline=time.perf_counter() + 0.05)
+        if cached['tier'] != 'cache' or cached['success_probability'] != first['success_probability']:
+            print(f"  ❌ Expected the cached full answer, got {cached['tier']}")
+            return False
+        
+        if cascade.predict(rows[1], deadline=time.perf_counter() + 0.05)['tier'] != 'early_exit':
+            print("  ❌ Early-exit tier not chosen when it fits")
+            return False
+        late = cascade.predict(rows[2], deadline=time.perf_counter() - 0.001)
+        if late['tier'] != 'surrogate' or not late['deadline_missed']:
+            print(f"  ❌ Expired deadline answered by {late['tier']}")
+            return False
+        
+        stats = cascade.stats()
+        if stats['deadline_misses']['surrogate'] != 1 or stats['answered']['cache'] != 1:
+            print(f"  ❌ Unexpected counters: {stats}")
+            return False
+        print(f"  ✅ Surrogate agreement {agreement:.0%}, answers per tier: {stats['answered']}")
+        
+        print("  ✅ Deadline cascade test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Deadline cascade test failed: {e}")
+        return False
+
+def test_thread_budget():
+    """Test per-workload thread budgets for the native pools"""
+    print("🧪 Testing Thread Budget...")
+    
+    try:
+        import joblib
+        from threadpoolctl import threadpool_info
+        from models.thread_budget import ThreadBudget
+        
+        budget = ThreadBudget(cores=16, serving_workers=4, job_workers=2)
+        if budget.threads('interactive') != 1 or budget.threads('batch') != 6:
+            print(f"  ❌ Unexpected budgets: {budget.threads('interactive')}, {budget.threads('batch')}")
+            return False
+        # One job pool per host: API and job threads together fit the cores
+        host_threads = budget.serving_workers * budget.threads('interactive') + budget.job_workers * budget.threads('batch')
+        if host_threads > budget.cores:
+            print(f"  ❌ {host_threads} native threads budgeted for {budget.cores} cores")
+            return False
+        if ThreadBudget(cores=2, serving_workers=4, job_workers=2).threads('batch') != 1:
+            print("  ❌ Batch budget should never drop below one thread")
+            return False
+        
+        with budget.limit('batch') as threads:
+            pools = [pool['num_threads'] for pool in threadpool_info()]
+            if any(count > threads for count in pools) or joblib.effective_n_jobs(None) != threads:
+                print(f"  ❌ Pools not limited to {threads}: {pools}")
+                return False
+        if budget.applied is not None:
+            print("  ❌ Applied workload not restored after the block")
+            return False
+        print(f"  ✅ Batch block limited pools to {threads} threads")
+        
+        try:
+            budget.threads('streaming')
+            print("  ❌ Unknown workload accepted")
+            return False
+        except ValueError:
+            pass
+        
+        print("  ✅ Thread budget test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Thread budget test failed: {e}")
+        return False
+
+def test_drift_monitor():
+    """Test streaming input statistics against the training distribution"""
+    print("🧪 Testing Drift Monitor...")
+    
+    try:
+        import threading
+        import numpy as np
+        from models.drift_monitor import FeatureDriftMonitor
+        
+        rng = np.random.default_rng(0)
+        reference = rng.normal([10.0, 0.0], [2.0, 1.0], size=(5000, 2))
+        monitor = FeatureDriftMonitor(['a', 'b'], [10.0, 0.0], [2.0, 1.0], reference=reference, flush_every=64)
+        
+        live = rng.normal([10.0, 0.0], [2.0, 1.0], size=(4000, 2))
+        live[:40, 1] = 9.0
+        chunks = np.array_split(live, 4)
+        
+        def feed(chunk):
+            for row in chunk[:500]:
+                monitor.observe_row({'a': row[0], 'b': row[1]})
+            monitor.observe_matrix(chunk[500:])
+        
+        threads = [threading.Thread(target=feed, args=(chunk,)) for chunk in chunks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        snapshot = monitor.snapshot()
+        a, b = snapshot['features']['a'], snapshot['features']['b']
+        if snapshot['rows'] != len(live):
+            print(f"  ❌ Expected {len(live)} rows, got {snapshot['rows']}")
+            return False
+        if not (np.isclose(a['mean'], live[:, 0].mean()) and np.isclose(a['std'], live[:, 0].std())):
+            print("  ❌ Running mean or variance differs from numpy's")
+            return False
+        if b['out_of_range']['above'] != 40 or a['out_of_range']['rate'] > 0.01:
+            print(f"  ❌ Unexpected out-of-range counts: {b['out_of_range']}")
+            return False
+        if sum(a['histogram']['counts']) != len(live):
+            print("  ❌ Histogram does not count every row")
+            return False
+        
+        monitor.reset()
+        monitor.observe_matrix(live + [6.0, 0.0])
+        shifted = monitor.snapshot(histograms=False)['features']['a']
+        if not (a['psi'] < 0.1 < shifted['psi']) or abs(shifted['mean_shift'] - 3.0) > 0.1:
+            print(f"  ❌ PSI does not separate drift: {a['psi']:.3f} vs {shifted['psi']:.3f}")
+            return False
+        print(f"  ✅ PSI {a['psi']:.3f} in distribution, {shifted['psi']:.3f} after a 3-sigma shift")
+        
+        print("  ✅ Drift monitor test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Drift monitor test failed: {e}")
+        return False
+
+def test_portfolio_analytics():
+    """Test batched portfolio scoring and grouped aggregates"""
+    print("🧪 Testing Portfolio Analytics...")
+    
+    try:
+        import numpy as np
+        from models.portfolio import portfolio_analyzer
+        from models.startup_success_model import FEATURE_COLUMNS
+        
+        X = startup_success_model._generate_sample_data(300, seed=9)[FEATURE_COLUMNS].to_numpy(dtype=float)
+        spending = [
+            {'RnD_Spend': 500.0 * row, 'Administration': 100000.0, 'Marketing_Spend': 200000.0} if row % 3 == 0 else None
+            for row in range(len(X))
+        ]
+        summary = portfolio_analyzer.analyze(X, spending, quantiles=[0.5])
+        if 'error' in summary:
+            print(f"  ❌ Portfolio analysis failed: {summary['error']}")
+            return False
+        
+        _, probabilities = startup_success_model.predict_success_matrix(X)
+        overall = summary['overall']
+        if not np.isclose(overall['expected_successes'], probabilities.sum()):
+            print("  ❌ Expected successes differ from the summed probabilities")
+            return False
+        if not np.isclose(overall['success_probability']['quantiles'][0], np.median(probabilities)):
+            print("  ❌ Median success probability is wrong")
+            return False
+        
+        plans = [plan for plan in spending if plan is not None]
+        profits = [profit_prediction_model.predict_profit(plan)['predicted_profit'] for plan in plans]
+        if overall['profit']['count'] != len(plans) or not np.isclose(overall['profit']['total'], sum(profits)):
+            print("  ❌ Profit aggregates do not match single predictions")
+            return False
+        
+        for breakdown in ('by_state', 'by_round'):
+            if sum(group['count'] for group in summary[breakdown].values()) != len(X):
+                print(f"  ❌ {breakdown} groups do not partition the portfolio")
+                return False
+        ca_rows = X[:, FEATURE_COLUMNS.index('is_CA')] > 0
+        if summary['by_state']['CA']['count'] != ca_rows.sum():
+            print("  ❌ California group has the wrong size")
+            return False
+        print(f"  ✅ {len(X)} startups in {len(summary['by_state'])} state and {len(summary['by_round'])} round groups")
+        
+        print("  ✅ Portfolio analytics test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Portfolio analytics test failed: {e}")
+        return False
+
 def test_profit_prediction_model():
     """Test the profit prediction model directly"""
     print("🧪 Testing Profit Prediction Model...")
@@ -135,6 +1108,292 @@ def test_profit_prediction_model():
         print(f"  ❌ Profit prediction model test failed: {e}")
         return False
 
+def test_online_profit_updates():
+    """Test incremental profit model updates against a full refit"""
+    print("🧪 Testing Online Profit Updates...")
+    
+    try:
+        import copy
+        import numpy as np
+        from sklearn.linear_model import LinearRegression
+        from models.online_regression import RunningRegressionStats
+        from models.profit_prediction_model import FEATURE_COLUMNS
+        
+        rng = np.random.default_rng(7)
+        X = rng.uniform(5000, 1000000, size=(600, 3))
+        y = X @ np.array([0.8, 0.3, 0.6]) + rng.normal(0, 50000, 600)
+        
+        # Batch updates must match one least-squares fit over all rows
+        stats = RunningRegressionStats(3)
+        for start in range(0, 600, 97):
+            stats.update(X[start:start + 97], y[start:start + 97])
+        coef, intercept = stats.coefficients()
+        reference = LinearRegression().fit(X, y)
+        if not np.allclose(coef, reference.coef_, rtol=1e-8) or not np.isclose(intercept, reference.intercept_, rtol=1e-6):
+            print(f"  ❌ Online coefficients differ from a full refit")
+            return False
+        if not np.allclose(stats.feature_variances, X.var(axis=0)):
+            print(f"  ❌ Running variances are wrong")
+            return False
+        print(f"  ✅ Batched statistics match a full refit")
+        
+        # Updating a copy of the served model keeps predictions consistent;
+        # the update swaps in new fitted objects, so the served ones are untouched
+        served = profit_prediction_model.fitted
+        served_coef = served.model.coef_.copy()
+        model = copy.copy(profit_prediction_model)
+        model.online_stats = copy.deepcopy(profit_prediction_model.online_stats)
+        observations = [dict(zip(FEATURE_COLUMNS, row), Profit=float(target)) for row, target in zip(X[:50].tolist(), y[:50])]
+        update = model.update_with_observations(observations, persist=False)
+        if update.get('observations_ingested') != 50:
+            print(f"  ❌ Update failed: {update}")
+            return False
+        expected = model.online_stats.mean_x @ np.array(list(update['coefficients'].values())) + update['intercept']
+        predicted = model.predict_profit(dict(zip(FEATURE_COLUMNS, model.online_stats.mean_x)))['predicted_profit']
+        if not np.isclose(predicted, expected, rtol=1e-6):
+            print(f"  ❌ Served prediction {predicted:,.2f} != {expected:,.2f}")
+            return False
+        if model.fitted is served or profit_prediction_model.fitted is not served or not np.array_equal(served.model.coef_, served_coef):
+            print(f"  ❌ Update modified the fitted objects in place")
+            return False
+        print(f"  ✅ Model updated from {update['effective_observations']:.0f} observations")
+        
+        print("  ✅ Online profit update test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Online profit update test failed: {e}")
+        return False
+
+def test_profit_cross_validation():
+    """Test closed-form cross-validation against explicit refits"""
+    print("🧪 Testing Profit Cross-Validation...")
+    
+    try:
+        import numpy as np
+        from sklearn.linear_model import LinearRegression
+        from models.profit_training import (
+            kfold_residuals, load_profit_data, loo_residuals, model_matrix
+        )
+        
+        df = load_profit_data()
+        X = model_matrix(df)
+        y = df['Profit'].to_numpy(dtype=float)
+        
+        # Leave-one-out: refit without each row in turn
+        refit = np.array([
+            y[i] - LinearRegression().fit(np.delete(X, i, axis=0), np.delete(y, i)).predict(X[i:i + 1])[0]
+            for i in range(len(y))
+        ])
+        if not np.allclose(loo_residuals(X, y), refit, rtol=1e-6):
+            print(f"  ❌ Leave-one-out residuals differ from refits")
+            return False
+        print(f"  ✅ Leave-one-out matches {len(y)} refits")
+        
+        # k-fold: same folds as kfold_residuals
+        order = np.random.default_rng(42).permutation(len(y))
+        refit = np.empty_like(y)
+        for fold in np.array_split(order, 5):
+            train = np.setdiff1d(order, fold)
+            refit[fold] = y[fold] - LinearRegression().fit(X[train], y[train]).predict(X[fold])
+        if not np.allclose(kfold_residuals(X, y, 5), refit, rtol=1e-6):
+            print(f"  ❌ k-fold residuals differ from refits")
+            return False
+        print(f"  ✅ 5-fold matches per-fold refits")
+        
+        metrics = profit_prediction_model.meta['metrics']
+        confidence = profit_prediction_model.predict_profit(
+            {'RnD_Spend': 100000, 'Administration': 120000, 'Marketing_Spend': 200000, 'State': 'Florida'}
+        )['confidence']
+        if not np.isclose(confidence, metrics['loo_r2']):
+            print(f"  ❌ Confidence {confidence} is not the cross-validated R²")
+            return False
+        print(f"  📊 LOO R²: {metrics['loo_r2']:.3f}, 5-fold RMSE: ${metrics['kfold_rmse']:,.2f}")
+        
+        print("  ✅ Profit cross-validation test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Profit cross-validation test failed: {e}")
+        return False
+
+def test_profit_prediction_intervals():
+    """Test precomputed profit prediction intervals"""
+    print("🧪 Testing Profit Prediction Intervals...")
+    
+    try:
+        import numpy as np
+        from models.profit_training import leverages, load_profit_data, model_matrix
+        
+        # The stored quadratic form must reproduce the hat matrix diagonal
+        X = model_matrix(load_profit_data())
+        if not np.allclose(profit_prediction_model.intervals.leverage(X), leverages(X)):
+            print(f"  ❌ Interval leverage differs from the hat matrix")
+            return False
+        print(f"  ✅ Leverage matches the hat matrix diagonal")
+        
+        plans = [
+            {'RnD_Spend': 120000, 'Administration': 110000, 'Marketing_Spend': 250000, 'State': 'New York'},
+            {'RnD_Spend': 900000, 'Administration': 50000, 'Marketing_Spend': 50000}
+        ]
+        narrow = profit_prediction_model.predict_profit_batch(plans, interval_level=0.8)
+        wide = profit_prediction_model.predict_profit_batch(plans, interval_level=0.95)
+        for low, high in zip(narrow['predictions'], wide['predictions']):
+            if not high['lower'] <= low['lower'] <= low['predicted_profit'] <= low['upper'] <= high['upper']:
+                print(f"  ❌ Intervals are not nested around the prediction")
+                return False
+        
+        # Extrapolating far from the training data widens the interval
+        widths = [p['upper'] - p['lower'] for p in wide['predictions']]
+        if widths[1] <= widths[0]:
+            print(f"  ❌ High-leverage plan did not get a wider interval")
+            return False
+        
+        single = profit_prediction_model.predict_profit(plans[0], interval_level=0.95)
+        if not np.isclose(single['prediction_interval']['upper'], wide['predictions'][0]['upper']):
+            print(f"  ❌ Single and batch intervals differ")
+            return False
+        print(f"  📊 95% interval: ${single['prediction_interval']['lower']:,.0f} - ${single['prediction_interval']['upper']:,.0f}")
+        
+        print("  ✅ Profit prediction interval test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Profit prediction interval test failed: {e}")
+        return False
+
+def test_model_selection():
+    """Test latency-budgeted candidate selection"""
+    print("🧪 Testing Model Selection...")
+    
+    try:
+        from models.model_selection import select_candidate
+        
+        results = {
+            'random_forest': {'auc': 0.98, 'single_row_p99_ms': 8.0},
+            'shallow_forest': {'auc': 0.978, 'single_row_p99_ms': 1.5},
+            'logistic_regression': {'auc': 0.95, 'single_row_p99_ms': 0.2},
+        }
+        
+        # The forest is over budget, the shallow forest is close enough in AUC
+        if select_candidate(results, budget_ms=2.0) != 'shallow_forest':
+            print("  ❌ Expected shallow_forest under a 2 ms budget")
+            return False
+        
+        # A generous budget still prefers the cheaper, equally accurate model
+        if select_candidate(results, budget_ms=10.0) != 'shallow_forest':
+            print("  ❌ Expected shallow_forest under a 10 ms budget")
+            return False
+        
+        if select_candidate(results, budget_ms=0.1) is not None:
+            print("  ❌ Expected no candidate under a 0.1 ms budget")
+            return False
+        
+        print(f"  ✅ Serving model: {startup_success_model.serving_name}")
+        print("  ✅ Model selection test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Model selection test failed: {e}")
+        return False
+
+def test_early_exit_forest():
+    """Test that exact early exit never changes the forest's class"""
+    print("🧪 Testing Early-Exit Forest...")
+    
+    try:
+        import numpy as np
+        
+        forest = startup_success_model._get_early_exit_forest()
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(50, 15))
+        expected = startup_success_model.model.predict(X)
+        
+        trees = []
+        for row, label in zip(X, expected):
+            result = forest.predict_row(row)
+            if result['success_prediction'] != label:
+                print("  ❌ Early exit changed the predicted class")
+                return False
+            low, high = result['success_probability_bounds']
+            if not low <= startup_success_model.model.predict_proba(row[None, :])[0, 1] <= high:
+                print("  ❌ Full-forest probability outside the reported bounds")
+                return False
+            trees.append(result['trees_evaluated'])
+        
+        print(f"    📊 Average trees evaluated: {np.mean(trees):.1f} of {forest.n_trees}")
+        print("  ✅ Early-exit forest test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Early-exit forest test failed: {e}")
+        return False
+
+def test_compact_forest_parity():
+    """Test that the compact forest stays within the quantization error bound"""
+    print("🧪 Testing Compact Forest Parity...")
+    
+    try:
+        import os
+        import tempfile
+        import joblib
+        import numpy as np
+        from sklearn.ensemble import RandomForestClassifier
+        from models.compact_forest import CompactForest
+        from models.startup_success_model import FEATURE_COLUMNS
+        
+        df = startup_success_model._generate_sample_data()
+        X = startup_success_model.scaler.transform(df[FEATURE_COLUMNS])
+        # Shallow trees keep impure leaves, so quantization actually matters
+        forest = RandomForestClassifier(n_estimators=20, max_depth=4, random_state=0)
+        forest.fit(X, df['success'])
+        
+        reference = forest.predict_proba(X)[:, 1]
+        for bits in (8, 16):
+            compact = CompactForest(forest, quantize_bits=bits)
+            error = np.abs(compact.predict_proba(X)[:, 1] - reference).max()
+            bound = 0.5 / (2 ** bits - 1) + 1e-12
+            if error > bound:
+                print(f"  ❌ {bits}-bit error {error:.6f} exceeds bound {bound:.6f}")
+                return False
+            print(f"    📊 {bits}-bit max error: {error:.6f} (bound {bound:.6f})")
+        
+        exact = CompactForest(forest, quantize_bits=None, merge_subtrees=False)
+        if not np.allclose(exact.predict_proba(X)[:, 1], reference, atol=1e-6):
+            print("  ❌ Unquantized compact forest differs from sklearn")
+            return False
+        
+        # A compact file is served only for the forest it was built from,
+        # even when another forest has as many trees
+        look_alike = RandomForestClassifier(n_estimators=len(startup_success_model.model.estimators_),
+                                            max_depth=4, random_state=0).fit(X, df['success'])
+        compact = CompactForest(look_alike)
+        original_path = startup_success_model.compact_model_path
+        with tempfile.TemporaryDirectory() as directory:
+            startup_success_model.compact_model_path = os.path.join(directory, "compact.pkl")
+            try:
+                compact.source_fingerprint = "another forest"
+                joblib.dump(compact, startup_success_model.compact_model_path)
+                startup_success_model._load_compact_model()
+                stale_served = startup_success_model.serving_name == "random_forest_compact"
+                compact.source_fingerprint = startup_success_model.forest_fingerprint
+                joblib.dump(compact, startup_success_model.compact_model_path)
+                startup_success_model._load_compact_model()
+                served = startup_success_model.serving_name == "random_forest_compact"
+            finally:
+                startup_success_model.compact_model_path = original_path
+                startup_success_model._load_selected_model()
+        if stale_served or not served:
+            print(f"  ❌ Compact forest was matched to the wrong forest")
+            return False
+        
+        print("  ✅ Compact forest parity test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"  ❌ Compact forest parity test failed: {e}")
+        return False
+
 def test_api_endpoints():
     """Test the FastAPI endpoints"""
     print("🧪 Testing API Endpoints...")
@@ -228,8 +1487,34 @@ def main():
     # Test models directly
     model_tests = [
         test_recommendation_model,
+        test_recommendation_filters,
+        test_query_resolution,
+        test_hybrid_ranking,
+        test_batch_recommendations,
+        test_similar_companies,
+        test_sharded_recommendations,
+        test_query_vector_cache,
+        test_recommendation_model_swap,
+        test_single_flight,
+        test_stack_profiler,
         test_startup_success_model,
-        test_profit_prediction_model
+        test_binary_batch_format,
+        test_feature_store,
+        test_profit_prediction_model,
+        test_online_profit_updates,
+        test_profit_cross_validation,
+        test_profit_prediction_intervals,
+        test_model_selection,
+        test_early_exit_forest,
+        test_compact_forest_parity,
+        test_job_queue,
+        test_compact_catalog,
+        test_synthetic_data,
+        test_hot_key_warm_up,
+        test_deadline_cascade,
+        test_thread_budget,
+        test_drift_monitor,
+        test_portfolio_analytics
     ]
     
     model_results = []
@@ -1,9 +1,67 @@
 const axios = require('axios');
 
+// Column order of the startup success float matrix; must match FEATURE_COLUMNS in the AI service
+const STARTUP_FEATURE_COLUMNS = [
+    'funding_total_usd', 'milestones', 'has_VC', 'has_angel',
+    'has_roundA', 'has_roundB', 'has_roundC', 'has_roundD',
+    'avg_participants', 'is_CA', 'is_NY', 'is_MA', 'is_TX',
+    'is_otherstate', 'age_first_funding_years'
+];
+const FLOAT_MATRIX_MEDIA_TYPE = 'application/x-startflow-f32';
+const FLOAT_MATRIX_MAGIC = 'SFM1';
+const FLOAT_MATRIX_HEADER_BYTES = 12;
+
+/**
+ * Encode rows of numbers as a little-endian float32 matrix with its header
+ * @param {number[][]} rows - Row-major values
+ * @param {number} columns - Values per row
+ * @returns {Buffer} Encoded matrix
+ */
+function encodeFloatMatrix(rows, columns) {
+    const buffer = Buffer.alloc(FLOAT_MATRIX_HEADER_BYTES + rows.length * columns * 4);
+    buffer.write(FLOAT_MATRIX_MAGIC, 0, 'ascii');
+    buffer.writeUInt32LE(rows.length, 4);
+    buffer.writeUInt32LE(columns, 8);
+    let offset = FLOAT_MATRIX_HEADER_BYTES;
+    for (const row of rows) {
+        for (let column = 0; column < columns; column++) {
+            buffer.writeFloatLE(row[column], offset);
+            offset += 4;
+        }
+    }
+    return buffer;
+}
+
+/**
+ * Decode a little-endian float32 matrix
+ * @param {Buffer} buffer - Encoded matrix
+ * @returns {number[][]} Row-major values
+ */
+function decodeFloatMatrix(buffer) {
+    if (buffer.toString('ascii', 0, 4) !== FLOAT_MATRIX_MAGIC) {
+        throw new Error('Response is not a float matrix');
+    }
+    const rows = buffer.readUInt32LE(4);
+    const columns = buffer.readUInt32LE(8);
+    const result = [];
+    let offset = FLOAT_MATRIX_HEADER_BYTES;
+    for (let row = 0; row < rows; row++) {
+        const values = [];
+        for (let column = 0; column < columns; column++) {
+            values.push(buffer.readFloatLE(offset));
+            offset += 4;
+        }
+        result.push(values);
+    }
+    return result;
+}
+
 class AIService {
     constructor() {
         this.aiBaseUrl = process.env.AI_SERVICE_URL || 'http://localhost:8000';
         this.timeout = 30000; // 30 seconds timeout
+        // Network and queueing allowance on top of a request deadline
+        this.deadlineSlackMs = 50;
     }
 
     /**
@@ -42,24 +100,68 @@ class AIService {
     }
 
     /**
-     * Predict startup success probability
-     * @param {Object} startupData - Startup data for prediction
-     * @returns {Promise<Object>} Prediction results
+     * Get company recommendations for several industries in one request
+     * @param {string[]} industries - The industries to get recommendations for
+     * @param {number} topN - Number of recommendations per industry (default: 6)
+     * @param {boolean} blend - Also return one deduplicated list across industries
+     * @returns {Promise<Object>} Per-industry recommendations and optional blended list
      */
-    async predictStartupSuccess(startupData) {
+    async getBatchCompanyRecommendations(industries, topN = 6, blend = false) {
         try {
-            const response = await axios.post(`${this.aiBaseUrl}/ai/predict-startup-success`, startupData, {
+            const response = await axios.post(`${this.aiBaseUrl}/ai/recommendations/batch`, {
+                queries: industries,
+                top_n: topN,
+                blend: blend
+            }, {
                 timeout: this.timeout,
                 headers: {
                     'Content-Type': 'application/json'
                 }
             });
 
+            return {
+                success: true,
+                data: response.data,
+                results: response.data.results,
+                blended: response.data.blended || []
+            };
+        } catch (error) {
+            console.error('AI Batch Recommendation Error:', error.message);
+            return {
+                success: false,
+                error: error.response?.data?.detail || error.message,
+                results: [],
+                blended: []
+            };
+        }
+    }
+
+    /**
+     * Predict startup success probability
+     * @param {Object} startupData - Startup data for prediction
+     * @param {Object} options - { deadlineMs } lets the AI service fall back to
+     *     cheaper models to answer within that many milliseconds
+     * @returns {Promise<Object>} Prediction results
+     */
+    async predictStartupSuccess(startupData, { deadlineMs } = {}) {
+        try {
+            const headers = {
+                'Content-Type': 'application/json'
+            };
+            if (deadlineMs) {
+                headers['X-Deadline-Ms'] = String(deadlineMs);
+            }
+            const response = await axios.post(`${this.aiBaseUrl}/ai/predict-startup-success`, startupData, {
+                timeout: deadlineMs ? deadlineMs + this.deadlineSlackMs : this.timeout,
+                headers
+            });
+
             return {
                 success: true,
                 data: response.data,
                 prediction: response.data.prediction,
-                interpretation: response.data.interpretation
+                interpretation: response.data.interpretation,
+                tier: response.headers['x-inference-tier'] || null
             };
         } catch (error) {
             console.error('AI Startup Success Prediction Error:', error.message);
@@ -72,6 +174,205 @@ class AIService {
         }
     }
 
+    /**
+     * Predict startup success for many startups in one request
+     * @param {Object[]} startups - Startup data objects, as for predictStartupSuccess
+     * @param {Object} options - { binary: send and receive the compact float matrix format }
+     * @returns {Promise<Object>} One prediction per startup, in input order
+     */
+    async predictStartupSuccessBatch(startups, { binary = false } = {}) {
+        try {
+            let predictions;
+            if (binary) {
+                const rows = startups.map(startup => STARTUP_FEATURE_COLUMNS.map(column => startup[column]));
+                const response = await axios.post(
+                    `${this.aiBaseUrl}/ai/predict-startup-success/batch`,
+                    encodeFloatMatrix(rows, STARTUP_FEATURE_COLUMNS.length),
+                    {
+                        timeout: this.timeout,
+                        responseType: 'arraybuffer',
+                        headers: {
+                            'Content-Type': FLOAT_MATRIX_MEDIA_TYPE,
+                            'Accept': FLOAT_MATRIX_MEDIA_TYPE
+                        }
+                    }
+                );
+                predictions = decodeFloatMatrix(Buffer.from(response.data)).map(([prediction, probability]) => ({
+                    success_prediction: prediction,
+                    success_probability: probability,
+                    failure_probability: 1 - probability
+                }));
+            } else {
+                const response = await axios.post(`${this.aiBaseUrl}/ai/predict-startup-success/batch`, {
+                    items: startups
+                }, {
+                    timeout: this.timeout,
+                    headers: {
+                        'Content-Type': 'application/json'
+                    }
+                });
+                predictions = response.data.predictions;
+            }
+
+            return {
+                success: true,
+                predictions: predictions,
+                count: predictions.length
+            };
+        } catch (error) {
+            console.error('AI Batch Startup Success Prediction Error:', error.message);
+            return {
+                success: false,
+                error: error.response?.data?.detail || error.message,
+                predictions: [],
+                count: 0
+            };
+        }
+    }
+
+    /**
+     * Store or update startups' success features in the AI service's feature store
+     * @param {Object[]} startups - Startup data objects, each with a startup_id
+     * @returns {Promise<Object>} Number of startups written and changed
+     */
+    async upsertStartupFeatures(startups) {
+        try {
+            const response = await axios.post(`${this.aiBaseUrl}/ai/feature-store/startups`, {
+                startups: startups
+            }, {
+                timeout: this.timeout,
+                headers: {
+                    'Content-Type': 'application/json'
+                }
+            });
+
+            return {
+                success: true,
+                upserted: response.data.upserted,
+                changed: response.data.changed
+            };
+        } catch (error) {
+            console.error('AI Feature Store Error:', error.message);
+            return {
+                success: false,
+                error: error.response?.data?.detail || error.message
+            };
+        }
+    }
+
+    /**
+     * Predict startup success for startups already in the feature store
+     * @param {string[]} startupIds - IDs passed to upsertStartupFeatures
+     * @returns {Promise<Object>} Predictions in request order and IDs not in the store
+     */
+    async predictStartupSuccessByIds(startupIds) {
+        try {
+            const response = await axios.post(`${this.aiBaseUrl}/ai/predict-startup-success/by-id`, {
+                startup_ids: startupIds
+            }, {
+                timeout: this.timeout,
+                headers: {
+                    'Content-Type': 'application/json'
+                }
+            });
+
+            return {
+                success: true,
+                predictions: response.data.predictions,
+                missing: response.data.missing,
+                count: response.data.count
+            };
+        } catch (error) {
+            console.error('AI Startup Success By ID Error:', error.message);
+            return {
+                success: false,
+                error: error.response?.data?.detail || error.message,
+                predictions: [],
+                missing: [],
+                count: 0
+            };
+        }
+    }
+
+    /**
+     * Queue a background job (large scoring batch or recommendation rebuild)
+     * @param {string} kind - score_startups, score_profit or rebuild_recommendations
+     * @param {Object} params - Job inputs, e.g. { startup_ids } or { items, interval_level }
+     * @returns {Promise<Object>} The queued job with its ID
+     */
+    async submitJob(kind, params = {}) {
+        try {
+            const response = await axios.post(`${this.aiBaseUrl}/ai/jobs`, { kind, ...params }, {
+                timeout: this.timeout,
+                headers: {
+                    'Content-Type': 'application/json'
+                }
+            });
+
+            return {
+                success: true,
+                job: response.data.job
+            };
+        } catch (error) {
+            console.error('AI Job Submit Error:', error.message);
+            return {
+                success: false,
+                error: error.response?.data?.detail || error.message,
+                job: null
+            };
+        }
+    }
+
+    /**
+     * Get the status and progress of a background job
+     * @param {string} jobId - ID returned by submitJob
+     * @returns {Promise<Object>} Job status
+     */
+    async getJob(jobId) {
+        try {
+            const response = await axios.get(`${this.aiBaseUrl}/ai/jobs/${jobId}`, {
+                timeout: this.timeout
+            });
+
+            return {
+                success: true,
+                job: response.data.job
+            };
+        } catch (error) {
+            console.error('AI Job Status Error:', error.message);
+            return {
+                success: false,
+                error: error.response?.data?.detail || error.message,
+                job: null
+            };
+        }
+    }
+
+    /**
+     * Stream the JSON-lines result of a finished job
+     * @param {string} jobId - ID returned by submitJob
+     * @returns {Promise<Object>} Readable stream of result lines
+     */
+    async getJobResultStream(jobId) {
+        try {
+            const response = await axios.get(`${this.aiBaseUrl}/ai/jobs/${jobId}/result`, {
+                responseType: 'stream'
+            });
+
+            return {
+                success: true,
+                stream: response.data
+            };
+        } catch (error) {
+            console.error('AI Job Result Error:', error.message);
+            return {
+                success: false,
+                error: error.response?.status === 409 ? 'Job has not finished' : error.message,
+                stream: null
+            };
+        }
+    }
+
     /**
      * Predict profit based on spending allocation
      * @param {Object} spendingData - Spending data for prediction
@@ -103,6 +404,44 @@ class AIService {
         }
     }
 
+    /**
+     * Aggregate success and profit predictions for a whole portfolio
+     * @param {Object[]} startups - Startup success features, each with an optional spending plan under `spending`
+     * @param {Object} options - Optional quantile levels and profit interval level
+     * @returns {Promise<Object>} Overall, by-state and by-round summaries
+     */
+    async analyzePortfolio(startups, { quantiles, intervalLevel } = {}) {
+        try {
+            const response = await axios.post(`${this.aiBaseUrl}/ai/portfolio/analyze`, {
+                startups: startups,
+                ...(quantiles && { quantiles: quantiles }),
+                ...(intervalLevel && { interval_level: intervalLevel })
+            }, {
+                timeout: this.timeout,
+                headers: {
+                    'Content-Type': 'application/json'
+                }
+            });
+
+            return {
+                success: true,
+                overall: response.data.overall,
+                byState: response.data.by_state,
+                byRound: response.data.by_round,
+                quantileLevels: response.data.quantile_levels
+            };
+        } catch (error) {
+            console.error('AI Portfolio Analysis Error:', error.message);
+            return {
+                success: false,
+                error: error.response?.data?.detail || error.message,
+                overall: null,
+                byState: {},
+                byRound: {}
+            };
+        }
+    }
+
     /**
      * Check AI service health
      * @returns {Promise<Object>} Health status